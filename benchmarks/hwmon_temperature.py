@@ -0,0 +1,100 @@
+"""
+Microbenchmark of the per-sample cost of reading the CPU temperature.
+
+Compares psutil.sensors_temperatures(), which enumerates and reads every hwmon
+sensor on each call, with the persistent file descriptors of HwmonTemperature. On
+hosts without /sys/class/hwmon a fake tree of a two-socket server is generated,
+and the psutil path is replayed on it by reading every sensor file as psutil does.
+
+Usage:
+    python -m benchmarks.hwmon_temperature [--hwmon-dir /sys/class/hwmon] [--samples N]
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import timeit
+
+import psutil
+
+from power.inventory import HWMON_DIR
+from power.temperature import HwmonTemperature
+
+# Drivers of a typical server: per-socket coretemp plus unrelated sensors
+FAKE_DEVICES = [("coretemp", 29)] * 2 + [("nvme", 3)] * 4 + [("acpitz", 2), ("pch", 1)]
+
+
+def fake_hwmon_dir(root) -> str:
+    for index, (driver, sensors) in enumerate(FAKE_DEVICES):
+        path = os.path.join(root, f"hwmon{index}")
+        os.makedirs(path)
+        files = {"name": driver}
+        for sensor in range(1, sensors + 1):
+            files[f"temp{sensor}_input"] = 40000 + sensor * 100
+            files[f"temp{sensor}_label"] = f"Core {sensor}"
+            files[f"temp{sensor}_max"] = 80000
+            files[f"temp{sensor}_crit"] = 100000
+        for file_name, value in files.items():
+            with open(os.path.join(path, file_name), "w", encoding="utf-8") as file:
+                file.write(f"{value}\n")
+
+    return root
+
+
+def read_file(path) -> str:
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read().strip()
+
+
+def psutil_like(hwmon_dir) -> float:
+    # What psutil.sensors_temperatures() does on every call, on any directory
+    temperatures = {}
+    for input_path in sorted(glob.glob(os.path.join(hwmon_dir, "hwmon*", "temp*_*"))):
+        if not input_path.endswith("_input"):
+            continue
+
+        base = input_path[: -len("_input")]
+        name = read_file(os.path.join(os.path.dirname(input_path), "name"))
+        current = float(read_file(input_path)) / 1000
+        for suffix in ("_max", "_crit", "_label"):
+            if os.path.exists(base + suffix):
+                read_file(base + suffix)
+        temperatures.setdefault(name, []).append(current)
+
+    return max(temperatures.get("coretemp", [0]))
+
+
+def run(hwmon_dir, samples, real) -> None:
+    sensors = HwmonTemperature(hwmon_dir)
+    print(f"{len(sensors.paths)} CPU sensor(s), {samples} samples")
+
+    paths = [("hwmon fds", sensors.read)]
+    if real:
+        paths.insert(0, ("psutil", psutil.sensors_temperatures))
+    else:
+        assert psutil_like(hwmon_dir) == sensors.read()
+        paths.insert(0, ("psutil-like", lambda: psutil_like(hwmon_dir)))
+
+    for label, function in paths:
+        best = min(timeit.repeat(function, number=samples, repeat=5))
+        print(f"{label:>12}: {best / samples * 1e6:9.2f} us/sample")
+
+    sensors.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hwmon-dir", default=None, help="hwmon directory to read")
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    hwmon_dir = args.hwmon_dir
+    if hwmon_dir is None and os.path.isdir(HWMON_DIR):
+        hwmon_dir = HWMON_DIR
+
+    if hwmon_dir:
+        run(hwmon_dir, args.samples, os.path.samefile(hwmon_dir, HWMON_DIR))
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run(fake_hwmon_dir(tmp_dir), args.samples, False)
@@ -0,0 +1,120 @@
+"""
+Microbenchmark of the NVML calls issued per GPU sampling tick.
+
+Compares the previous sampling path, which resolved every device handle on each
+tick and queried every metric a second time for the debug output, with the cached
+handles of NvidiaGPU. NVML is replaced by an in-process fake that counts the calls
+and sleeps for a fixed latency per call, so no GPU is needed.
+
+Usage: python -m benchmarks.nvml_sampling [--devices N] [--ticks N] [--latency-us US]
+"""
+
+import argparse
+import time
+from collections import Counter, namedtuple
+
+import power.nvidia as nvidia
+from power.statistics import DataMonitor
+
+Memory = namedtuple("Memory", "total free used")
+Utilization = namedtuple("Utilization", "gpu memory")
+
+
+class NVMLError(Exception):
+    pass
+
+
+class FakeNVML:
+    NVML_TEMPERATURE_GPU = 0
+    NVMLError = NVMLError
+
+    def __init__(self, devices, latency_s):
+        self.devices = devices
+        self.latency_s = latency_s
+        self.calls = Counter()
+
+    def __call(self, name) -> None:
+        self.calls[name] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def nvmlInit(self):
+        self.__call("nvmlInit")
+
+    def nvmlDeviceGetCount(self):
+        self.__call("nvmlDeviceGetCount")
+        return self.devices
+
+    def nvmlDeviceGetHandleByIndex(self, index):
+        self.__call("nvmlDeviceGetHandleByIndex")
+        return index
+
+    def nvmlDeviceGetTotalEnergyConsumption(self, handle):
+        # Pre-Volta cards, so both paths sample every metric on every tick
+        self.__call("nvmlDeviceGetTotalEnergyConsumption")
+        raise NVMLError("Not Supported")
+
+    def nvmlDeviceGetPowerUsage(self, handle):
+        self.__call("nvmlDeviceGetPowerUsage")
+        return 250000
+
+    def nvmlDeviceGetTemperature(self, handle, sensor):
+        self.__call("nvmlDeviceGetTemperature")
+        return 70
+
+    def nvmlDeviceGetMemoryInfo(self, handle):
+        self.__call("nvmlDeviceGetMemoryInfo")
+        return Memory(16 << 30, 8 << 30, 8 << 30)
+
+    def nvmlDeviceGetUtilizationRates(self, handle):
+        self.__call("nvmlDeviceGetUtilizationRates")
+        return Utilization(90, 40)
+
+
+def legacy_tick(nvml, device_count) -> None:
+    # The arguments of the debug calls were evaluated even with debug disabled
+    for i in range(device_count):
+        handle = nvml.nvmlDeviceGetHandleByIndex(i)
+
+        nvml.nvmlDeviceGetPowerUsage(handle)
+        nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
+        nvml.nvmlDeviceGetMemoryInfo(handle)
+        nvml.nvmlDeviceGetUtilizationRates(handle)
+
+        nvml.nvmlDeviceGetPowerUsage(handle)
+        nvml.nvmlDeviceGetTemperature(handle, nvml.NVML_TEMPERATURE_GPU)
+        nvml.nvmlDeviceGetMemoryInfo(handle)
+        nvml.nvmlDeviceGetUtilizationRates(handle)
+
+
+def measure(label, nvml, tick, ticks) -> None:
+    nvml.calls.clear()
+    start = time.perf_counter_ns()
+    for i in range(ticks):
+        tick(i)
+    elapsed_us = (time.perf_counter_ns() - start) / 1000
+
+    print(
+        f"{label:>8}: {sum(nvml.calls.values()) / ticks:5.1f} NVML calls/tick, "
+        f"{elapsed_us / ticks:9.2f} us/tick"
+    )
+
+
+def run(devices, ticks, latency_us) -> None:
+    nvml = FakeNVML(devices, latency_us / 1e6)
+    nvidia.pynvml = nvml
+    gpu = nvidia.NvidiaGPU(0.1, DataMonitor())
+
+    print(f"{devices} device(s), {ticks} ticks, {latency_us} us per NVML call")
+    measure("legacy", nvml, lambda _: legacy_tick(nvml, devices), ticks)
+    measure("cached", nvml, gpu.sample, ticks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--latency-us", type=float, default=0)
+    args = parser.parse_args()
+
+    run(args.devices, args.ticks, args.latency_us)
@@ -0,0 +1,76 @@
+"""
+Microbenchmark of the per-sample cost of reading RAPL energy counters.
+
+Compares the open/read/close path previously used by IntelCPU with the persistent
+file-descriptor pread path of RaplDomain.
+
+Usage: python -m benchmarks.rapl_read [--rapl-dir /sys/class/powercap] [--samples N]
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import timeit
+
+from power.rapl import RaplDomain
+
+
+def legacy_read(path) -> int:
+    with open(os.path.join(path, "energy_uj"), "r", encoding="utf-8") as file:
+        return int(file.read())
+
+
+def fake_rapl_dir(root, packages=2) -> str:
+    for package in range(packages):
+        path = os.path.join(root, f"intel-rapl:{package}")
+        os.makedirs(path)
+        with open(os.path.join(path, "name"), "w", encoding="utf-8") as file:
+            file.write(f"package-{package}\n")
+        with open(os.path.join(path, "energy_uj"), "w", encoding="utf-8") as file:
+            file.write("262143328850\n")
+
+    return root
+
+
+def find_packages(rapl_dir) -> list[str]:
+    pattern = re.compile("intel-rapl:.")
+    return [
+        os.path.join(rapl_dir, package)
+        for package in sorted(os.listdir(rapl_dir))
+        if re.fullmatch(pattern, package)
+    ]
+
+
+def run(rapl_dir, samples) -> None:
+    packages = find_packages(rapl_dir)
+    domains = [RaplDomain(path, os.path.basename(path)) for path in packages]
+
+    def legacy_sample():
+        return sum(legacy_read(path) for path in packages)
+
+    def pread_sample():
+        return sum(domain.read_energy_uj() for domain in domains)
+
+    assert legacy_sample() == pread_sample()
+
+    print(f"{len(packages)} package(s), {samples} samples")
+    for label, function in (("open/read", legacy_sample), ("pread", pread_sample)):
+        best = min(timeit.repeat(function, number=samples, repeat=5))
+        print(f"{label:>10}: {best / samples * 1e6:8.2f} us/sample")
+
+    for domain in domains:
+        domain.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rapl-dir", default=None, help="powercap directory to read")
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.rapl_dir:
+        run(args.rapl_dir, args.samples)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run(fake_rapl_dir(tmp_dir), args.samples)
@@ -0,0 +1,78 @@
+"""
+Microbenchmark of the overhead of the step markers on the smallest training step.
+
+Times StepMarkers.mark() against a LeNet training step on a batch of 4 CIFAR-10
+sized images on the CPU, the smallest of the batch sizes in runTest.sh, and
+the vectorized per-step energy table of an epoch of such steps.
+
+Usage: python -m benchmarks.step_markers [--steps N]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import torch
+from torch import nn, optim
+
+from models import LeNet
+from power.integrate import step_energy
+from power.steps import StepMarkers
+
+BATCH_SIZE = 4
+
+
+def training_step(model, optimizer, criterion, inputs, targets) -> None:
+    optimizer.zero_grad()
+    loss = criterion(model(inputs), targets)
+    loss.backward()
+    optimizer.step()
+    loss.item()
+
+
+def run(steps) -> None:
+    markers = StepMarkers(steps)
+    mark_s = min(timeit.repeat(markers.mark, number=steps, repeat=5)) / steps
+
+    model = LeNet()
+    optimizer = optim.SGD(model.parameters(), lr=0.01)
+    criterion = nn.CrossEntropyLoss()
+    inputs = torch.randn(BATCH_SIZE, 3, 32, 32)
+    targets = torch.randint(0, 10, (BATCH_SIZE,))
+    step_s = (
+        min(
+            timeit.repeat(
+                lambda: training_step(model, optimizer, criterion, inputs, targets),
+                number=50,
+                repeat=5,
+            )
+        )
+        / 50
+    )
+
+    # An epoch of steps sampled at 10 Hz
+    markers_ns = np.cumsum(np.full(steps + 1, round(step_s * 1e9), np.int64))
+    timestamps_ns = np.arange(markers_ns[0], markers_ns[-1], 100000000, np.int64)
+    series = {
+        "cpu_time_ns": timestamps_ns,
+        "cpu_energy_uj": np.cumsum(np.full(len(timestamps_ns), 5e6)),
+        "gpu_time_ns": {0: timestamps_ns},
+        "gpu_power_w": {0: np.full(len(timestamps_ns), 200.0)},
+    }
+    table_s = (
+        min(timeit.repeat(lambda: step_energy(series, markers_ns), number=5, repeat=3))
+        / 5
+    )
+
+    print(f"mark():              {mark_s * 1e9:10.1f} ns")
+    print(f"LeNet step (bs {BATCH_SIZE}):  {step_s * 1e6:10.1f} us")
+    print(f"overhead:            {mark_s / step_s * 100:10.4f} %")
+    print(f"table of {steps} steps: {table_s * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=12500)
+    args = parser.parse_args()
+
+    run(args.steps)
@@ -1,3 +1,4 @@
+import contextlib
 import os
 import ssl
 import sys
@@ -23,11 +24,12 @@ from utils import (
     model_parameters,
     progress_bar,
 )
+from utils.results_store import STORE_FILE, ResultsStore
 
 ascii.print_ascii()
 
 LOGGER = os.environ.get("LOGGER", "info")
-SAMPLING_RATE = os.environ.get("SAMPLING_RATE", 0.1)
+SAMPLING_RATE = float(os.environ.get("SAMPLING_RATE", 0.1))
 
 custom_logger = logger.get_logger(__name__)
 custom_logger = logger.set_level(__name__, LOGGER)
@@ -37,13 +39,25 @@ ssl._create_default_https_context = ssl._create_unverified_context
 
 
 # Training
-def train(args, model, device, train_loader, optimizer, criterion, epoch, results):
+def train(
+    args,
+    model,
+    device,
+    train_loader,
+    optimizer,
+    criterion,
+    epoch,
+    results,
+    markers=None,
+):
     custom_logger.info("Training for Epoch: %s", epoch)
     model.train()
     train_loss = 0
     correct = 0
     total = 0
     begin_time = time.time()
+    if markers is not None:
+        markers.mark()
     for batch_idx, (inputs, targets) in enumerate(train_loader):
         inputs, targets = inputs.to(device), targets.to(device)
         optimizer.zero_grad()
@@ -56,6 +70,9 @@ def train(args, model, device, train_loader, optimizer, criterion, epoch, result
         _, predicted = outputs.max(1)
         total += targets.size(0)
         correct += predicted.eq(targets).sum().item()
+        # After item(), which waits for the device to finish the step
+        if markers is not None:
+            markers.mark()
 
         if args.no_progress_bar:
             progress_bar(
@@ -114,12 +131,16 @@ def make_network_list():
 
 
 # Testing
-def test(args, model, criterion, device, test_loader, epoch, net, results):
+def test(
+    args, model, criterion, device, test_loader, epoch, net, results, markers=None
+):
     model.eval()
     test_loss = 0
     correct = 0
     total = 0
     begin_time = time.time()
+    if markers is not None:
+        markers.mark()
     with torch.no_grad():
         for batch_idx, (inputs, targets) in enumerate(test_loader):
             inputs, targets = inputs.to(device), targets.to(device)
@@ -130,6 +151,8 @@ def test(args, model, criterion, device, test_loader, epoch, net, results):
             _, predicted = outputs.max(1)
             total += targets.size(0)
             correct += predicted.eq(targets).sum().item()
+            if markers is not None:
+                markers.mark()
 
             if args.no_progress_bar:
                 progress_bar(
@@ -163,6 +186,42 @@ def test(args, model, criterion, device, test_loader, epoch, net, results):
         torch.save(state, model_path)
 
 
+# Store of the results of this run, shared by the statistics and the ML results
+def open_store(args):
+    if not args.results_db:
+        return None
+
+    os.makedirs("./results", exist_ok=True)
+    store = ResultsStore("./results/" + STORE_FILE)
+    store.start_run(
+        experiment=args.run_id,
+        tool=args.tool,
+        get_stats=args.get_stats,
+        batch_size=args.batch_size,
+        test_size=args.test_size,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        sampling_rate=SAMPLING_RATE,
+    )
+    return store
+
+
+# Phase of the statistics measuring one epoch of training or testing
+def measure(args, stats, mode, epoch):
+    if stats is None:
+        return contextlib.nullcontext()
+
+    return stats.phase(file_name_generator(args, mode), epoch=epoch)
+
+
+# Markers of the batches of the current phase, for their energy
+def step_markers(stats, loader):
+    if stats is None:
+        return None
+
+    return stats.step_markers(len(loader))
+
+
 def main(args):
     use_cuda = not args.no_cuda and torch.cuda.is_available()
     use_mps = not args.no_mps and torch.backends.mps.is_available()
@@ -219,12 +278,26 @@ def main(args):
 
     network_list = make_network_list()
 
+    store = open_store(args)
+
+    stats = None
     if args.get_stats:
         stats = Stats(
             SAMPLING_RATE,
             device,
             args.generic_cpu,
             run_id=args.run_id,
+            streaming=args.stats_summary,
+            keep_last=args.keep_samples,
+            sampler_process=args.sampler_process,
+            cache_inventory=args.cache_inventory,
+            attribute_process=args.attribute_process,
+            cgroup=args.cgroup,
+            adaptive=args.adaptive_sampling,
+            sampling_floor=args.sampling_floor,
+            sampling_budget=args.sampling_budget,
+            columnar=args.parquet,
+            store=store,
         )
 
         stats.start()
@@ -261,47 +334,55 @@ def main(args):
         )
         scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=200)
 
-        model_parameters(net, input_size=(3, 32, 32))
+        model_parameters(net, input_size=(3, 32, 32), store=store)
 
         custom_logger.info(
             "Create a new tracker for network: %s", net.__class__.__name__
         )
         tracker = GenericTracker(args, net)
-        results = ToolResults(net.__class__.__name__, run_id=args.run_id)
+        results = ToolResults(net.__class__.__name__, run_id=args.run_id, store=store)
 
-        if args.get_stats:
+        if stats is not None:
             stats.set_network(net.__class__.__name__)
 
         for epoch in range(start_epoch, args.epochs + 1):
-            if args.get_stats:
-                stats.reset()
-            if tracker.get_tracker():
-                tracker.start()
-
-            train(
-                args, model, device, train_loader, optimizer, criterion, epoch, results
-            )
-
-            if args.get_stats:
-                mode = file_name_generator(args, "train")
-                stats.save_results(mode, epoch)
-            if tracker.get_tracker():
-                tracker.stop()
-
-            time.sleep(2)
-
-            if args.get_stats:
-                stats.reset()
-            if tracker.get_tracker():
-                tracker.start()
+            with measure(args, stats, "train", epoch):
+                if tracker.get_tracker():
+                    tracker.start()
+
+                train(
+                    args,
+                    model,
+                    device,
+                    train_loader,
+                    optimizer,
+                    criterion,
+                    epoch,
+                    results,
+                    step_markers(stats, train_loader),
+                )
 
-            test(args, model, criterion, device, test_loader, epoch, net, results)
+                if tracker.get_tracker():
+                    tracker.stop()
+
+            with measure(args, stats, "test", epoch):
+                if tracker.get_tracker():
+                    tracker.start()
+
+                test(
+                    args,
+                    model,
+                    criterion,
+                    device,
+                    test_loader,
+                    epoch,
+                    net,
+                    results,
+                    step_markers(stats, test_loader),
+                )
 
-            if args.get_stats:
-                mode = file_name_generator(args, "test")
-                stats.save_results(mode, epoch)
-            if tracker.get_tracker():
-                tracker.stop()
+                if tracker.get_tracker():
+                    tracker.stop()
 
             scheduler.step()
 
@@ -309,9 +390,11 @@ def main(args):
         del tracker
         del results
 
-    if args.get_stats:
+    if stats is not None:
         stats.stop()
         del stats
+    if store is not None:
+        store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+import math
+
+from utils import log
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+NANOSECONDS = 1000000000
+
+# Weight of the newest sample in the moving mean and variance of a signal
+SMOOTHING = 0.2
+# A sample further than this many standard deviations from the mean is a jump...
+JUMP_STD = 3.0
+# ...as long as it also moves by this fraction of the mean, so that noise on a flat
+# signal, whose variance is close to 0, is not one
+JUMP_MIN_CHANGE = 0.05
+# Samples without a jump before the sampling period of a source is doubled
+CALM_SAMPLES = 5
+
+
+class SignalTracker:
+    """
+    Exponentially weighted moving mean and variance of a signal, telling when a new
+    value jumps away from it.
+    """
+
+    def __init__(self, smoothing: float = SMOOTHING):
+        self.smoothing = smoothing
+        self.mean = None
+        self.variance = 0.0
+
+    def update(self, value: float) -> bool:
+        """
+        :param value: The new value of the signal.
+        :return: Whether the value jumps away from the recent values.
+        """
+        if value is None:
+            return False
+
+        if self.mean is None:
+            self.mean = value
+            return False
+
+        deviation = value - self.mean
+        jump = abs(deviation) > max(
+            JUMP_STD * math.sqrt(self.variance), JUMP_MIN_CHANGE * abs(self.mean)
+        )
+
+        self.mean += self.smoothing * deviation
+        self.variance = (1 - self.smoothing) * (
+            self.variance + self.smoothing * deviation**2
+        )
+        return jump
+
+
+class SourceRate:
+    """
+    The sampling state of one source: every how many ticks it is sampled, when it
+    is sampled next, and what sampling it costs.
+    """
+
+    def __init__(self):
+        self.stride = 1
+        self.next_tick = 0
+        self.samples = 0
+        self.cost_ns = 0.0
+        self.calm = 0
+        self.trackers = []
+
+
+class AdaptivePolicy:
+    """
+    Adapts the sampling rate of every source to its signal, between the base period
+    of the sampler and a floor rate.
+
+    A source is sampled on every tick while its power or utilisation moves, e.g. at
+    phase boundaries or while the DataLoader stalls. Every `CALM_SAMPLES` samples
+    without a jump its period doubles, up to `floor_s`. A jump in any of its signals
+    brings it straight back to the base period.
+
+    The CPU time spent sampling a source is measured, and its period is never
+    shorter than what keeps that cost under `budget`, as a fraction of one CPU.
+
+    Sources report their latest signals through an optional `activity()` method.
+    Sources without it are sampled on every tick, within their budget.
+    """
+
+    def __init__(self, period_s: float, floor_s: float = 1.0, budget: float = 0.01):
+        self.period_ns = period_s * NANOSECONDS
+        self.max_stride = max(1, round(floor_s / period_s))
+        self.budget = budget
+        self._rates = {}
+
+    def __rate(self, source) -> SourceRate:
+        if source not in self._rates:
+            self._rates[source] = SourceRate()
+
+        return self._rates[source]
+
+    def due(self, source: object, tick: int) -> bool:
+        """
+        :param source: A source registered to the sampler.
+        :param tick: The number of the current sampler tick.
+        :return: Whether the source should be sampled on this tick.
+        """
+        return tick >= self.__rate(source).next_tick
+
+    def observe(self, source: object, cost_ns: int, tick: int) -> None:
+        """
+        Adapts the sampling period of a source after it was sampled.
+
+        :param source: The source that was sampled.
+        :param cost_ns: The CPU time the sample took (in nanoseconds).
+        :param tick: The number of the tick the source was sampled on.
+        """
+        rate = self.__rate(source)
+        rate.samples += 1
+        rate.cost_ns += (
+            SMOOTHING * (cost_ns - rate.cost_ns) if rate.samples > 1 else cost_ns
+        )
+
+        activity = getattr(source, "activity", None)
+        if activity is None:
+            rate.stride = 1
+        else:
+            signals = activity()
+            while len(rate.trackers) < len(signals):
+                rate.trackers.append(SignalTracker())
+
+            jumps = [tracker.update(v) for tracker, v in zip(rate.trackers, signals)]
+            if any(jumps):
+                rate.stride = 1
+                rate.calm = 0
+            else:
+                rate.calm += 1
+                if rate.calm >= CALM_SAMPLES:
+                    rate.stride = min(rate.stride * 2, self.max_stride)
+                    rate.calm = 0
+
+        # The budget caps the cost even below the floor rate
+        budget_stride = math.ceil(rate.cost_ns / (self.budget * self.period_ns))
+        rate.next_tick = tick + max(rate.stride, budget_stride, 1)
+
+    def boost(self) -> None:
+        """
+        Samples every source at the base period again, e.g. at a phase boundary.
+        """
+        for rate in self._rates.values():
+            rate.stride = 1
+            rate.calm = 0
+            rate.next_tick = 0
+
+    def summary(self) -> dict:
+        """
+        :return: For every source, the number of samples, the current sampling period
+            (in seconds) and the mean cost of a sample (in microseconds).
+        """
+        return {
+            type(source).__name__: {
+                "samples": rate.samples,
+                "period_s": rate.stride * self.period_ns / NANOSECONDS,
+                "cost_us": rate.cost_ns / 1000,
+            }
+            for source, rate in self._rates.items()
+        }
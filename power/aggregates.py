@@ -0,0 +1,132 @@
+import math
+from collections import deque
+
+import numpy as np
+
+NANOSECONDS = 1000000000
+WATT_TO_MICROJOULE = 1000000
+
+
+class RunningStats:
+    """
+    Running aggregates of a series kept in O(1) memory: Welford's mean and
+    variance, the extremes, the first and last values, and the trapezoidal
+    integral of the values over time when timestamps are given.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.first = None
+        self.last = None
+        self.integral = 0.0
+        self._m2 = 0.0
+        self._last_time_ns = None
+
+    def update(self, value: float, timestamp_ns: int = None) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if timestamp_ns is not None:
+            if self._last_time_ns is not None and timestamp_ns > self._last_time_ns:
+                elapsed_s = (timestamp_ns - self._last_time_ns) / NANOSECONDS
+                self.integral += (self.last + value) / 2 * elapsed_s
+            self._last_time_ns = timestamp_ns
+
+        if self.first is None:
+            self.first = value
+        self.last = value
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "first": self.first,
+            "last": self.last,
+        }
+
+
+class StreamingColumn:
+    """
+    Drop-in replacement of a Column that keeps running aggregates instead of every
+    sample, and optionally the last `keep_last` raw samples in a ring buffer.
+
+    Power series (`*_w`) are integrated over the timestamp given by `clock` into
+    an energy, and counter series (`*_energy_uj`) report the energy between their
+    first and last readings.
+    """
+
+    def __init__(self, name: str, dtype=np.float64, keep_last=0, clock=None):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.stats = RunningStats()
+        self._clock = clock
+        self._recent = deque(maxlen=keep_last) if keep_last else None
+
+    def append(self, value) -> None:
+        timestamp_ns = self._clock() if self._clock is not None else None
+        self.stats.update(value, timestamp_ns)
+        if self._recent is not None:
+            self._recent.append(value)
+
+    def extend(self, values) -> None:
+        for value in values:
+            self.append(value)
+
+    def clear(self) -> None:
+        self.stats.reset()
+        if self._recent is not None:
+            self._recent.clear()
+
+    def view(self) -> np.ndarray:
+        return np.array(self._recent if self._recent is not None else [], self.dtype)
+
+    def tolist(self) -> list:
+        return self.view().tolist()
+
+    def summary(self) -> dict:
+        summary = self.stats.summary()
+        if self.stats.count:
+            if self.name.endswith("_w"):
+                summary["energy_j"] = self.stats.integral
+            elif self.name.endswith("_energy_uj"):
+                summary["energy_j"] = (
+                    self.stats.last - self.stats.first
+                ) / WATT_TO_MICROJOULE
+
+        if self._recent is not None:
+            summary["last_samples"] = self.tolist()
+
+        return summary
+
+    def __len__(self) -> int:
+        return self.stats.count
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
@@ -0,0 +1,87 @@
+import os
+import re
+
+from utils import log
+
+from .inventory import HWMON_DIR, get_inventory, list_hwmon
+from .rapl import RAPL_DIR, RaplCPU, RaplZones, find_rapl_zones, open_domain
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+AMD_ENERGY_DRIVER = "amd_energy"
+
+
+def find_amd_energy_zones(hwmon_dir=HWMON_DIR, listing=None) -> RaplZones:
+    """
+    Opens the socket and core counters exposed by the amd_energy hwmon driver.
+    Socket counters are reported as packages and core counters as the core domain.
+
+    :param hwmon_dir: The hwmon class directory.
+    :param listing: The [device, driver name] of the hwmon devices, e.g. from the
+        hardware inventory. The directory is listed when not given.
+    :return: The discovered zones, empty when the driver is not loaded.
+    """
+    zones = RaplZones()
+    if listing is None:
+        listing = list_hwmon(hwmon_dir)
+
+    label_pattern = re.compile(r"energy(\d+)_label")
+    for hwmon, driver in listing:
+        if driver != AMD_ENERGY_DRIVER:
+            continue
+
+        path = os.path.join(hwmon_dir, hwmon)
+
+        for label_file in sorted(os.listdir(path)):
+            match = re.fullmatch(label_pattern, label_file)
+            if not match:
+                continue
+
+            with open(os.path.join(path, label_file), "r", encoding="utf-8") as file:
+                label = file.read().strip()
+
+            energy_file = f"energy{match.group(1)}_input"
+            domain = open_domain(
+                hwmon, path, label, energy_file=energy_file, range_file=None
+            )
+            if domain is None:
+                continue
+
+            if label.startswith("Esocket"):
+                zones.packages.append(domain)
+                zones.devices.append("cpu:" + label[len("Esocket") :])
+            elif label.startswith("Ecore"):
+                zones.subdomains["core"].append(domain)
+
+    return zones
+
+
+class AmdCPU(RaplCPU):
+    def __init__(
+        self,
+        sleep_time: int,
+        data_monitor: object,
+        rapl_dir=RAPL_DIR,
+        hwmon_dir=HWMON_DIR,
+        cgroup=None,
+    ):
+        self.rapl_dir = rapl_dir
+        self.hwmon_dir = hwmon_dir
+        self.backend = None
+        RaplCPU.__init__(self, sleep_time, data_monitor, cgroup)
+
+    def _find_zones(self) -> RaplZones:
+        inventory = get_inventory()
+        listing = inventory.rapl_zones if self.rapl_dir == RAPL_DIR else None
+        zones = find_rapl_zones(self.rapl_dir, listing)
+        if zones.packages:
+            self.backend = "powercap"
+            return zones
+        zones.close()
+
+        listing = inventory.hwmon if self.hwmon_dir == HWMON_DIR else None
+        zones = find_amd_energy_zones(self.hwmon_dir, listing)
+        if zones.packages:
+            self.backend = AMD_ENERGY_DRIVER
+        return zones
@@ -0,0 +1,179 @@
+import os
+
+import psutil
+
+from utils import log
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+# CPU time the system did not spend on its own tasks. Guest times are already
+# counted in user and nice
+EXCLUDED_TIMES = ("idle", "iowait", "steal", "guest", "guest_nice")
+# Energy of the whole system apportioned to the process tree
+ATTRIBUTED = ("cpu", "cpu_core")
+
+
+def tree_cpu_time_s(process: psutil.Process, exclude=()) -> float:
+    """
+    :param process: The root of the process tree.
+    :param exclude: The roots of the subtrees left out, e.g. the sampler process.
+    :return: The CPU time (user and system) of the process and all its descendants,
+        including the descendants that already exited and were waited for (in
+        seconds).
+    """
+    excluded = set()
+    for root in exclude:
+        try:
+            excluded.update(
+                member.pid for member in [root, *root.children(recursive=True)]
+            )
+        except psutil.Error:
+            # Exited: its time only counts once waited for by its parent
+            continue
+
+    total = 0.0
+    for member in [process, *process.children(recursive=True)]:
+        if member.pid in excluded:
+            continue
+        try:
+            times = member.cpu_times()
+        except psutil.Error:
+            # Exited since it was listed: its time is added to its parent once waited
+            continue
+        total += times.user + times.system + times.children_user + times.children_system
+
+    return total
+
+
+def system_busy_time_s() -> float:
+    """
+    :return: The CPU time spent by the system on any task, summed over the CPUs (in
+        seconds).
+    """
+    times = psutil.cpu_times()._asdict()
+    return sum(value for name, value in times.items() if name not in EXCLUDED_TIMES)
+
+
+class CpuTimeAttribution:
+    """
+    Attributes the CPU energy of a phase to the share of the busy time of the whole
+    system spent by a group of tasks, given by `cpu_time_s()`.
+
+    The CPU time of the group and the busy time of the system are read at the start
+    and at the end of a phase. The measured energy of the phase is then apportioned
+    by the share of the busy time spent by the group.
+    """
+
+    SHARE_KEY = "cpu_share"
+    SUFFIX = "attributed"
+
+    def __init__(self):
+        self.mark()
+
+    def cpu_time_s(self) -> float:
+        raise NotImplementedError
+
+    def mark(self) -> None:
+        """
+        Starts a new phase.
+        """
+        self._tasks_s = self.cpu_time_s()
+        self._busy_s = system_busy_time_s()
+
+    def share(self) -> float:
+        """
+        :return: The share of the busy time of the system spent by the group since
+            the start of the phase, between 0 and 1.
+        """
+        busy_s = system_busy_time_s() - self._busy_s
+        if busy_s <= 0:
+            return 0.0
+
+        tasks_s = self.cpu_time_s() - self._tasks_s
+        return min(max(tasks_s / busy_s, 0.0), 1.0)
+
+    def add_energy(self, results: dict) -> dict:
+        """
+        Adds the energy attributed to the group next to the energy of the whole
+        system, and starts a new phase.
+
+        :param results: The results of a phase, as returned by
+            DataMonitor.take_results().
+        :return: The results, with the share of the busy time under SHARE_KEY and the
+            attributed energy under energy_j['<source>_<SUFFIX>'].
+        """
+        share = self.share()
+        self.mark()
+
+        energy = results.setdefault("energy_j", {})
+        results[self.SHARE_KEY] = share
+        for source in ATTRIBUTED:
+            whole_j = energy.get(source)
+            summary = results.get(f"{source}_energy_uj")
+            if whole_j is None and isinstance(summary, dict):
+                # Summary of a streaming DataMonitor
+                whole_j = summary.get("energy_j")
+
+            if whole_j is not None:
+                energy[source] = whole_j
+                energy[f"{source}_{self.SUFFIX}"] = whole_j * share
+
+        custom_logger.debug("%s: %s", self.SHARE_KEY, share)
+        return results
+
+
+class ProcessTreeAttribution(CpuTimeAttribution):
+    """
+    Attributes the CPU energy of a phase to the process tree of the trainer, i.e.
+    main.py and its DataLoader workers, on a host shared with other work. The
+    subtrees of the processes started for sampling are left out with `exclude()`.
+    """
+
+    SHARE_KEY = "cpu_tree_share"
+    SUFFIX = "attributed"
+
+    def __init__(self, pid: int = None):
+        self.process = psutil.Process(pid if pid is not None else os.getpid())
+        self.excluded = []
+        CpuTimeAttribution.__init__(self)
+
+    def exclude(self, *pids: int) -> None:
+        """
+        Leaves the subtrees of the given processes out of the tree, and starts a new
+        phase.
+        """
+        for pid in pids:
+            try:
+                self.excluded.append(psutil.Process(pid))
+            except psutil.Error:
+                custom_logger.debug("Process %s already exited", pid)
+        self.mark()
+
+    def cpu_time_s(self) -> float:
+        return tree_cpu_time_s(self.process, self.excluded)
+
+
+class CgroupAttribution(CpuTimeAttribution):
+    """
+    Attributes the CPU energy of a phase to the cgroup of the run, e.g. its
+    container, from the `usage_usec` of the cgroup. The peak memory usage of the
+    cgroup is reported with it.
+    """
+
+    SHARE_KEY = "cpu_cgroup_share"
+    SUFFIX = "cgroup"
+
+    def __init__(self, cgroup: object):
+        self.cgroup = cgroup
+        CpuTimeAttribution.__init__(self)
+
+    def cpu_time_s(self) -> float:
+        return self.cgroup.cpu_time_s()
+
+    def add_energy(self, results: dict) -> dict:
+        memory_peak_b = self.cgroup.memory_peak_b()
+        if memory_peak_b is not None:
+            results["cgroup_memory_peak_b"] = memory_peak_b
+
+        return CpuTimeAttribution.add_energy(self, results)
@@ -0,0 +1,38 @@
+from threading import Lock
+
+
+class SampleBuffer:
+    """
+    Single-producer/single-consumer handoff of samples between a source and the
+    DataMonitor.
+
+    The producer pushes one row per sample, holding every series of that sample.
+    The consumer drains by swapping the active list for an empty one, so the
+    handoff costs the same whatever the number of samples or series, and every
+    row is handed over exactly once.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._rows = []
+
+    def push(self, row: tuple) -> None:
+        with self._lock:
+            self._rows.append(row)
+
+    def drain(self) -> list[tuple]:
+        with self._lock:
+            rows, self._rows = self._rows, []
+
+        return rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def drain_columns(self) -> tuple[tuple, ...]:
+        """
+        Drains the buffer and transposes the rows into one tuple per series.
+
+        :return: The drained series, or an empty tuple when no sample was pushed.
+        """
+        return tuple(zip(*self.drain()))
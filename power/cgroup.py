@@ -0,0 +1,190 @@
+import os
+import time
+
+import psutil
+
+from utils import log
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+PROC_CGROUP_FILE = "/proc/self/cgroup"
+READ_SIZE = 1024
+MICROSECONDS = 1000000
+NANOSECONDS = 1000000000
+
+
+def read_cgroup_path(proc_file=PROC_CGROUP_FILE) -> str:
+    """
+    :param proc_file: The cgroup membership file of the process.
+    :return: The path of the cgroup v2 of the process relative to the cgroup root, or
+        None without a unified (v2) hierarchy.
+    """
+    try:
+        with open(proc_file, "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return None
+
+    for line in lines:
+        # The unified hierarchy is the only one with id 0 and no controllers
+        hierarchy, controllers, path = line.split(":", 2)
+        if hierarchy == "0" and not controllers:
+            return path
+
+    return None
+
+
+def find_cgroup(root=CGROUP_ROOT, proc_file=PROC_CGROUP_FILE) -> str:
+    """
+    :param root: Where the cgroup v2 hierarchy is mounted.
+    :param proc_file: The cgroup membership file of the process.
+    :return: The directory of the cgroup of the process, or None when it has no
+        readable cgroup v2 CPU accounting.
+    """
+    path = read_cgroup_path(proc_file)
+    if path is None:
+        return None
+
+    cgroup_dir = os.path.join(root, path.lstrip("/"))
+    if not os.path.isfile(os.path.join(cgroup_dir, "cpu.stat")):
+        return None
+
+    return cgroup_dir
+
+
+def read_value(path) -> str:
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read().strip()
+
+
+class CgroupStats:
+    """
+    CPU and memory accounting of a cgroup v2, for runs in a container where psutil
+    reports the utilisation of the whole host.
+
+    `cpu.stat` and `memory.current` are opened once and pread on every sample. The
+    CPU utilisation is the `usage_usec` consumed since the previous sample relative
+    to the CPUs the cgroup may use (its `cpu.max` quota, or the CPUs the process
+    may run on), and the memory utilisation is `memory.current` relative to
+    `memory.max`, or to the memory of the host without a limit.
+    """
+
+    def __init__(self, cgroup_dir: str, clock=time.monotonic_ns):
+        self.cgroup_dir = cgroup_dir
+        self._clock = clock
+        self._cpu_fd = os.open(self.__path("cpu.stat"), os.O_RDONLY)
+        self._memory_fd = None
+        if os.path.isfile(self.__path("memory.current")):
+            self._memory_fd = os.open(self.__path("memory.current"), os.O_RDONLY)
+
+        self.cpus = self.__cpu_limit()
+        self.memory_limit_b = self.__memory_limit()
+        self._last_usage_usec = self.usage_usec()
+        self._last_time_ns = self._clock()
+
+    def __path(self, file_name) -> str:
+        return os.path.join(self.cgroup_dir, file_name)
+
+    def __pread(self, fd) -> str:
+        # No buffer is shared, as the sampler and the trainer both read the cgroup
+        return os.pread(fd, READ_SIZE, 0).decode()
+
+    def __cpu_limit(self) -> float:
+        try:
+            quota, period = read_value(self.__path("cpu.max")).split()
+            if quota != "max":
+                return int(quota) / int(period)
+        except (OSError, ValueError):
+            pass
+
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return psutil.cpu_count()
+
+    def __memory_limit(self) -> int:
+        try:
+            limit = read_value(self.__path("memory.max"))
+            if limit != "max":
+                return int(limit)
+        except (OSError, ValueError):
+            pass
+
+        return psutil.virtual_memory().total
+
+    def usage_usec(self) -> int:
+        """
+        :return: The CPU time consumed by the tasks of the cgroup (in microseconds).
+        """
+        for line in self.__pread(self._cpu_fd).splitlines():
+            key, value = line.split()
+            if key == "usage_usec":
+                return int(value)
+
+        return 0
+
+    def cpu_time_s(self) -> float:
+        return self.usage_usec() / MICROSECONDS
+
+    def memory_current_b(self) -> int:
+        if self._memory_fd is None:
+            return 0
+
+        return int(self.__pread(self._memory_fd))
+
+    def memory_peak_b(self) -> int:
+        """
+        :return: The highest memory usage of the cgroup (in bytes), or None on kernels
+            without `memory.peak`.
+        """
+        try:
+            return int(read_value(self.__path("memory.peak")))
+        except (OSError, ValueError):
+            return None
+
+    def utilisation(self) -> tuple[float, float]:
+        """
+        :return: Tuple of the CPU utilisation since the previous call and the memory
+            utilisation of the cgroup (both in percentage).
+        """
+        usage_usec = self.usage_usec()
+        now = self._clock()
+
+        cpu_percent = 0.0
+        elapsed_usec = (now - self._last_time_ns) / (NANOSECONDS / MICROSECONDS)
+        if elapsed_usec > 0 and self.cpus:
+            cpu_percent = (
+                (usage_usec - self._last_usage_usec) / (elapsed_usec * self.cpus) * 100
+            )
+        self._last_usage_usec = usage_usec
+        self._last_time_ns = now
+
+        memory_percent = self.memory_current_b() / self.memory_limit_b * 100
+
+        custom_logger.debug(
+            "cgroup CPU utilisation: %s%%, memory: %s%%", cpu_percent, memory_percent
+        )
+        return min(cpu_percent, 100.0), memory_percent
+
+    def close(self) -> None:
+        for fd in (self._cpu_fd, self._memory_fd):
+            if fd is not None:
+                os.close(fd)
+        self._cpu_fd = self._memory_fd = None
+
+
+def cgroup_stats(root=CGROUP_ROOT, proc_file=PROC_CGROUP_FILE) -> CgroupStats:
+    """
+    :param root: Where the cgroup v2 hierarchy is mounted.
+    :param proc_file: The cgroup membership file of the process.
+    :return: The accounting of the cgroup of the process, or None without cgroup v2.
+    """
+    cgroup_dir = find_cgroup(root, proc_file)
+    if cgroup_dir is None:
+        custom_logger.warning("No cgroup v2 accounting found. Using host-wide values.")
+        return None
+
+    custom_logger.info("CPU and memory accounted from the cgroup '%s'.", cgroup_dir)
+    return CgroupStats(cgroup_dir)
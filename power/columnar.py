@@ -0,0 +1,233 @@
+import os
+from dataclasses import fields
+
+import numpy as np
+
+from utils import log
+
+from .columns import Column, DeviceColumns
+from .statistics import DataMonitor, timestamps_of
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+# The series every sample belongs to, by the series holding its timestamps
+SOURCES = {
+    "sample_time_ns": "sample",
+    "cpu_time_ns": "cpu",
+    "gpu_time_ns": "gpu",
+    "gpu_energy_time_ns": "gpu_energy",
+    "ram_time_ns": "ram",
+}
+COMPRESSION = "zstd"
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def metric_types() -> dict:
+    """
+    :return: The Arrow type of every monitored metric of the DataMonitor. Counters
+        keep a double precision, as their cumulative values outgrow a float32.
+    """
+    metrics = {}
+    for attr in fields(DataMonitor):
+        if attr.name in SOURCES or attr.type not in (Column, DeviceColumns):
+            continue
+
+        if attr.name.endswith("_ns"):
+            metrics[attr.name] = pa.int64()
+        elif attr.name.endswith("_energy_uj"):
+            metrics[attr.name] = pa.float64()
+        else:
+            metrics[attr.name] = pa.float32()
+
+    return metrics
+
+
+def sample_schema():
+    """
+    :return: The schema of the sample files: one row per sample of a source, with
+        the metrics the source does not monitor left null.
+    """
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("net", dictionary),
+            ("mode", dictionary),
+            ("epoch", pa.int32()),
+            ("source", dictionary),
+            ("device", pa.int16()),
+            ("timestamp_ns", pa.int64()),
+            *metric_types().items(),
+        ]
+    )
+
+
+def repeated(value: str, size: int):
+    """
+    :return: A dictionary-encoded array of a single value repeated.
+    """
+    return pa.DictionaryArray.from_arrays(
+        np.zeros(size, np.int32), pa.array([value], pa.string())
+    )
+
+
+def sample_table(views: dict, net: str, mode: str, epoch):
+    """
+    :param views: The series of a phase, as returned by DataMonitor.phase_views().
+    :param net: The network measured.
+    :param mode: The name of the phase, e.g. 'stats_train'.
+    :param epoch: The epoch of the phase.
+    :return: The samples of the phase as an Arrow table of the sample schema.
+    """
+    schema = sample_schema()
+    sources = list(SOURCES.values())
+
+    series = {}
+    for name in views:
+        if name not in SOURCES and name in schema.names:
+            series.setdefault(timestamps_of(name), []).append(name)
+
+    blocks = []
+    for time_name, source in SOURCES.items():
+        if time_name not in views:
+            continue
+
+        timestamps = views[time_name]
+        devices = timestamps if isinstance(timestamps, dict) else {None: timestamps}
+        for device, timestamps_ns in devices.items():
+            size = len(timestamps_ns)
+            if not size:
+                continue
+
+            columns = {
+                "net": repeated(net, size),
+                "mode": repeated(mode, size),
+                "epoch": (
+                    pa.nulls(size, pa.int32())
+                    if epoch is None
+                    else pa.array(np.full(size, epoch, np.int32))
+                ),
+                "source": pa.DictionaryArray.from_arrays(
+                    np.full(size, sources.index(source), np.int32),
+                    pa.array(sources, pa.string()),
+                ),
+                "device": (
+                    pa.nulls(size, pa.int16())
+                    if device is None
+                    else pa.array(np.full(size, device, np.int16))
+                ),
+                "timestamp_ns": pa.array(timestamps_ns, pa.int64()),
+            }
+            for name in series.get(time_name, ()):
+                values = views[name] if device is None else views[name].get(device)
+                if values is None or len(values) != size:
+                    continue
+                columns[name] = pa.array(
+                    values.astype(schema.field(name).type.to_pandas_dtype(), copy=False)
+                )
+
+            blocks.append(
+                pa.table(
+                    [
+                        columns.get(attr.name, pa.nulls(size, attr.type))
+                        for attr in schema
+                    ],
+                    schema=schema,
+                )
+            )
+
+    if not blocks:
+        return schema.empty_table()
+
+    return pa.concat_tables(blocks)
+
+
+def sample_file(file_dir: str, experiment: str, net: str) -> str:
+    return os.path.join(file_dir, f"samples_{experiment}_{net}.parquet")
+
+
+class ColumnarWriter:
+    """
+    Writes the raw samples of every phase of a run to a Parquet file, one per
+    network, next to the results.
+
+    The samples of a phase, e.g. an epoch, are written as one row group, so a
+    reader can skip whole epochs with the statistics of the row groups, and read
+    only the columns it needs. The file is only readable once closed.
+    """
+
+    def __init__(self, file_dir: str, experiment: str):
+        self.file_dir = file_dir
+        self.experiment = experiment
+        self.file_path = None
+        self._net = None
+        self._writer = None
+
+    def __open(self, net) -> None:
+        self.close()
+        os.makedirs(self.file_dir, exist_ok=True)
+        self.file_path = sample_file(self.file_dir, self.experiment, net)
+        self._writer = pq.ParquetWriter(
+            self.file_path, sample_schema(), compression=COMPRESSION
+        )
+        self._net = net
+
+    def write(self, views: dict, net: str, mode: str, epoch) -> None:
+        """
+        :param views: The series of the phase, as returned by
+            DataMonitor.phase_views().
+        :param net: The network measured.
+        :param mode: The name of the phase, e.g. 'stats_train'.
+        :param epoch: The epoch of the phase.
+        """
+        table = sample_table(views, net, mode, epoch)
+        if not table.num_rows:
+            return
+
+        if self._writer is None or net != self._net:
+            self.__open(net)
+        self._writer.write_table(table, row_group_size=table.num_rows)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            custom_logger.info("Raw samples written to '%s'.", self.file_path)
+        self._writer = None
+
+
+def columnar_writer(file_dir: str, experiment: str) -> ColumnarWriter:
+    """
+    :param file_dir: The directory of the results.
+    :param experiment: The experiment of the run, e.g. 'exp_0'.
+    :return: The writer of the raw samples, or None without pyarrow.
+    """
+    if not available():
+        custom_logger.warning(
+            "pyarrow is not installed. The raw samples are not written to Parquet."
+        )
+        return None
+
+    return ColumnarWriter(file_dir, experiment)
+
+
+def read_samples(file_path: str, columns: list[str] = None, filters=None):
+    """
+    Reads a sample file memory-mapped, e.g. read_samples(file_path,
+    ["epoch", "timestamp_ns", "gpu_power_w"], [("source", "=", "gpu")]).
+
+    :param file_path: A file written by a ColumnarWriter.
+    :param columns: The columns to read, all of them when None.
+    :param filters: Filters of the rows, as taken by pyarrow.parquet.read_table().
+    :return: The samples as an Arrow table.
+    """
+    return pq.read_table(file_path, columns=columns, filters=filters, memory_map=True)
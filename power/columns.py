@@ -0,0 +1,140 @@
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+
+
+class Column:
+    """
+    A growable, preallocated NumPy buffer holding one monitored series.
+
+    Appending writes the value into the buffer without keeping a Python object per
+    sample, and the capacity doubles when the buffer is full. `view()` exports the
+    stored samples without copying. A view is a snapshot: later appends never
+    change it, and growing or clearing the column allocates a new buffer instead
+    of overwriting the exported one.
+    """
+
+    def __init__(self, dtype=np.float64, capacity=INITIAL_CAPACITY):
+        self.dtype = np.dtype(dtype)
+        self._capacity = capacity
+        self._data = np.empty(capacity, dtype=self.dtype)
+        self._size = 0
+
+    def __grow(self, minimum) -> None:
+        capacity = max(minimum, 2 * len(self._data))
+        data = np.empty(capacity, dtype=self.dtype)
+        data[: self._size] = self._data[: self._size]
+        self._data = data
+
+    def append(self, value) -> None:
+        if self._size == len(self._data):
+            self.__grow(self._size + 1)
+
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values) -> None:
+        count = len(values)
+        if count == 0:
+            return
+
+        if self._size + count > len(self._data):
+            self.__grow(self._size + count)
+
+        self._data[self._size : self._size + count] = values
+        self._size += count
+
+    def clear(self) -> None:
+        self._data = np.empty(self._capacity, dtype=self.dtype)
+        self._size = 0
+
+    def discard(self, count: int) -> None:
+        """
+        Drops the oldest `count` samples, into a new buffer so exported views are
+        left untouched.
+        """
+        count = min(count, self._size)
+        if count <= 0:
+            return
+
+        size = self._size - count
+        data = np.empty(max(self._capacity, 2 * size), dtype=self.dtype)
+        data[:size] = self._data[count : self._size]
+        self._data = data
+        self._size = size
+
+    def view(self) -> np.ndarray:
+        return self._data[: self._size]
+
+    def tolist(self) -> list:
+        return self.view().tolist()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __repr__(self) -> str:
+        return f"Column({self.tolist()!r}, dtype={self.dtype.name})"
+
+
+class DeviceColumns:
+    """
+    One series per device, e.g. per GPU index, so the samples of several devices
+    are never interleaved in the same buffer.
+
+    The column of a device is created with `factory(dtype)` the first time the
+    device hands samples over. Results are keyed by the device index as a string
+    so they can be stored as JSON.
+    """
+
+    def __init__(self, dtype=np.float64, factory=Column):
+        self.dtype = np.dtype(dtype)
+        self.factory = factory
+        self._columns = {}
+
+    def column(self, device: int):
+        if device not in self._columns:
+            self._columns[device] = self.factory(self.dtype)
+
+        return self._columns[device]
+
+    def extend(self, device: int, values) -> None:
+        self.column(device).extend(values)
+
+    def clear(self) -> None:
+        for column in self._columns.values():
+            column.clear()
+
+    def discard(self, device: int, count: int) -> None:
+        if device in self._columns:
+            self._columns[device].discard(count)
+
+    def devices(self) -> list[int]:
+        return sorted(device for device, column in self._columns.items() if len(column))
+
+    def view(self) -> dict:
+        return {device: self._columns[device].view() for device in self.devices()}
+
+    def tolist(self) -> dict:
+        return {
+            str(device): self._columns[device].tolist() for device in self.devices()
+        }
+
+    def summary(self) -> dict:
+        return {
+            str(device): self._columns[device].summary() for device in self.devices()
+        }
+
+    def __len__(self) -> int:
+        return sum(len(column) for column in self._columns.values())
+
+    def __getitem__(self, device):
+        return self._columns[device]
+
+    def __repr__(self) -> str:
+        return f"DeviceColumns({self.tolist()!r}, dtype={self.dtype.name})"
@@ -0,0 +1,448 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from multiprocessing.connection import Connection
+from typing import Optional
+
+import numpy as np
+
+from utils import log
+
+from .shared_ring import RECORD, RING_CAPACITY, SampleRing
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+START_TIMEOUT_S = 60
+STOP_TIMEOUT_S = 10
+# The directory holding the `power` package, for `python -m power.daemon`
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Period of the draining of the ring by the sampler process: the ring holds minutes
+# of samples at the highest sampling rate
+DRAIN_PERIOD_S = 1.0
+
+# Kinds of records, one per DataMonitor update method replayed from the ring
+TIME, CPU, RAPL, GPU, GPU_ENERGY, RAM = range(6)
+
+# The DataMonitor methods and attributes the trainer queries at phase boundaries
+REQUESTS = (
+    "start_time",
+    "stop_time",
+    "set_start_time",
+    "set_stop_time",
+    "reset_values",
+    "take_results",
+    "phase_results",
+    "phase_views",
+    "discard_before",
+)
+READY = "ready"
+STOP = None
+
+
+class RingWriter:
+    """
+    Stands in for the DataMonitor inside the sampler process: every update is
+    written to the shared ring as one record per sample instead of being stored.
+    """
+
+    def __init__(self, ring: SampleRing):
+        self.ring = ring
+        self._cpu_timestamps = ()
+
+    def __write(self, kind, lists, timestamps, device=0) -> None:
+        size = len(timestamps)
+        if not size:
+            return
+
+        records = np.zeros(size, RECORD)
+        records["kind"] = kind
+        records["device"] = device
+        records["timestamp_ns"] = timestamps
+        for i, values in enumerate(lists):
+            records["values"][:, i] = values if len(values) else np.nan
+        self.ring.write(records)
+
+    def set_start_time(self) -> None:
+        # Phases are timed by the DataMonitor the ring is replayed into
+        pass
+
+    def update_values_time(self, timestamp_ns: int, interval_ns: int = 0) -> None:
+        self.__write(TIME, ((interval_ns,),), (timestamp_ns,))
+
+    def update_values_cpu(self, lists) -> None:
+        self._cpu_timestamps = lists[5]
+        self.__write(CPU, lists[:5], lists[5])
+
+    def update_values_rapl(self, lists) -> None:
+        # The sub-domains are handed over right after the CPU samples they were read
+        # with, and are written with their timestamps
+        size = max(len(values) for values in lists)
+        self.__write(RAPL, lists, list(self._cpu_timestamps)[-size:] if size else ())
+
+    def update_values_gpu(self, lists, device: int = 0) -> None:
+        self.__write(GPU, lists[:5], lists[5], device)
+
+    def update_values_gpu_energy(self, lists, device: int = 0) -> None:
+        self.__write(GPU_ENERGY, lists[:1], lists[1], device)
+
+    def update_values_ram(self, values, timestamps) -> None:
+        self.__write(RAM, (values,), timestamps)
+
+
+def replay(
+    records: np.ndarray, data_monitor: object, cpu_time_ns: int = None
+) -> Optional[int]:
+    """
+    Hands the records read from the ring over to a DataMonitor, one run of records
+    per source and device.
+
+    The samples of a source are written interleaved with the ticks and the other
+    sources. A streaming DataMonitor integrates them over its tick clock, so they
+    are replayed in the order they were written. The series of a regular
+    DataMonitor are independent of each other, so the records are grouped by source
+    first, keeping their order within a source, instead of replaying runs of a
+    single record.
+
+    The RAPL sub-domains are aligned with the CPU samples by position in the
+    DataMonitor. Their records are only replayed along with the CPU sample of the
+    same timestamp, so the records lost in the ring cannot shift them.
+
+    :param records: Records read from a SampleRing.
+    :param data_monitor: The DataMonitor receiving the samples.
+    :param cpu_time_ns: The timestamp of the last CPU sample replayed before, whose
+        sub-domains may come with these records.
+    :return: The timestamp of the last CPU sample replayed.
+    """
+    if not len(records):
+        return cpu_time_ns
+
+    kinds = records["kind"]
+    cpu_times = records["timestamp_ns"][kinds == CPU]
+    rapl = kinds == RAPL
+    if rapl.any():
+        known = np.append(cpu_times, cpu_time_ns if cpu_time_ns is not None else [])
+        orphans = rapl & ~np.isin(records["timestamp_ns"], known)
+        if orphans.any():
+            custom_logger.debug("%s orphan RAPL record(s) dropped", orphans.sum())
+            records = records[~orphans]
+    if len(cpu_times):
+        cpu_time_ns = int(cpu_times[-1])
+
+    keys = records["kind"].astype(np.int32) << 16 | records["device"]
+    if not getattr(data_monitor, "streaming", False):
+        order = np.argsort(keys, kind="stable")
+        records, keys = records[order], keys[order]
+
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    for run in np.split(records, bounds):
+        kind, device = int(run["kind"][0]), int(run["device"][0])
+        # Python values, as handed over by the sources in-process: the summaries of
+        # a streaming DataMonitor keep them as they are
+        timestamps = run["timestamp_ns"].tolist()
+        values = run["values"].T
+
+        if kind == TIME:
+            for timestamp_ns, interval_ns in zip(timestamps, values[0].tolist()):
+                data_monitor.update_values_time(timestamp_ns, int(interval_ns))
+        elif kind == CPU:
+            data_monitor.update_values_cpu((*values.tolist(), timestamps))
+        elif kind == RAPL:
+            data_monitor.update_values_rapl(
+                tuple(
+                    () if np.isnan(series).all() else series.tolist()
+                    for series in values[:4]
+                )
+            )
+        elif kind == GPU:
+            data_monitor.update_values_gpu((*values.tolist(), timestamps), device)
+        elif kind == GPU_ENERGY:
+            data_monitor.update_values_gpu_energy(
+                (values[0].tolist(), timestamps), device
+            )
+        elif kind == RAM:
+            data_monitor.update_values_ram(values[0].tolist(), timestamps)
+
+    return cpu_time_ns
+
+
+class RingCollector:
+    """
+    Replays the records of the shared ring into the DataMonitor of the sampler
+    process, which stores and aggregates the samples on behalf of the trainer.
+    """
+
+    def __init__(self, ring: SampleRing, data_monitor: object):
+        self.ring = ring
+        self.data_monitor = data_monitor
+        self._lost = 0
+        self._cpu_time_ns = None
+
+    def collect(self) -> None:
+        self._cpu_time_ns = replay(
+            self.ring.read(), self.data_monitor, self._cpu_time_ns
+        )
+
+        if self.ring.lost > self._lost:
+            custom_logger.warning(
+                "%s sample record(s) were overwritten in the shared ring before "
+                "being collected.",
+                self.ring.lost - self._lost,
+            )
+            self._lost = self.ring.lost
+
+
+def answer(data_monitor: object, name: str, args: tuple) -> tuple:
+    """
+    :param data_monitor: The DataMonitor of the sampler process.
+    :param name: The method or attribute requested by the RemoteDataMonitor.
+    :param args: The arguments of the method.
+    :return: Whether the request succeeded, and its result or the exception raised.
+    """
+    if name not in REQUESTS:
+        return False, ValueError(f"Unknown DataMonitor request '{name}'")
+
+    try:
+        attribute = getattr(data_monitor, name)
+        return True, attribute(*args) if callable(attribute) else attribute
+    except Exception as exception:
+        return False, exception
+
+
+def serve(connection, collector: RingCollector, drain_period: float) -> bool:
+    """
+    Drains the ring every `drain_period`, and answers the requests of the trainer
+    once everything sampled before them was replayed.
+
+    :return: Whether the trainer asked to stop, rather than leaving without it.
+    """
+    while True:
+        try:
+            requested = connection.poll(drain_period)
+            collector.collect()
+            if not requested:
+                continue
+
+            request = connection.recv()
+            if request is STOP:
+                return True
+            connection.send(answer(collector.data_monitor, *request))
+        except (EOFError, OSError):
+            return False
+
+
+def run_daemon(connection, capacity: int, drain_period: float, options: dict) -> None:
+    """
+    Entry point of the sampler process: builds the monitors of the platform and
+    samples them into a shared ring, which is replayed into the DataMonitor the
+    trainer queries through its connection. Once asked to stop, reports the jitter
+    of the sampling ticks and the number of records lost in the ring.
+    """
+    from .statistics import DataMonitor
+    from .stats import Stats
+
+    data_monitor = DataMonitor(
+        streaming=options.pop("streaming"), keep_last=options.pop("keep_last")
+    )
+    # Owned by this process, so it is released whenever the trainer exits
+    ring = SampleRing(capacity=capacity)
+    try:
+        stats = Stats(data_monitor=RingWriter(ring), **options)
+        stats.start()
+        connection.send(READY)
+
+        stopped = serve(connection, RingCollector(ring, data_monitor), drain_period)
+        stats.stop()
+        if stopped:
+            connection.send((stats.jitter_stats(), ring.lost))
+        else:
+            custom_logger.error("The trainer exited without stopping the sampler")
+    finally:
+        ring.close()
+
+
+class RemoteDataMonitor:
+    """
+    Stands in for the DataMonitor in the trainer when sampling from a separate
+    process. The samples are stored and aggregated by the DataMonitor of the
+    sampler process: the trainer only hands over the phase boundaries and reads
+    back their results, so it runs no per-sample work.
+    """
+
+    def __init__(self, connection, streaming: bool = False):
+        self.connection = connection
+        self.streaming = streaming
+
+    def __request(self, name, *args):
+        self.connection.send((name, args))
+        succeeded, result = self.connection.recv()
+        if not succeeded:
+            raise result
+
+        return result
+
+    @property
+    def start_time(self) -> int:
+        return self.__request("start_time")
+
+    @property
+    def stop_time(self) -> int:
+        return self.__request("stop_time")
+
+    def set_start_time(self) -> None:
+        self.__request("set_start_time")
+
+    def set_stop_time(self) -> None:
+        self.__request("set_stop_time")
+
+    def reset_values(self) -> None:
+        self.__request("reset_values")
+
+    def take_results(self) -> dict:
+        return self.__request("take_results")
+
+    def phase_results(self, start_ns: int, stop_ns: int) -> dict:
+        return self.__request("phase_results", start_ns, stop_ns)
+
+    def phase_views(self, start_ns: int, stop_ns: int, edges: bool = False) -> dict:
+        return self.__request("phase_views", start_ns, stop_ns, edges)
+
+    def discard_before(self, timestamp_ns: int) -> None:
+        self.__request("discard_before", timestamp_ns)
+
+
+class ProcessSampler:
+    """
+    Runs the sampling engine in a separate process, so that sampling never competes
+    for the GIL with the training loop.
+
+    The sampler process is started from its own entry point, `python -m
+    power.daemon`, so the script of the trainer and what it imports are not
+    imported again there. It talks to the trainer over a socket it inherits, which
+    is POSIX only.
+
+    The sampler process writes timestamped records into a shared memory ring, and
+    drains it every DRAIN_PERIOD_S into its own DataMonitor, so long phases do not
+    overrun the ring. The trainer queries that DataMonitor through `data_monitor`,
+    a RemoteDataMonitor, at the phase boundaries. It exposes the same
+    start/stop/join/jitter_stats interface as the in-process Sampler.
+    """
+
+    def __init__(
+        self,
+        sleep_time: float,
+        device: str,
+        generic_cpu: bool = False,
+        capacity: int = RING_CAPACITY,
+        inventory_dir: str = None,
+        cgroup: bool = False,
+        adaptive: bool = False,
+        sampling_floor: float = 1.0,
+        sampling_budget: float = 0.01,
+        streaming: bool = False,
+        keep_last: int = 0,
+    ):
+        trainer_socket, self._child_socket = socket.socketpair()
+        self.connection = Connection(trainer_socket.detach())
+        self.data_monitor = RemoteDataMonitor(self.connection, streaming)
+        self.process = None
+        self.lost = 0
+        self._jitter_stats = None
+
+        self._arguments = (
+            capacity,
+            DRAIN_PERIOD_S,
+            {
+                "sleep_time": sleep_time,
+                "device": device,
+                "generic_cpu": generic_cpu,
+                "file_dir": inventory_dir,
+                "cache_inventory": inventory_dir is not None,
+                "cgroup": cgroup,
+                "adaptive": adaptive,
+                "sampling_floor": sampling_floor,
+                "sampling_budget": sampling_budget,
+                "streaming": streaming,
+                "keep_last": keep_last,
+            },
+        )
+
+    def start(self) -> None:
+        # A fresh interpreter, rather than a fork of the trainer and its CUDA context
+        python_path = os.environ.get("PYTHONPATH")
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "power.daemon",
+                str(self._child_socket.fileno()),
+            ],
+            pass_fds=(self._child_socket.fileno(),),
+            env={
+                **os.environ,
+                "PYTHONPATH": os.pathsep.join(filter(None, [ROOT_DIR, python_path])),
+            },
+        )
+        # Only the sampler process holds its end, so either side sees the other exit
+        self._child_socket.close()
+        self.connection.send(self._arguments)
+
+        deadline = time.monotonic() + START_TIMEOUT_S
+        while not self.connection.poll(0.1):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("The sampler process did not start")
+        if self.connection.recv() != READY:
+            raise RuntimeError("The sampler process did not start")
+
+    def pids(self) -> list[int]:
+        """
+        :return: The processes started for sampling: the sampler process, whose
+            subtree holds the resource tracker watching over the shared ring.
+        """
+        return [self.process.pid]
+
+    def jitter_stats(self) -> dict:
+        if self._jitter_stats is None:
+            return {
+                "ticks": 0,
+                "missed_ticks": 0,
+                "lateness_p50_ms": 0.0,
+                "lateness_p99_ms": 0.0,
+                "lateness_max_ms": 0.0,
+            }
+
+        return self._jitter_stats
+
+    def stop(self) -> None:
+        self.connection.send(STOP)
+
+    def join(self) -> None:
+        try:
+            if not self.connection.poll(STOP_TIMEOUT_S):
+                raise EOFError
+            self._jitter_stats, self.lost = self.connection.recv()
+        except EOFError:
+            custom_logger.error("The sampler process did not report its statistics")
+        self.connection.close()
+
+        try:
+            self.process.wait(STOP_TIMEOUT_S)
+        except subprocess.TimeoutExpired:
+            custom_logger.error("The sampler process did not exit, killing it")
+            self.process.kill()
+            self.process.wait()
+
+
+def main() -> None:
+    connection = Connection(int(sys.argv[1]))
+    try:
+        capacity, drain_period, options = connection.recv()
+    except EOFError:
+        return
+    run_daemon(connection, capacity, drain_period, options)
+
+
+if __name__ == "__main__":
+    main()
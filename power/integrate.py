@@ -0,0 +1,292 @@
+import numpy as np
+
+NANOSECONDS = 1000000000
+WATT_TO_MICROJOULE = 1000000
+
+# Energy of a phase, computed from the counter series when the hardware exposes one
+COUNTERS = {
+    "cpu": "cpu_energy_uj",
+    "cpu_core": "cpu_core_energy_uj",
+    "cpu_uncore": "cpu_uncore_energy_uj",
+    "dram": "dram_energy_uj",
+    "psys": "psys_energy_uj",
+}
+# Device-keyed counters, read per device when the hardware exposes them
+DEVICE_COUNTERS = {
+    "gpu": "gpu_energy_uj",
+}
+# ...and otherwise by integrating the power series over its timestamps
+POWER = {
+    "gpu": ("gpu_time_ns", "gpu_power_w"),
+    "ram": ("ram_time_ns", "ram_power_w"),
+}
+
+
+def trapezoid_energy_j(timestamps_ns, power_w) -> float:
+    """
+    Integrates a power series over its timestamps with the trapezoidal rule.
+
+    :param timestamps_ns: Monotonic timestamps of the samples (in nanoseconds).
+    :param power_w: Power of each sample (in watts).
+    :return: The energy consumed between the first and the last sample (in joules).
+    """
+    size = min(len(timestamps_ns), len(power_w))
+    if size < 2:
+        return 0.0
+
+    timestamps_ns = np.asarray(timestamps_ns[:size], dtype=np.int64)
+    power_w = np.asarray(power_w[:size], dtype=np.float64)
+    elapsed_s = np.diff(timestamps_ns) / NANOSECONDS
+
+    return float(np.sum((power_w[1:] + power_w[:-1]) * 0.5 * elapsed_s))
+
+
+def counter_energy_j(energy_uj) -> float:
+    """
+    Energy between the first and the last reading of a monotonic energy counter.
+
+    :param energy_uj: Monotonic counter readings (in microjoules).
+    :return: The energy consumed between the two readings (in joules).
+    """
+    if len(energy_uj) < 2:
+        return 0.0
+
+    return float(energy_uj[-1] - energy_uj[0]) / WATT_TO_MICROJOULE
+
+
+def phase_energy(series: dict) -> dict:
+    """
+    Computes the energy of a phase for every monitored source.
+
+    :param series: Monitored series by name, e.g. from DataMonitor.views().
+    :return: Energy per source (in joules). A measured dram counter takes precedence
+        over the estimated RAM power. Device-keyed series are also reported per device,
+        preferring the energy counter of a device over its power samples.
+    """
+    energy = {}
+    for source, name in COUNTERS.items():
+        if len(series.get(name, ())) > 1:
+            energy[source] = counter_energy_j(series[name])
+
+    for source, (time_name, power_name) in POWER.items():
+        if source in energy or (source == "ram" and "dram" in energy):
+            continue
+
+        if source in DEVICE_COUNTERS and isinstance(series.get(power_name, {}), dict):
+            energy.update(
+                device_energy(
+                    source,
+                    series.get(time_name, {}),
+                    series.get(power_name, {}),
+                    series.get(DEVICE_COUNTERS[source], {}),
+                )
+            )
+        elif len(series.get(power_name, ())) > 1 and time_name in series:
+            energy[source] = trapezoid_energy_j(series[time_name], series[power_name])
+
+    return energy
+
+
+def summary_energy(summaries: dict) -> dict:
+    """
+    Collects the energy of a phase from the running aggregates of a streaming
+    DataMonitor, with the same sources as phase_energy().
+
+    :param summaries: Summaries of the series by name, e.g. from
+        DataMonitor.summaries(). Device-keyed series are keyed by device.
+    :return: Energy per source (in joules).
+    """
+    energy = {}
+    for source, name in COUNTERS.items():
+        if summaries.get(name, {}).get("count", 0) > 1:
+            energy[source] = summaries[name]["energy_j"]
+
+    for source, (_, power_name) in POWER.items():
+        if source in energy or (source == "ram" and "dram" in energy):
+            continue
+
+        if source in DEVICE_COUNTERS:
+            power = summaries.get(power_name, {})
+            counters = summaries.get(DEVICE_COUNTERS[source], {})
+            device_j = {}
+            for device in sorted(set(power) | set(counters)):
+                # The energy counter of a device is preferred over its power
+                for summary in (counters.get(device, {}), power.get(device, {})):
+                    if summary.get("count", 0) > 1:
+                        device_j[f"{source}:{device}"] = summary["energy_j"]
+                        break
+            if device_j:
+                energy.update(device_j)
+                energy[source] = sum(device_j.values())
+        elif summaries.get(power_name, {}).get("count", 0) > 1:
+            energy[source] = summaries[power_name]["energy_j"]
+
+    return energy
+
+
+def interval_energy(series: dict, start_ns: int, stop_ns: int) -> dict:
+    """
+    Computes the energy of every monitored source between two timestamps, e.g. the
+    start and the stop of a phase, interpolated at both of them as for a step.
+
+    :param series: Monitored series by name, as NumPy arrays, with the samples
+        next to the two timestamps, e.g. from DataMonitor.phase_views(edges=True).
+    :param start_ns: The monotonic timestamp of the start (in nanoseconds).
+    :param stop_ns: The monotonic timestamp of the stop (in nanoseconds).
+    :return: Energy per source (in joules), with the sources of phase_energy().
+    """
+    return {
+        source: float(values[0])
+        for source, values in step_energy(series, np.array([start_ns, stop_ns])).items()
+    }
+
+
+def device_energy(
+    source, timestamps_ns: dict, power_w: dict, energy_uj: dict = None
+) -> dict:
+    """
+    Computes the energy of device-keyed series, e.g. one per GPU.
+
+    :param source: Name of the source, e.g. 'gpu'.
+    :param timestamps_ns: Timestamps of the power samples keyed by device index.
+    :param power_w: Power of the samples keyed by device index.
+    :param energy_uj: Energy counter readings keyed by device index, for the devices
+        exposing one.
+    :return: The energy of every device under '<source>:<index>' and their sum under
+        the name of the source (in joules).
+    """
+    energy = {
+        f"{source}:{device}": counter_energy_j(counter)
+        for device, counter in (energy_uj or {}).items()
+        if len(counter) > 1
+    }
+    for device, power in power_w.items():
+        name = f"{source}:{device}"
+        if name not in energy and len(power) > 1 and device in timestamps_ns:
+            energy[name] = trapezoid_energy_j(timestamps_ns[device], power)
+
+    if energy:
+        energy[source] = sum(energy.values())
+
+    return energy
+
+
+def cumulative_energy_j(timestamps_ns, power_w) -> np.ndarray:
+    """
+    :param timestamps_ns: Monotonic timestamps of the samples (in nanoseconds).
+    :param power_w: Power of each sample (in watts).
+    :return: The energy consumed from the first sample up to each sample, with the
+        trapezoidal rule (in joules).
+    """
+    elapsed_s = np.diff(np.asarray(timestamps_ns, dtype=np.int64)) / NANOSECONDS
+    power_w = np.asarray(power_w, dtype=np.float64)
+    steps_j = (power_w[1:] + power_w[:-1]) * 0.5 * elapsed_s
+
+    return np.concatenate(([0.0], np.cumsum(steps_j)))
+
+
+def energy_between(markers_ns, timestamps_ns, energy_j) -> np.ndarray:
+    """
+    Energy between consecutive markers, from a cumulative energy series linearly
+    interpolated at the markers.
+
+    The power of the first and the last intervals of the series is held for one more
+    interval before and after them, so a marker following the last sample by less
+    than a sampling period still gets its energy. Further away, the markers get none.
+
+    :param markers_ns: Sorted monotonic timestamps of the boundaries (in nanoseconds).
+    :param timestamps_ns: Sorted monotonic timestamps of the series (in nanoseconds).
+    :param energy_j: Cumulative energy at each timestamp (in joules).
+    :return: The energy of every interval between two markers (in joules).
+    """
+    # Relative to the first marker, as nanoseconds since boot overflow the float64
+    # mantissa after about 104 days
+    origin = markers_ns[0]
+    timestamps = (np.asarray(timestamps_ns, dtype=np.int64) - origin).astype(np.float64)
+    energy_j = np.asarray(energy_j, dtype=np.float64)
+    if len(timestamps) > 1:
+        timestamps = np.concatenate(
+            (
+                [2 * timestamps[0] - timestamps[1]],
+                timestamps,
+                [2 * timestamps[-1] - timestamps[-2]],
+            )
+        )
+        energy_j = np.concatenate(
+            (
+                [2 * energy_j[0] - energy_j[1]],
+                energy_j,
+                [2 * energy_j[-1] - energy_j[-2]],
+            )
+        )
+
+    at_markers = np.interp(
+        (np.asarray(markers_ns, dtype=np.int64) - origin).astype(np.float64),
+        timestamps,
+        energy_j,
+    )
+
+    return np.diff(at_markers)
+
+
+def step_energy(series: dict, markers_ns) -> dict:
+    """
+    Computes the energy of every step between consecutive markers, e.g. the batches
+    of an epoch, for every monitored source.
+
+    :param series: Monitored series by name, as NumPy arrays, e.g. from
+        DataMonitor.phase_views().
+    :param markers_ns: Monotonic timestamps of the step boundaries (in nanoseconds).
+    :return: The energy of each step per source (in joules), as arrays with one
+        value per step. Sources follow phase_energy(). Within a sampling period of
+        the first or the last sample of a source, the steps get the power of the
+        nearest interval, and none further away.
+    """
+    if len(markers_ns) < 2:
+        return {}
+
+    energy = {}
+    cpu_time = series.get("cpu_time_ns", ())
+    for source, name in COUNTERS.items():
+        values = series.get(name, ())
+        if len(values) > 1 and len(cpu_time) >= len(values):
+            counter_j = (np.asarray(values) - values[0]) / WATT_TO_MICROJOULE
+            energy[source] = energy_between(
+                markers_ns, cpu_time[: len(values)], counter_j
+            )
+
+    gpu_counters = series.get(DEVICE_COUNTERS["gpu"], {})
+    gpu_counter_time = series.get("gpu_energy_time_ns", {})
+    for source, (time_name, power_name) in POWER.items():
+        if source in energy or (source == "ram" and "dram" in energy):
+            continue
+
+        power = series.get(power_name, {} if source == "gpu" else ())
+        timestamps = series.get(time_name, {} if source == "gpu" else ())
+        if isinstance(power, dict):
+            devices = sorted(set(power) | set(gpu_counters))
+            for device in devices:
+                counter = gpu_counters.get(device, ())
+                if len(counter) > 1:
+                    device_j = (np.asarray(counter) - counter[0]) / WATT_TO_MICROJOULE
+                    device_time = gpu_counter_time[device]
+                elif len(power.get(device, ())) > 1:
+                    device_time = timestamps[device]
+                    device_j = cumulative_energy_j(device_time, power[device])
+                else:
+                    continue
+                energy[f"{source}:{device}"] = energy_between(
+                    markers_ns, device_time, device_j
+                )
+
+            device_names = [name for name in energy if name.startswith(f"{source}:")]
+            if device_names:
+                energy[source] = np.sum([energy[name] for name in device_names], axis=0)
+        elif len(power) > 1 and len(timestamps) >= len(power):
+            energy[source] = energy_between(
+                markers_ns,
+                timestamps[: len(power)],
+                cumulative_energy_j(timestamps[: len(power)], power),
+            )
+
+    return energy
@@ -0,0 +1,265 @@
+# pylint: disable=global-statement
+import json
+import os
+import platform
+import re
+from functools import cached_property
+
+import psutil
+
+from utils import log, platform_info
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+RAPL_DIR = "/sys/class/powercap/"
+HWMON_DIR = "/sys/class/hwmon/"
+MEMINFO_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "results",
+    "meminfo.txt",
+)
+BOOT_ID_FILE = "/proc/sys/kernel/random/boot_id"
+INVENTORY_FILE = "inventory.json"
+INVENTORY_VERSION = 1
+
+_inventory = None
+
+
+def read_name(path) -> str:
+    with open(os.path.join(path, "name"), "r", encoding="utf-8") as file:
+        return file.read().strip()
+
+
+def list_rapl_zones(rapl_dir=RAPL_DIR) -> list[list[str]]:
+    """
+    Lists the powercap zones (intel-rapl:N) and sub-zones (intel-rapl:N:M).
+
+    :param rapl_dir: The powercap directory.
+    :return: The [zone, name] of every zone, sorted, empty without powercap.
+    """
+    if not os.path.isdir(rapl_dir):
+        return []
+
+    pattern = re.compile(r"intel-rapl:\d+(:\d+)?")
+    return [
+        [zone, read_name(os.path.join(rapl_dir, zone))]
+        for zone in sorted(os.listdir(rapl_dir))
+        if re.fullmatch(pattern, zone)
+    ]
+
+
+def list_hwmon(hwmon_dir=HWMON_DIR) -> list[list[str]]:
+    """
+    Lists the hwmon devices and the driver behind each of them.
+
+    :param hwmon_dir: The hwmon class directory.
+    :return: The [device, driver name] of every readable device, sorted.
+    """
+    if not os.path.isdir(hwmon_dir):
+        return []
+
+    devices = []
+    for hwmon in sorted(os.listdir(hwmon_dir)):
+        try:
+            devices.append([hwmon, read_name(os.path.join(hwmon_dir, hwmon))])
+        except OSError:
+            continue
+
+    return devices
+
+
+def read_dimms(file_path=MEMINFO_FILE) -> dict:
+    """
+    Reads the DIMMs from the output of 'dmidecode -t memory'.
+
+    :param file_path: Where the output of dmidecode was saved.
+    :return: The count, sizes (in GB) and voltages of the DIMMs, or None when the
+        file does not exist.
+    """
+    if not os.path.isfile(file_path):
+        return None
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        file_content = file.read()
+
+    p_speed = re.compile(r"\sSpeed:\s(\d+)\sMT/s")
+    p_size = re.compile(r"\sSize:\s(\d+)\s.B")
+    p_voltage = re.compile(r"\sConfigured\sVoltage:\s(\d+.\d+)\sV")
+
+    dimm_count = sum(1 for x in file_content if p_speed.match(x))
+
+    dimm_size = []
+    voltage = []
+    for line in file_content.splitlines():
+        match = p_size.match(line)
+        if match:
+            split_string = match.group(0).split()
+            if "MB" in split_string:
+                dimm_size.append(int(match.group(1)) / 1024)
+            elif "GB" in split_string:
+                dimm_size.append(match.group(1))
+            else:
+                raise ValueError("Unknown memory size")
+
+        match = p_voltage.match(line)
+        if match:
+            voltage.append(match.group(1))
+
+    return {"count": dimm_count, "size": dimm_size, "voltage": voltage}
+
+
+def host_signature() -> dict:
+    """
+    :return: What identifies this boot of this host, so a persisted inventory is not
+        reused after a reboot or on another node.
+    """
+    boot_id = None
+    if os.path.isfile(BOOT_ID_FILE):
+        with open(BOOT_ID_FILE, "r", encoding="utf-8") as file:
+            boot_id = file.read().strip()
+
+    return {"hostname": platform.node(), "boot_id": boot_id}
+
+
+class Inventory:
+    """
+    The hardware of the host: CPU model and chipset, core counts, RAM, RAPL zones,
+    hwmon devices, NVIDIA GPUs and DIMMs.
+
+    Every item is probed the first time it is needed and then kept for the lifetime
+    of the process. `to_dict()` probes everything and can be persisted, so that the
+    next processes started on the same boot of the host do not probe again.
+    """
+
+    FIELDS = ("cpu", "cores", "ram_gb", "rapl_zones", "hwmon", "gpus", "dimms")
+
+    def __init__(self, rapl_dir=RAPL_DIR, hwmon_dir=HWMON_DIR, meminfo=MEMINFO_FILE):
+        self.rapl_dir = rapl_dir
+        self.hwmon_dir = hwmon_dir
+        self.meminfo = meminfo
+
+    @cached_property
+    def cpu(self) -> dict:
+        return platform_info.get_cpu_model()
+
+    @cached_property
+    def cores(self) -> dict:
+        return {
+            "physical": psutil.cpu_count(logical=False),
+            "logical": psutil.cpu_count(),
+        }
+
+    @cached_property
+    def ram_gb(self) -> float:
+        return platform_info.get_ram()
+
+    @cached_property
+    def rapl_zones(self) -> list[list[str]]:
+        return list_rapl_zones(self.rapl_dir)
+
+    @cached_property
+    def hwmon(self) -> list[list[str]]:
+        return list_hwmon(self.hwmon_dir)
+
+    @cached_property
+    def gpus(self) -> list[dict]:
+        try:
+            import pynvml
+
+            pynvml.nvmlInit()
+        except Exception:  # pylint: disable=broad-except
+            # No NVML library or no NVIDIA driver
+            return []
+
+        gpus = []
+        for index in range(pynvml.nvmlDeviceGetCount()):
+            handle = pynvml.nvmlDeviceGetHandleByIndex(index)
+            name = pynvml.nvmlDeviceGetName(handle)
+            gpus.append(
+                {
+                    "index": index,
+                    "name": name.decode() if isinstance(name, bytes) else name,
+                }
+            )
+        pynvml.nvmlShutdown()
+
+        return gpus
+
+    @cached_property
+    def dimms(self) -> dict:
+        return read_dimms(self.meminfo)
+
+    def cpu_model(self) -> dict:
+        """
+        :return: A copy of the CPU description, as returned by
+            platform_info.get_cpu_model(), that the caller may modify.
+        """
+        return dict(self.cpu) if self.cpu is not None else None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def save(self, file_path: str) -> None:
+        inventory = {
+            "version": INVENTORY_VERSION,
+            "host": host_signature(),
+            "inventory": self.to_dict(),
+        }
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(inventory, file, indent=2)
+
+    @classmethod
+    def load(cls, file_path: str):
+        """
+        :param file_path: A file written by save().
+        :return: The persisted inventory, or None when it is missing or was probed
+            on another boot or host.
+        """
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                inventory = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            inventory.get("version") != INVENTORY_VERSION
+            or inventory.get("host") != host_signature()
+        ):
+            return None
+
+        tmp_inventory = cls()
+        for name in cls.FIELDS:
+            # Pre-fills the cached properties
+            tmp_inventory.__dict__[name] = inventory["inventory"][name]
+
+        return tmp_inventory
+
+
+def get_inventory(cache_dir: str = None) -> Inventory:
+    """
+    Returns the inventory shared by every monitor of the process.
+
+    :param cache_dir: When given, the inventory is loaded from the file persisted in
+        this directory, or persisted there once probed.
+    :return: The inventory of the host.
+    """
+    global _inventory
+
+    file_path = os.path.join(cache_dir, INVENTORY_FILE) if cache_dir else None
+    if _inventory is None and file_path is not None:
+        _inventory = Inventory.load(file_path)
+        if _inventory is not None:
+            custom_logger.info("Hardware inventory loaded from '%s'.", file_path)
+
+    if _inventory is None:
+        _inventory = Inventory()
+
+    if file_path is not None and not os.path.isfile(file_path):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _inventory.save(file_path)
+        except OSError as error:
+            custom_logger.warning("Hardware inventory not persisted: %s", error)
+
+    return _inventory
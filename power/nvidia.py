@@ -1,74 +1,130 @@
-import time
-from threading import Event, Thread
-
 import pynvml
 
 from utils import check_values, log
 
+from .buffer import SampleBuffer
+
 custom_logger = log.get_logger(__name__)
 custom_logger = log.set_level(__name__, "info")
 
+# With hardware energy counters the other GPU metrics are only sampled once per period
+METRICS_PERIOD_S = 1.0
+
+
+class NvidiaGPU:
+    """
+    GPU provider reading every NVIDIA device through NVML.
+
+    Devices exposing a total energy counter (Volta and newer) have their energy
+    read from that counter on every tick, which is exact regardless of the sampling
+    rate. Power, temperature, memory and utilisation are then sampled once per
+    `METRICS_PERIOD_S` only. Devices without a counter fall back to sampling all
+    the metrics on every tick, and their energy is integrated from the power.
+    """
 
-class NvidiaGPU(Thread):
     def __init__(self, sleep_time: int, data_monitor: object):
-        Thread.__init__(self)
-        self._stop_event = Event()
         self.sleep_time = check_values.set_time(sleep_time)
         pynvml.nvmlInit()
         self.device_count = pynvml.nvmlDeviceGetCount()
+        self._handles = [
+            pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(self.device_count)
+        ]
+        self.energy_counters = [self.__has_energy_counter(h) for h in self._handles]
 
-        self.__initialize_attributes()
+        # One buffer per device keeps the series of each GPU apart
+        self.buffers = [SampleBuffer() for _ in self._handles]
+        self.energy_buffers = [SampleBuffer() for _ in self._handles]
         self.data_monitor = data_monitor
 
-    def __initialize_attributes(self) -> None:
-        self._gpu_power_w: list[float] = []
-        self._gpu_temperature_c: list[float] = []
-        self._gpu_memory_free_b: list[float] = []
-        self._gpu_memory_used_b: list[float] = []
-        self._gpu_percent: list[float] = []
+        self.metrics_every = 1
+        if self._handles and all(self.energy_counters):
+            self.metrics_every = max(1, round(METRICS_PERIOD_S / self.sleep_time))
+            custom_logger.info(
+                "GPU energy counters are detected. Metrics sampled every %s tick(s).",
+                self.metrics_every,
+            )
+        self._ticks = 0
+        self._power_w = [None] * self.device_count
+        self._percent = [None] * self.device_count
+        self._last_energy = [None] * self.device_count
+
+    def __has_energy_counter(self, handle) -> bool:
+        try:
+            pynvml.nvmlDeviceGetTotalEnergyConsumption(handle)
+        except pynvml.NVMLError:
+            return False
+
+        return True
 
-    def __gpu_stats(self) -> None:
-        for i in range(self.device_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+    def __gpu_energy(self, timestamp_ns) -> None:
+        for i, handle in enumerate(self._handles):
+            if not self.energy_counters[i]:
+                continue
 
-            self._gpu_power_w.append(pynvml.nvmlDeviceGetPowerUsage(handle))
-            self._gpu_temperature_c.append(
-                pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+            # NVML reports the energy since the driver was loaded in millijoules
+            energy_uj = pynvml.nvmlDeviceGetTotalEnergyConsumption(handle) * 1000
+            self.energy_buffers[i].push((energy_uj, timestamp_ns))
+
+            # The power between two counter readings tracks the activity of the GPU
+            # between the samples of the other metrics
+            if self._last_energy[i] is not None:
+                last_energy_uj, last_timestamp_ns = self._last_energy[i]
+                if timestamp_ns > last_timestamp_ns:
+                    self._power_w[i] = (
+                        (energy_uj - last_energy_uj)
+                        / (timestamp_ns - last_timestamp_ns)
+                        * 1000
+                    )
+            self._last_energy[i] = (energy_uj, timestamp_ns)
+
+    def __gpu_stats(self, timestamp_ns) -> None:
+        for i, handle in enumerate(self._handles):
+            # NVML reports the power in milliwatts
+            power_w = pynvml.nvmlDeviceGetPowerUsage(handle) / 1000
+            temperature = pynvml.nvmlDeviceGetTemperature(
+                handle, pynvml.NVML_TEMPERATURE_GPU
             )
             memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
-            self._gpu_memory_free_b.append(memory.free)
-            self._gpu_memory_used_b.append(memory.used)
-            percent = pynvml.nvmlDeviceGetUtilizationRates(handle)
-            self._gpu_percent.append(percent.gpu)
+            percent = pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+            if not self.energy_counters[i]:
+                self._power_w[i] = power_w
+            self._percent[i] = percent
 
-            custom_logger.debug("Power: %s", pynvml.nvmlDeviceGetPowerUsage(handle))
-            custom_logger.debug(
-                "Temperature: %s",
-                pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU),
+            self.buffers[i].push(
+                (power_w, temperature, memory.free, memory.used, percent, timestamp_ns)
             )
-            custom_logger.debug("Memory: %s", pynvml.nvmlDeviceGetMemoryInfo(handle))
+
             custom_logger.debug(
-                "GPU Percentage: %s%%", pynvml.nvmlDeviceGetUtilizationRates(handle)
+                "GPU %s - Power: %s (W), Temperature: %s, Memory used: %s/%s (B), "
+                "GPU Percentage: %s%%",
+                i,
+                power_w,
+                temperature,
+                memory.used,
+                memory.total,
+                percent,
             )
 
+    def activity(self) -> tuple:
+        """
+        :return: The power (in watts) and the utilisation (in percentage) of every
+            GPU at the latest sample.
+        """
+        return (*self._power_w, *self._percent)
+
     def get_current_stats(self) -> None:
-        values_to_save = (
-            self._gpu_power_w,
-            self._gpu_temperature_c,
-            self._gpu_memory_free_b,
-            self._gpu_memory_used_b,
-            self._gpu_percent,
-        )
-        self.data_monitor.update_values_gpu(values_to_save)
-        self.reset()
-
-    def reset(self) -> None:
-        self.__initialize_attributes()
-
-    def stop(self) -> None:
-        self._stop_event.set()
-
-    def run(self):
-        while not self._stop_event.is_set():
-            self.__gpu_stats()
-            time.sleep(self.sleep_time)
+        for device, buffer in enumerate(self.energy_buffers):
+            columns = buffer.drain_columns()
+            if columns:
+                self.data_monitor.update_values_gpu_energy(columns, device)
+
+        for device, buffer in enumerate(self.buffers):
+            columns = buffer.drain_columns()
+            if columns:
+                self.data_monitor.update_values_gpu(columns, device)
+
+    def sample(self, timestamp_ns: int) -> None:
+        self.__gpu_energy(timestamp_ns)
+        if self._ticks % self.metrics_every == 0:
+            self.__gpu_stats(timestamp_ns)
+        self._ticks += 1
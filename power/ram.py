@@ -1,68 +1,41 @@
-import os
-import re
-import time
-from pathlib import Path
-from threading import Event, Thread
+import numpy as np
 
-from utils import check_values, log, platform_info
+from utils import log
+
+from .inventory import get_inventory
 
 custom_logger = log.get_logger(__name__)
 custom_logger = log.set_level(__name__, "info")
 
 AVG_AMPS_PER_DIMM = 1.3
+# Share of the DIMM power drawn however little memory is in use (refresh and
+# background power), when the estimate is scaled by the memory utilisation
+IDLE_POWER_FRACTION = 0.5
 
 
-class RAM(Thread):
-    def __init__(self, sleep_time: int, data_monitor: object):
-        Thread.__init__(self)
-        self._stop_event = Event()
-        self.sleep_time = check_values.set_time(sleep_time)
-        self.data_monitor = data_monitor
-        self.dimm_count, self.dimm_size, self.voltage = self.__get_dram_dimms()
-        self._ram_power = self.__calculate_power()
+class RAM:
+    """
+    Analytic model of the DRAM power, for platforms without a RAPL dram domain.
 
-        self.__initialize_attributes()
+    The power is computed once from the DIMMs of the host, so nothing is sampled:
+    the energy of a phase is the power multiplied by the measured duration of the
+    phase, scaled by the mean memory utilisation when the CPU monitor recorded it.
+    """
 
-    def __initialize_attributes(self) -> None:
-        self._ram_power_w: list[float] = []
+    def __init__(self):
+        self.dimm_count, self.dimm_size, self.voltage = self.__get_dram_dimms()
+        self.power_w = round(self.__calculate_power(), 2)
 
     def __get_dram_dimms(self):
-        ROOT_DIR = os.path.dirname(Path(__file__).parent)
-        file_path = ROOT_DIR + "/results/meminfo.txt"
-        if not os.path.isfile(file_path):
+        dimms = get_inventory().dimms
+        if dimms is None:
             custom_logger.error(
                 "For accurate results run 'dmidecode -t memory' and save the output to './results/meminfo.txt'"
             )
             custom_logger.warning("Returning some default values for DRAM")
-            return [1], [platform_info.get_ram()], [1.2]
-
-        with open(file_path, "r", encoding="utf-8") as file:
-            file_content = file.read()
-
-        p_speed = re.compile(r"\sSpeed:\s(\d+)\sMT/s")
-        p_size = re.compile(r"\sSize:\s(\d+)\s.B")
-        p_voltage = re.compile(r"\sConfigured\sVoltage:\s(\d+.\d+)\sV")
-
-        dimm_count = sum(1 for x in file_content if p_speed.match(x))
-
-        dimm_size = []
-        voltage = []
-        for line in file_content.splitlines():
-            match = p_size.match(line)
-            if match:
-                split_string = match.group(0).split()
-                if "MB" in split_string:
-                    dimm_size.append(int(match.group(1)) / 1024)
-                elif "GB" in split_string:
-                    dimm_size.append(match.group(1))
-                else:
-                    raise ValueError("Unknown memory size")
+            return [1], [get_inventory().ram_gb], [1.2]
 
-            match = p_voltage.match(line)
-            if match:
-                voltage.append(match.group(1))
-
-        return dimm_count, dimm_size, voltage
+        return dimms["count"], dimms["size"], dimms["voltage"]
 
     def __calculate_power(self):
         voltage = [float(v) for v in self.voltage]
@@ -75,22 +48,60 @@ class RAM(Thread):
 
         return total_power
 
-    def __get_energy(self) -> None:
-        self._ram_power_w.append(round(self._ram_power, 2))
-
-    def reset(self) -> None:
-        self.__initialize_attributes()
-
-    def get_current_stats(self) -> None:
-        values_to_save = self._ram_power_w
-        self.data_monitor.update_values_ram(values_to_save)
-        self.reset()
-
-    def stop(self) -> None:
-        self._stop_event.set()
-
-    def run(self):
-        while not self._stop_event.is_set():
-            self.__get_energy()
+    def energy_j(self, duration_s, memory_percent: float = None):
+        """
+        :param duration_s: The measured duration of the phase (in seconds), or an
+            array of the durations of its steps.
+        :param memory_percent: The mean memory utilisation over the phase (in
+            percentage), or None to assume the DIMMs are fully in use.
+        :return: The estimated energy of the DRAM over the phase, or over each of
+            its steps (in joules).
+        """
+        power_w = self.power_w
+        if memory_percent is not None:
+            power_w *= IDLE_POWER_FRACTION + (1 - IDLE_POWER_FRACTION) * (
+                memory_percent / 100
+            )
 
-            time.sleep(self.sleep_time)
+        if np.ndim(duration_s):
+            return power_w * np.maximum(duration_s, 0)
+
+        return power_w * max(duration_s, 0)
+
+    def add_energy(self, results: dict) -> dict:
+        """
+        Adds the modelled DRAM power and energy to the results of a phase, unless the
+        dram domain was measured.
+
+        :param results: The results of a phase, as returned by
+            DataMonitor.take_results().
+        :return: The results, with the power under 'ram_model_w' and the energy under
+            energy_j['ram'].
+        """
+        if "dram_energy_uj" in results:
+            return results
+
+        duration_s = (results["stop_time"] - results["start_time"]) / 1000
+        results["ram_model_w"] = self.power_w
+        results.setdefault("energy_j", {})["ram"] = self.energy_j(
+            duration_s, mean_memory_percent(results)
+        )
+
+        return results
+
+
+def mean_memory_percent(results: dict) -> float:
+    """
+    :param results: The results of a phase, as returned by
+        DataMonitor.take_results().
+    :return: The mean memory utilisation over the phase (in percentage), or None
+        when it was not recorded.
+    """
+    memory_percent = results.get("cpu_memory_percent")
+    if isinstance(memory_percent, dict):
+        # Summary of a streaming DataMonitor
+        return memory_percent.get("mean")
+    if memory_percent is not None and len(memory_percent):
+        return float(np.mean(memory_percent))
+
+    return None
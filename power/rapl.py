@@ -0,0 +1,334 @@
+import os
+import re
+from dataclasses import dataclass, field
+
+from utils import check_values, log, platform_info
+
+from .buffer import SampleBuffer
+from .inventory import RAPL_DIR, get_inventory, list_rapl_zones
+from .temperature import cpu_temperature_sensors
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+SUBDOMAINS = ("core", "uncore", "dram")
+
+READ_SIZE = 32
+WATT_TO_MICROJOULE = 1000000
+NANOSECONDS = 1000000000
+
+
+class RaplDomain:
+    """
+    A RAPL powercap zone whose `energy_uj` counter is opened once and re-read with
+    pread into a reused buffer, avoiding an open/read/close cycle per sample.
+
+    The raw counter wraps around at `max_energy_range_uj`. Every update corrects
+    the wrap and accumulates the delta into a monotonic total, so the energy of
+    the zone never decreases over a long run.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        energy_file="energy_uj",
+        range_file="max_energy_range_uj",
+    ):
+        self.path = path
+        self.name = name
+        self.max_energy_range_uj = self.__read_max_energy_range(range_file)
+        self.total_uj = 0
+        self._buffer = bytearray(READ_SIZE)
+        self._fd = os.open(os.path.join(path, energy_file), os.O_RDONLY)
+        self._last_uj = self.read_energy_uj()
+
+    def __read_max_energy_range(self, range_file) -> int:
+        if range_file is None:
+            return 0
+
+        try:
+            range_path = os.path.join(self.path, range_file)
+            with open(range_path, "r", encoding="utf-8") as file:
+                return int(file.read())
+        except (FileNotFoundError, PermissionError, ValueError):
+            custom_logger.warning(
+                "Energy range of '%s' unknown. Counter wraps will be ignored.",
+                self.name,
+            )
+            return 0
+
+    @property
+    def energy_j(self) -> float:
+        return self.total_uj / WATT_TO_MICROJOULE
+
+    def read_energy_uj(self) -> int:
+        size = os.preadv(self._fd, [self._buffer], 0)
+        return int(self._buffer[:size])
+
+    def update(self) -> int:
+        """
+        Reads the counter and adds the energy consumed since the previous read to
+        the monotonic total.
+
+        :return: The energy consumed since the previous read (in microjoules).
+        """
+        current_uj = self.read_energy_uj()
+        delta_uj = current_uj - self._last_uj
+
+        if delta_uj < 0:
+            if self.max_energy_range_uj:
+                delta_uj += self.max_energy_range_uj
+                custom_logger.debug("Energy counter of '%s' wrapped.", self.name)
+            else:
+                delta_uj = 0
+
+        self._last_uj = current_uj
+        self.total_uj += delta_uj
+
+        return delta_uj
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+@dataclass
+class RaplZones:
+    """
+    The energy domains discovered on a platform.
+
+    Attributes:
+        packages (list[RaplDomain]): Package domains, summed into the CPU energy.
+        devices (list[str]): Device name of each package (e.g. 'cpu:0').
+        subdomains (dict[str, list[RaplDomain]]): Core, uncore and dram domains.
+        psys (list[RaplDomain]): Platform domains, reported separately.
+    """
+
+    packages: list[RaplDomain] = field(default_factory=lambda: [])
+    devices: list[str] = field(default_factory=lambda: [])
+    subdomains: dict[str, list[RaplDomain]] = field(
+        default_factory=lambda: {name: [] for name in SUBDOMAINS}
+    )
+    psys: list[RaplDomain] = field(default_factory=lambda: [])
+
+    def close(self) -> None:
+        domains = self.packages + self.psys
+        for subdomains in self.subdomains.values():
+            domains.extend(subdomains)
+
+        for domain in domains:
+            domain.close()
+
+
+def open_domain(zone, path, name, **kwargs):
+    try:
+        return RaplDomain(path, name, **kwargs)
+    except PermissionError:
+        custom_logger.warning("No permission to read the energy of '%s'.", zone)
+        return None
+
+
+def find_rapl_zones(rapl_dir=RAPL_DIR, listing=None) -> RaplZones:
+    """
+    Opens the package zones (intel-rapl:N) of the powercap directory and their core,
+    uncore and dram sub-zones (intel-rapl:N:M).
+
+    :param rapl_dir: The powercap directory.
+    :param listing: The [zone, name] of the zones, e.g. from the hardware inventory.
+        The directory is listed when not given.
+    :return: The discovered zones, empty when powercap is not available.
+    """
+    zones = RaplZones()
+    if listing is None:
+        listing = list_rapl_zones(rapl_dir)
+
+    devices_pattern = re.compile(r"intel-rapl:\d+")
+    subdomains_pattern = re.compile(r"intel-rapl:\d+:\d+")
+
+    for zone, name in listing:
+        path = os.path.join(rapl_dir, zone)
+        if re.fullmatch(devices_pattern, zone):
+            domain = open_domain(zone, path, name)
+            if domain is None:
+                continue
+
+            if name == "psys":
+                custom_logger.info("Platform (psys) energy is reported separately.")
+                zones.psys.append(domain)
+            else:
+                zones.packages.append(domain)
+                zones.devices.append("cpu:" + zone.split(":")[-1])
+        elif re.fullmatch(subdomains_pattern, zone):
+            if name not in SUBDOMAINS:
+                custom_logger.debug("Unknown RAPL sub-domain '%s' skipped.", name)
+                continue
+
+            domain = open_domain(zone, path, name)
+            if domain is not None:
+                zones.subdomains[name].append(domain)
+
+    return zones
+
+
+class RaplCPU:
+    """
+    CPU provider reading hardware energy counters. Subclasses discover the energy
+    domains of their platform in `_find_zones`.
+
+    The utilisation is read from `cgroup`, a CgroupStats, when given, and for the
+    whole host otherwise.
+    """
+
+    def __init__(self, sleep_time: int, data_monitor: object, cgroup=None):
+        self.sleep_time = check_values.set_time(sleep_time)
+        self.data_monitor = data_monitor
+        self.cgroup = cgroup
+
+        self.buffer = SampleBuffer()
+        self.platform = get_inventory().cpu_model()
+        self._temperature = cpu_temperature_sensors()
+        self._last_timestamp_ns = None
+        self._activity = (None, None)
+
+        zones = self._find_zones()
+        self._zones = zones
+        self._rapl_devices = zones.packages
+        self._devices = zones.devices
+        self._subdomains = zones.subdomains
+        self._psys_devices = zones.psys
+
+    def _find_zones(self) -> RaplZones:
+        raise NotImplementedError
+
+    def __update_domains(self, domains) -> tuple[int, int]:
+        delta_energy_uj = 0
+        energy_uj = 0
+        for domain in domains:
+            delta_energy_uj += domain.update()
+            energy_uj += domain.total_uj
+
+        return delta_energy_uj, energy_uj
+
+    def __get_subdomain_energy(self, timestamp_ns) -> tuple:
+        subdomain_energy_uj = {name: None for name in SUBDOMAINS}
+        dram_power_w = None
+        for name, domains in self._subdomains.items():
+            if not domains:
+                continue
+
+            delta_energy_uj, subdomain_energy_uj[name] = self.__update_domains(domains)
+            if name == "dram":
+                dram_power_w = self.__delta_power(delta_energy_uj, timestamp_ns)
+
+        psys_energy_uj = None
+        if self._psys_devices:
+            psys_energy_uj = self.__update_domains(self._psys_devices)[1]
+
+        return (
+            subdomain_energy_uj["core"],
+            subdomain_energy_uj["uncore"],
+            subdomain_energy_uj["dram"],
+            psys_energy_uj,
+            dram_power_w,
+        )
+
+    def __get_energy(self, timestamp_ns) -> tuple:
+        delta_energy_uj, cpu_energy_uj = self.__update_domains(self._rapl_devices)
+        subdomains = self.__get_subdomain_energy(timestamp_ns)
+
+        delta_power_w = self.__delta_power(delta_energy_uj, timestamp_ns)
+        self._last_timestamp_ns = timestamp_ns
+
+        custom_logger.debug("CPU energy consumption (uj): %s", cpu_energy_uj)
+        return cpu_energy_uj, delta_power_w, subdomains
+
+    def __delta_power(self, delta_energy_uj, timestamp_ns) -> int:
+        if (
+            self._last_timestamp_ns is not None
+            and timestamp_ns > self._last_timestamp_ns
+        ):
+            joules = delta_energy_uj / WATT_TO_MICROJOULE
+            watt = joules / ((timestamp_ns - self._last_timestamp_ns) / NANOSECONDS)
+
+            custom_logger.debug("CPU power consumption (w): %s", watt)
+            return watt
+
+        return 0
+
+    def __get_utilisation(self) -> tuple[float, float]:
+        if self.cgroup is not None:
+            return self.cgroup.utilisation()
+
+        per_cpu, mem_usage = platform_info.cpu_utilisation()
+
+        return sum(per_cpu) / len(per_cpu), mem_usage.percent
+
+    def __get_temperature(self) -> float:
+        if self._temperature.available():
+            return self._temperature.read()
+
+        return platform_info.cpu_temperature(self.platform["system_os"])
+
+    def rapl_devices_exist(self) -> None:
+        if not self._rapl_devices:
+            return False
+
+        return True
+
+    def dram_domain_exists(self) -> bool:
+        return bool(self._subdomains["dram"])
+
+    def package_energy_j(self) -> dict:
+        return {
+            device: package.energy_j
+            for device, package in zip(self._devices, self._rapl_devices)
+        }
+
+    def activity(self) -> tuple[float, float]:
+        """
+        :return: The power (in watts) and the utilisation (in percentage) of the
+            latest sample.
+        """
+        return self._activity
+
+    def close(self) -> None:
+        self._zones.close()
+        self._temperature.close()
+
+    def get_current_stats(self) -> None:
+        columns = self.buffer.drain_columns()
+        if not columns:
+            return
+
+        self.data_monitor.update_values_cpu(columns[:6])
+        self.data_monitor.update_values_rapl(
+            tuple(
+                values if domains else ()
+                for values, domains in zip(
+                    columns[6:10],
+                    (*self._subdomains.values(), self._psys_devices),
+                )
+            )
+        )
+        if self._subdomains["dram"]:
+            self.data_monitor.update_values_ram(columns[10], columns[5])
+
+    def sample(self, timestamp_ns: int) -> None:
+        cpu_percent, memory_percent = self.__get_utilisation()
+        energy_uj, delta_power_w, subdomains = self.__get_energy(timestamp_ns)
+        temperature = self.__get_temperature()
+        self._activity = (delta_power_w, cpu_percent)
+
+        self.buffer.push(
+            (
+                energy_uj,
+                delta_power_w,
+                cpu_percent,
+                memory_percent,
+                temperature,
+                timestamp_ns,
+                *subdomains,
+            )
+        )
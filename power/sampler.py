@@ -0,0 +1,73 @@
+import time
+from threading import Event, Thread
+
+from utils import check_values, log
+
+from .scheduler import DeadlineScheduler
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+
+class Sampler(Thread):
+    """
+    Single sampling engine polling every registered source in one pass.
+
+    Sources are passive providers exposing `sample(timestamp_ns)`, which reads the
+    device once and pushes a row into the source's SampleBuffer, and
+    `get_current_stats()`, which drains that buffer into the DataMonitor. All
+    sources polled during a tick share the same timestamp, and ticks are paced by a
+    DeadlineScheduler so the period does not drift.
+
+    With an AdaptivePolicy, each source is only sampled on the ticks the policy
+    finds it due, and the CPU time of every sample is reported back to the policy.
+    """
+
+    def __init__(self, sleep_time: float, data_monitor: object, policy=None):
+        Thread.__init__(self, name="sampler")
+        self._stop_event = Event()
+        self.sleep_time = check_values.set_time(sleep_time)
+        self.data_monitor = data_monitor
+        self.scheduler = DeadlineScheduler(self.sleep_time)
+        self.policy = policy
+        self._sources = []
+        self._ticks = 0
+
+    def register(self, source: object) -> None:
+        if source not in self._sources:
+            self._sources.append(source)
+
+    def sources(self) -> list:
+        return list(self._sources)
+
+    def tick(self, timestamp_ns: int = None, interval_ns: int = 0) -> None:
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+
+        for source in self._sources:
+            if self.policy is None:
+                source.sample(timestamp_ns)
+            elif self.policy.due(source, self._ticks):
+                start_ns = time.thread_time_ns()
+                source.sample(timestamp_ns)
+                self.policy.observe(
+                    source, time.thread_time_ns() - start_ns, self._ticks
+                )
+        self._ticks += 1
+
+        self.data_monitor.update_values_time(timestamp_ns, interval_ns)
+        for source in self._sources:
+            source.get_current_stats()
+
+    def jitter_stats(self) -> dict:
+        return self.scheduler.jitter_stats()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self):
+        custom_logger.debug("Sampling %s source(s)", len(self._sources))
+        self.scheduler.start()
+        while not self._stop_event.is_set():
+            self.tick(*self.scheduler.tick())
+            self._stop_event.wait(self.scheduler.time_to_next())
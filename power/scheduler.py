@@ -0,0 +1,96 @@
+import math
+import time
+from array import array
+
+NANOSECONDS = 1000000000
+NANOSECONDS_TO_MILLISECONDS = 1000000
+
+
+def percentile(values, q: float) -> float:
+    """
+    Nearest-rank percentile of a sequence of values.
+
+    :param values: The values to inspect.
+    :param q: The percentile to return, between 0 and 100.
+    :return: The percentile, or 0 if no values are given.
+    """
+    if not values:
+        return 0
+
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100.0 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class DeadlineScheduler:
+    """
+    Runs ticks against absolute monotonic deadlines instead of sleeping a fixed
+    amount after each tick, so the sampling cost does not stretch the period.
+
+    When a tick starts after the next deadline has already passed, the missed
+    deadlines are coalesced into a single immediate tick and counted in
+    `missed_ticks`. The lateness of every tick against its deadline is kept to
+    report the sampler's jitter.
+    """
+
+    def __init__(self, period_s: float, clock=time.monotonic_ns):
+        self.period_ns = int(round(period_s * NANOSECONDS))
+        self.missed_ticks = 0
+        self._clock = clock
+        self._deadline_ns = None
+        self._last_tick_ns = None
+        self._lateness_ns = array("q")
+
+    def start(self) -> None:
+        self._deadline_ns = self._clock()
+        self._last_tick_ns = None
+
+    def tick(self) -> tuple[int, int]:
+        """
+        Marks the beginning of a tick.
+
+        :return: Tuple of the tick timestamp and the elapsed time since the previous
+            tick (0 for the first one), both in nanoseconds.
+        """
+        if self._deadline_ns is None:
+            self.start()
+
+        now = self._clock()
+        self._lateness_ns.append(max(now - self._deadline_ns, 0))
+
+        interval = 0 if self._last_tick_ns is None else now - self._last_tick_ns
+        self._last_tick_ns = now
+
+        return now, interval
+
+    def time_to_next(self) -> float:
+        """
+        Advances to the next deadline, skipping the ones that were already missed.
+
+        :return: Seconds to wait until the next deadline.
+        """
+        self._deadline_ns += self.period_ns
+        now = self._clock()
+
+        if now > self._deadline_ns:
+            missed = (now - self._deadline_ns) // self.period_ns
+            self._deadline_ns += missed * self.period_ns
+            self.missed_ticks += missed
+            return 0
+
+        return (self._deadline_ns - now) / NANOSECONDS
+
+    def jitter_stats(self) -> dict:
+        """
+        Summarises how late the ticks started compared to their deadlines.
+
+        :return: Dictionary with the tick counts and the lateness percentiles (in ms).
+        """
+        lateness = self._lateness_ns
+        return {
+            "ticks": len(lateness),
+            "missed_ticks": self.missed_ticks,
+            "lateness_p50_ms": percentile(lateness, 50) / NANOSECONDS_TO_MILLISECONDS,
+            "lateness_p99_ms": percentile(lateness, 99) / NANOSECONDS_TO_MILLISECONDS,
+            "lateness_max_ms": max(lateness, default=0) / NANOSECONDS_TO_MILLISECONDS,
+        }
@@ -0,0 +1,95 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils import log
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+RING_CAPACITY = 1 << 18
+RECORD_WIDTH = 5
+HEADER_SIZE = 64
+
+# A record holds one sample of a source: the kind of handoff it replays (see
+# power.daemon), the device index for per-device series, its timestamp and up to
+# RECORD_WIDTH values
+RECORD = np.dtype(
+    [
+        ("kind", np.int8),
+        ("device", np.int16),
+        ("timestamp_ns", np.int64),
+        ("values", np.float64, (RECORD_WIDTH,)),
+    ],
+    align=True,
+)
+
+
+class SampleRing:
+    """
+    Single-producer/single-consumer ring buffer of sample records in a
+    `multiprocessing.shared_memory` block.
+
+    The header holds the number of records ever written. The producer copies new
+    records into the ring and only then publishes the new count, so the consumer
+    never reads a partially written record. A consumer falling more than `capacity`
+    records behind loses the oldest ones, which are counted in `lost`.
+    """
+
+    def __init__(self, name: str = None, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD.itemsize
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+
+        self.name = self._shm.name
+        self._count = np.ndarray((1,), np.int64, self._shm.buf, 0)
+        self._records = np.ndarray((capacity,), RECORD, self._shm.buf, HEADER_SIZE)
+        if self._owner:
+            self._count[0] = 0
+        self._read = int(self._count[0])
+        self.lost = 0
+
+    def write(self, records: np.ndarray) -> None:
+        count = int(self._count[0])
+        for start in range(0, len(records), self.capacity):
+            chunk = records[start : start + self.capacity]
+            index = count % self.capacity
+            head = min(len(chunk), self.capacity - index)
+            self._records[index : index + head] = chunk[:head]
+            self._records[: len(chunk) - head] = chunk[head:]
+            count += len(chunk)
+
+        self._count[0] = count
+
+    def read(self) -> np.ndarray:
+        """
+        Copies the records written since the previous read.
+
+        :return: A structured array of RECORD, oldest first.
+        """
+        count = int(self._count[0])
+        start = max(self._read, count - self.capacity)
+        self.lost += start - self._read
+
+        indexes = np.arange(start, count) % self.capacity
+        records = self._records[indexes]
+
+        # Drop the records the producer overwrote while they were being copied
+        overwritten = min(int(self._count[0]) - self.capacity - start, len(records))
+        if overwritten > 0:
+            records = records[overwritten:]
+            self.lost += overwritten
+
+        self._read = count
+        return records
+
+    def close(self) -> None:
+        del self._count, self._records
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -1,6 +1,83 @@
 import threading
 import time
 from dataclasses import dataclass, field
+from itertools import repeat
+
+import numpy as np
+
+from .aggregates import StreamingColumn
+from .columns import Column, DeviceColumns
+from .integrate import interval_energy, phase_energy, summary_energy
+
+SERIES = (Column, StreamingColumn, DeviceColumns)
+
+# Series holding the timestamps of the samples of every series, by prefix
+TIMESTAMPS = {
+    "sample_": "sample_time_ns",
+    "cpu_": "cpu_time_ns",
+    "dram_": "cpu_time_ns",
+    "psys_": "cpu_time_ns",
+    "gpu_energy_": "gpu_energy_time_ns",
+    "gpu_": "gpu_time_ns",
+    "ram_": "ram_time_ns",
+}
+
+
+def timestamps_of(name: str) -> str:
+    """
+    :param name: The name of a monitored series.
+    :return: The name of the series holding the timestamps of its samples.
+    """
+    return next(
+        time_name for prefix, time_name in TIMESTAMPS.items() if name.startswith(prefix)
+    )
+
+
+def time_slice(
+    values: np.ndarray,
+    timestamps_ns: np.ndarray,
+    start_ns: int,
+    stop_ns: int,
+    edges: bool = False,
+):
+    """
+    :param values: The samples of a series.
+    :param timestamps_ns: The sorted timestamps of the samples (in nanoseconds).
+    :param start_ns: The first timestamp to keep.
+    :param stop_ns: The last timestamp to keep.
+    :param edges: Also keep the last sample before start_ns and the first one after
+        stop_ns, to interpolate the series at the two timestamps.
+    :return: A view of the samples taken between the two timestamps.
+    """
+    first = np.searchsorted(timestamps_ns, start_ns, side="left")
+    last = np.searchsorted(timestamps_ns, stop_ns, side="right")
+    if edges:
+        first = max(first - 1, 0)
+        last = min(last + 1, len(timestamps_ns))
+    return values[first:last]
+
+
+def sample_rows(views: dict):
+    """
+    :param views: Monitored series by name, e.g. from DataMonitor.phase_views().
+    :return: An iterator over the samples of every series but the timestamps, as
+        (series, device, timestamp_ns, value) rows, the device being None for the
+        series of the host.
+    """
+    for name, view in views.items():
+        timestamps = views.get(timestamps_of(name))
+        if name == timestamps_of(name) or timestamps is None:
+            continue
+
+        devices = view if isinstance(view, dict) else {None: view}
+        for device, values in devices.items():
+            timestamps_ns = timestamps if device is None else timestamps.get(device)
+            if timestamps_ns is None or len(timestamps_ns) != len(values):
+                continue
+
+            yield from zip(
+                repeat(name), repeat(device), timestamps_ns.tolist(), values.tolist()
+            )
 
 
 @dataclass
@@ -8,57 +85,136 @@ class DataMonitor:
     """
     A class for storing the monitoring data related to CPU, GPU, and RAM.
 
+    Every monitored series is stored in its own Column, a preallocated NumPy buffer.
+    Timestamps and intervals are int64 columns, all the other metrics float64. GPU
+    metrics are kept in DeviceColumns, one series per GPU index.
+
+    In streaming mode the series are StreamingColumns instead: only running
+    aggregates (and optionally the last `keep_last` samples) are kept, so memory
+    stays bounded however long a phase lasts.
+
     Attributes:
         start_time (int): The start time of the monitoring.
         stop_time (int): The stop time of the monitoring.
-        cpu_energy_uj (list[float]): Energy consumption of the CPU (in microjoules).
-        cpu_delta_power_w (list[float]): Change in CPU power consumption (in watts).
-        cpu_percent (list[float]): CPU utilization (in percentage).
-        cpu_memory_percent (list[float]): Memory utilization percentage of the CPU (in percentage).
-        cpu_temperature_c (list[float]): Temperature of the CPU (in degrees Celsius).
-        gpu_power_w (list[float]): Power consumption of the GPU (in watts).
-        gpu_temperature_c (list[float]): Temperature of the GPU (in degrees Celsius).
-        gpu_memory_free_b (list[float]): Free memory of the GPU (in bytes).
-        gpu_memory_used_b (list[float]): Used memory of the GPU (in bytes).
-        gpu_percent (list[float]): GPU utilization (in percentage).
-        ram_power_w (list[float]):Power consumption of the DRAM in watts.
+        sample_time_ns (Column[int64]): Monotonic timestamp of each sampling tick (in nanoseconds).
+        sample_interval_ns (Column[int64]): Measured time elapsed since the previous tick (in nanoseconds).
+        cpu_time_ns (Column[int64]): Monotonic timestamp of each CPU sample (in nanoseconds).
+        cpu_energy_uj (Column[float64]): Energy consumption of the CPU (in microjoules).
+        cpu_delta_power_w (Column[float64]): Change in CPU power consumption (in watts).
+        cpu_percent (Column[float64]): CPU utilization (in percentage).
+        cpu_memory_percent (Column[float64]): Memory utilization percentage of the CPU (in percentage).
+        cpu_temperature_c (Column[float64]): Temperature of the CPU (in degrees Celsius).
+        cpu_core_energy_uj (Column[float64]): Energy consumption of the RAPL core domain (in microjoules).
+        cpu_uncore_energy_uj (Column[float64]): Energy consumption of the RAPL uncore domain (in microjoules).
+        dram_energy_uj (Column[float64]): Energy consumption of the RAPL dram domain (in microjoules).
+        psys_energy_uj (Column[float64]): Energy consumption of the RAPL platform domain (in microjoules).
+        gpu_time_ns (DeviceColumns[int64]): Monotonic timestamp of each GPU sample, per GPU (in nanoseconds).
+        gpu_power_w (DeviceColumns[float64]): Power consumption of each GPU (in watts).
+        gpu_temperature_c (DeviceColumns[float64]): Temperature of each GPU (in degrees Celsius).
+        gpu_memory_free_b (DeviceColumns[float64]): Free memory of each GPU (in bytes).
+        gpu_memory_used_b (DeviceColumns[float64]): Used memory of each GPU (in bytes).
+        gpu_percent (DeviceColumns[float64]): Utilization of each GPU (in percentage).
+        gpu_energy_time_ns (DeviceColumns[int64]): Monotonic timestamp of each GPU energy counter reading (in nanoseconds).
+        gpu_energy_uj (DeviceColumns[float64]): Energy counter of each GPU supporting one (in microjoules).
+        ram_time_ns (Column[int64]): Monotonic timestamp of each measured DRAM power sample (in nanoseconds).
+        ram_power_w (Column[float64]): Power consumption of the DRAM measured by the RAPL dram domain (in watts).
         lock (threading.Lock): Thread lock for ensuring thread-safe operations.
+        streaming (bool): Keep running aggregates instead of the raw samples.
+        keep_last (int): Number of raw samples kept per series in streaming mode.
 
     Methods:
-        reset_values(): Resets all monitored values to empty lists.
+        reset_values(): Resets all monitored values to empty columns.
+        update_values_time(timestamp_ns: int, interval_ns: int): Records the timestamp and interval of a sampling tick.
         update_values_cpu(lists: tuple[list[float], list[float], list[float], list[float]]): Updates CPU-related values.
-        update_values_gpu(lists: tuple[list[float], list[float], list[float], list[float], list[float]]): Updates GPU-related values.
-        update_values_ram(lists: tuple[list[float]]): Updates RAM-related values.
+        update_values_rapl(lists: tuple[list[float], list[float], list[float], list[float]]): Updates RAPL sub-domain values.
+        update_values_gpu(lists: tuple[list[float], list[float], list[float], list[float], list[float]], device: int): Updates the values of a GPU.
+        update_values_gpu_energy(lists: tuple[list[float], list[int]], device: int): Updates the energy counter of a GPU.
+        update_values_ram(values: list[float], timestamps: list[int]): Updates RAM-related values.
         set_start_time(): Sets the start time of the monitoring.
         set_stop_time(): Sets the stop time of the monitoring.
         construct_results() -> dict: Constructs a dictionary containing the monitored data.
+        take_results() -> dict: Constructs the results and resets the columns atomically.
+        phase_results(start_ns: int, stop_ns: int) -> dict: Constructs the results of the samples taken between two timestamps.
+        phase_views(start_ns: int, stop_ns: int) -> dict: Exports the samples taken between two timestamps without copying them.
+        discard_before(timestamp_ns: int): Drops the samples taken before a timestamp.
+        views() -> dict: Exports the monitored series as NumPy arrays without copying.
+        summaries() -> dict: Returns the running aggregates of the monitored series.
 
     """
 
     start_time: int = 0
     stop_time: int = 0
-    cpu_energy_uj: list[float] = field(default_factory=lambda: [])
-    cpu_delta_power_w: list[float] = field(default_factory=lambda: [])
-    cpu_percent: list[float] = field(default_factory=lambda: [])
-    cpu_memory_percent: list[float] = field(default_factory=lambda: [])
-    cpu_temperature_c: list[float] = field(default_factory=lambda: [])
-    gpu_power_w: list[float] = field(default_factory=lambda: [])
-    gpu_temperature_c: list[float] = field(default_factory=lambda: [])
-    gpu_memory_free_b: list[float] = field(default_factory=lambda: [])
-    gpu_memory_used_b: list[float] = field(default_factory=lambda: [])
-    gpu_percent: list[float] = field(default_factory=lambda: [])
-    ram_power_w: list[float] = field(default_factory=lambda: [])
+    sample_time_ns: Column = field(default_factory=lambda: Column(np.int64))
+    sample_interval_ns: Column = field(default_factory=lambda: Column(np.int64))
+    cpu_time_ns: Column = field(default_factory=lambda: Column(np.int64))
+    cpu_energy_uj: Column = field(default_factory=Column)
+    cpu_delta_power_w: Column = field(default_factory=Column)
+    cpu_percent: Column = field(default_factory=Column)
+    cpu_memory_percent: Column = field(default_factory=Column)
+    cpu_temperature_c: Column = field(default_factory=Column)
+    cpu_core_energy_uj: Column = field(default_factory=Column)
+    cpu_uncore_energy_uj: Column = field(default_factory=Column)
+    dram_energy_uj: Column = field(default_factory=Column)
+    psys_energy_uj: Column = field(default_factory=Column)
+    gpu_time_ns: DeviceColumns = field(default_factory=lambda: DeviceColumns(np.int64))
+    gpu_power_w: DeviceColumns = field(default_factory=DeviceColumns)
+    gpu_temperature_c: DeviceColumns = field(default_factory=DeviceColumns)
+    gpu_memory_free_b: DeviceColumns = field(default_factory=DeviceColumns)
+    gpu_memory_used_b: DeviceColumns = field(default_factory=DeviceColumns)
+    gpu_percent: DeviceColumns = field(default_factory=DeviceColumns)
+    gpu_energy_time_ns: DeviceColumns = field(
+        default_factory=lambda: DeviceColumns(np.int64)
+    )
+    gpu_energy_uj: DeviceColumns = field(default_factory=DeviceColumns)
+    ram_time_ns: Column = field(default_factory=lambda: Column(np.int64))
+    ram_power_w: Column = field(default_factory=Column)
     lock: threading.Lock = field(default_factory=threading.Lock)
+    streaming: bool = False
+    keep_last: int = 0
+
+    def __post_init__(self):
+        self._tick_ns = None
+        if not self.streaming:
+            return
+
+        for attr_name, attr_value in list(self.__dict__.items()):
+            if isinstance(attr_value, Column):
+                setattr(
+                    self,
+                    attr_name,
+                    self.__streaming_column(attr_name)(attr_value.dtype),
+                )
+            elif isinstance(attr_value, DeviceColumns):
+                attr_value.factory = self.__streaming_column(attr_name)
+
+    def __streaming_column(self, name):
+        def factory(dtype):
+            return StreamingColumn(
+                name, dtype, self.keep_last, clock=lambda: self._tick_ns
+            )
+
+        return factory
 
     def reset_values(self):
         """
-        Resets all monitored values to empty lists.
+        Resets all monitored values to empty columns.
         """
         with self.lock:
             self.start_time = round(time.time_ns() / 1000000)
-            for attr_name, attr_value in self.__dict__.items():
-                if isinstance(attr_value, list):
-                    setattr(self, attr_name, attr_value.__class__())
+            self.__clear()
+
+    def update_values_time(self, timestamp_ns: int, interval_ns: int = 0) -> None:
+        """
+        Records the timestamp shared by all the sources polled during a sampling tick.
+
+        Args:
+        - timestamp_ns (int): The monotonic timestamp of the tick (in nanoseconds).
+        - interval_ns (int): The measured time since the previous tick (in nanoseconds).
+        """
+        with self.lock:
+            self._tick_ns = timestamp_ns
+            self.sample_time_ns.append(timestamp_ns)
+            self.sample_interval_ns.append(interval_ns)
 
     def update_values_cpu(
         self, lists: tuple[list[float], list[float], list[float], list[float]]
@@ -72,6 +228,8 @@ class DataMonitor:
           - lists[1]: Change in CPU power consumption over time.
           - lists[2]: CPU utilization percentage over time.
           - lists[3]: Memory utilization percentage of the CPU over time.
+          - lists[4]: CPU temperature over time.
+          - lists[5]: Monotonic timestamp of each sample (in nanoseconds).
         """
         with self.lock:
             try:
@@ -80,47 +238,93 @@ class DataMonitor:
                 self.cpu_percent.extend(lists[2])
                 self.cpu_memory_percent.extend(lists[3])
                 self.cpu_temperature_c.extend(lists[4])
+                self.cpu_time_ns.extend(lists[5])
+            except IndexError:
+                return
+
+    def update_values_rapl(
+        self, lists: tuple[list[float], list[float], list[float], list[float]]
+    ) -> None:
+        """
+        Updates the RAPL sub-domain values with the provided lists. Domains missing on
+        the platform are given as empty lists.
+
+        Args:
+        - lists (tuple[list[float], list[float], list[float], list[float]]): A tuple containing lists of RAPL energy values:
+          - lists[0]: Energy consumption of the core domain over time.
+          - lists[1]: Energy consumption of the uncore domain over time.
+          - lists[2]: Energy consumption of the dram domain over time.
+          - lists[3]: Energy consumption of the platform (psys) domain over time.
+        """
+        with self.lock:
+            try:
+                self.cpu_core_energy_uj.extend(lists[0])
+                self.cpu_uncore_energy_uj.extend(lists[1])
+                self.dram_energy_uj.extend(lists[2])
+                self.psys_energy_uj.extend(lists[3])
             except IndexError:
                 return
 
     def update_values_gpu(
         self,
         lists: tuple[list[float], list[float], list[float], list[float], list[float]],
+        device: int = 0,
     ) -> None:
         """
-        Updates the GPU-related values with the provided lists.
+        Updates the values of one GPU with the provided lists.
 
         Args:
+        - device (int): The index of the GPU the samples were read from.
         - lists (tuple[list[float], list[float], list[float], list[float], list[float]]): A tuple containing lists of GPU-related values:
           - lists[0]: GPU power consumption over time.
           - lists[1]: GPU temperature over time.
           - lists[2]: Free memory of the GPU over time.
           - lists[3]: Used memory of the GPU over time.
           - lists[4]: GPU utilization percentage over time.
+          - lists[5]: Monotonic timestamp of each sample (in nanoseconds).
         """
         with self.lock:
             try:
-                self.gpu_power_w.extend(lists[0])
-                self.gpu_temperature_c.extend(lists[1])
-                self.gpu_memory_free_b.extend(lists[2])
-                self.gpu_memory_used_b.extend(lists[3])
-                self.gpu_percent.extend(lists[4])
+                self.gpu_power_w.extend(device, lists[0])
+                self.gpu_temperature_c.extend(device, lists[1])
+                self.gpu_memory_free_b.extend(device, lists[2])
+                self.gpu_memory_used_b.extend(device, lists[3])
+                self.gpu_percent.extend(device, lists[4])
+                self.gpu_time_ns.extend(device, lists[5])
             except IndexError:
                 return
 
-    def update_values_ram(self, lists: tuple[list[float]]) -> None:
+    def update_values_gpu_energy(
+        self, lists: tuple[list[float], list[int]], device: int = 0
+    ) -> None:
         """
-        Updates the RAM-related values with the provided list.
+        Updates the energy counter readings of one GPU with the provided lists.
 
         Args:
-        - lists (tuple[list[float]]): A tuple containing a list of RAM power consumption over time.
+        - lists (tuple[list[float], list[int]]): A tuple containing lists of GPU energy values:
+          - lists[0]: Energy counter of the GPU over time (in microjoules).
+          - lists[1]: Monotonic timestamp of each reading (in nanoseconds).
+        - device (int): The index of the GPU the readings were taken from.
         """
         with self.lock:
             try:
-                self.ram_power_w.append(lists[0])
+                self.gpu_energy_uj.extend(device, lists[0])
+                self.gpu_energy_time_ns.extend(device, lists[1])
             except IndexError:
                 return
 
+    def update_values_ram(self, values: list[float], timestamps: list[int]) -> None:
+        """
+        Updates the RAM-related values with the provided lists.
+
+        Args:
+        - values (list[float]): A list of RAM power consumption over time.
+        - timestamps (list[int]): The monotonic timestamp of each sample (in nanoseconds).
+        """
+        with self.lock:
+            self.ram_power_w.extend(values)
+            self.ram_time_ns.extend(timestamps)
+
     def set_start_time(self) -> None:
         """
         Sets the start time of the monitoring process.
@@ -138,17 +342,208 @@ class DataMonitor:
         Constructs a dictionary containing the monitored data.
 
         Returns:
-        - dict: A dictionary containing the monitored data. The keys are the attribute names, and the values are the corresponding lists of values.
+        - dict: A dictionary containing the monitored data. The keys are the attribute names, and the values are the corresponding lists of values, or their summaries in streaming mode. The energy of each source over the phase is stored under 'energy_j'.
+        """
+        if self.start_time > self.stop_time:
+            raise ValueError("The stop time is older than the start time")
+
+        with self.lock:
+            return self.__results()
+
+    def take_results(self) -> dict:
+        """
+        Constructs the results of the phase and empties the columns in the same
+        critical section, so every sample handed over concurrently ends up either in
+        these results or in the next ones.
+
+        Returns:
+        - dict: The monitored data, as returned by construct_results().
         """
-        tmp_dict = {}
         if self.start_time > self.stop_time:
             raise ValueError("The stop time is older than the start time")
 
         with self.lock:
+            tmp_dict = self.__results()
+            self.__clear()
+            self.start_time = round(time.time_ns() / 1000000)
+
+        return tmp_dict
+
+    def phase_results(self, start_ns: int, stop_ns: int) -> dict:
+        """
+        Constructs the results of the samples taken between two timestamps, without
+        clearing anything, so phases can overlap or nest. Not available in streaming
+        mode, where only the running aggregates are kept.
+
+        Args:
+        - start_ns (int): The monotonic timestamp the phase started at (in nanoseconds).
+        - stop_ns (int): The monotonic timestamp the phase stopped at (in nanoseconds).
+
+        Returns:
+        - dict: The monitored data of the phase, as returned by construct_results(), without the start and stop times. The energy is interpolated at start_ns and stop_ns from the samples around them.
+        """
+        views = self.phase_views(start_ns, stop_ns)
+        edge_views = self.phase_views(start_ns, stop_ns, edges=True)
+
+        tmp_dict = {}
+        for attr_name, view in views.items():
+            if isinstance(view, dict):
+                tmp_dict[attr_name] = {
+                    str(device): values.tolist() for device, values in view.items()
+                }
+            else:
+                tmp_dict[attr_name] = view.tolist()
+        tmp_dict["energy_j"] = interval_energy(edge_views, start_ns, stop_ns)
+
+        return tmp_dict
+
+    def phase_views(self, start_ns: int, stop_ns: int, edges: bool = False) -> dict:
+        """
+        Exports the samples taken between two timestamps without copying them. Not
+        available in streaming mode.
+
+        Args:
+        - start_ns (int): The first monotonic timestamp to keep (in nanoseconds).
+        - stop_ns (int): The last monotonic timestamp to keep (in nanoseconds).
+        - edges (bool): Also keep the last sample before start_ns and the first one after stop_ns.
+
+        Returns:
+        - dict: Read-only NumPy views of the non-empty series, as returned by views().
+        """
+        if self.streaming:
+            raise ValueError("Streaming statistics cannot be sliced by phase")
+
+        with self.lock:
+            return self.__sliced_views(start_ns, stop_ns, edges)
+
+    def __sliced_views(self, start_ns, stop_ns, edges) -> dict:
+        tmp_dict = {}
+        for attr_name, view in self.__views().items():
+            timestamps = getattr(self, timestamps_of(attr_name))
+            if isinstance(view, dict):
+                view = {
+                    device: time_slice(
+                        values, timestamps[device].view(), start_ns, stop_ns, edges
+                    )
+                    for device, values in view.items()
+                    if device in timestamps.devices()
+                }
+                view = {
+                    device: values for device, values in view.items() if len(values)
+                }
+            else:
+                view = time_slice(view, timestamps.view(), start_ns, stop_ns, edges)
+
+            if len(view):
+                tmp_dict[attr_name] = view
+
+        return tmp_dict
+
+    def discard_before(self, timestamp_ns: int) -> None:
+        """
+        Drops the samples taken before a timestamp, e.g. once every phase they
+        belong to was saved. Samples handed over concurrently are newer and kept.
+
+        Args:
+        - timestamp_ns (int): The monotonic timestamp of the oldest sample to keep (in nanoseconds).
+        """
+        if self.streaming:
+            return
+
+        with self.lock:
+            # Counted before any timestamp series is itself discarded
+            counts = {}
             for attr_name, attr_value in self.__dict__.items():
-                if attr_name is not "lock" and (
-                    attr_value or any(value != 0 for value in attr_value)
-                ):
-                    tmp_dict[attr_name] = attr_value
+                if not isinstance(attr_value, SERIES) or not len(attr_value):
+                    continue
+
+                timestamps = getattr(self, timestamps_of(attr_name))
+                if isinstance(attr_value, DeviceColumns):
+                    counts[attr_name] = {
+                        device: int(
+                            np.searchsorted(timestamps[device].view(), timestamp_ns)
+                        )
+                        for device in timestamps.devices()
+                    }
+                else:
+                    counts[attr_name] = int(
+                        np.searchsorted(timestamps.view(), timestamp_ns)
+                    )
+
+            for attr_name, count in counts.items():
+                attr_value = getattr(self, attr_name)
+                if isinstance(count, dict):
+                    for device, device_count in count.items():
+                        attr_value.discard(device, device_count)
+                else:
+                    attr_value.discard(count)
+
+    def __results(self) -> dict:
+        tmp_dict = {}
+        for attr_name, attr_value in self.__dict__.items():
+            if isinstance(attr_value, StreamingColumn):
+                if len(attr_value):
+                    tmp_dict[attr_name] = attr_value.summary()
+            elif isinstance(attr_value, Column):
+                if len(attr_value):
+                    tmp_dict[attr_name] = attr_value.tolist()
+            elif isinstance(attr_value, DeviceColumns):
+                if len(attr_value):
+                    tmp_dict[attr_name] = (
+                        attr_value.summary() if self.streaming else attr_value.tolist()
+                    )
+            elif attr_name in ["start_time", "stop_time"]:
+                tmp_dict[attr_name] = attr_value
+
+        if self.streaming:
+            tmp_dict["energy_j"] = summary_energy(tmp_dict)
+        else:
+            tmp_dict["energy_j"] = phase_energy(self.__views())
 
         return tmp_dict
+
+    def __clear(self) -> None:
+        for attr_value in self.__dict__.values():
+            if isinstance(attr_value, SERIES):
+                attr_value.clear()
+
+    def __views(self) -> dict:
+        tmp_dict = {}
+        for attr_name, attr_value in self.__dict__.items():
+            if isinstance(attr_value, SERIES) and len(attr_value):
+                view = attr_value.view()
+                for array in view.values() if isinstance(view, dict) else (view,):
+                    array.flags.writeable = False
+                tmp_dict[attr_name] = view
+
+        return tmp_dict
+
+    def views(self) -> dict:
+        """
+        Exports the monitored series without copying them. In streaming mode only the
+        kept samples are exported.
+
+        Returns:
+        - dict: A dictionary with the names of the non-empty series as keys and read-only NumPy views of their samples as values. GPU series are dictionaries of views keyed by the GPU index.
+        """
+        with self.lock:
+            return self.__views()
+
+    def summaries(self) -> dict:
+        """
+        Returns the running aggregates of the monitored series. Only available in
+        streaming mode.
+
+        Returns:
+        - dict: A dictionary with the names of the non-empty series as keys and their summaries as values.
+        """
+        if not self.streaming:
+            return {}
+
+        with self.lock:
+            return {
+                attr_name: attr_value.summary()
+                for attr_name, attr_value in self.__dict__.items()
+                if isinstance(attr_value, (StreamingColumn, DeviceColumns))
+                and len(attr_value)
+            }
@@ -1,22 +1,35 @@
-import json
 import os
 import signal
 import time
-from threading import Event, Thread
+from contextlib import contextmanager
 
-from utils import check_values, log, platform_info
+import numpy as np
 
+from utils import check_values, log, results_log
+
+from .amd import AmdCPU
+from .adaptive import AdaptivePolicy
+from .attribution import CgroupAttribution, ProcessTreeAttribution
+from .cgroup import cgroup_stats
+from .columnar import columnar_writer
+from .daemon import ProcessSampler
 from .generic_cpu import GenericCPU
 from .intel import IntelCPU
+from .integrate import step_energy
+from .inventory import get_inventory
 from .nvidia import NvidiaGPU
-from .ram import RAM
-from .statistics import DataMonitor
+from .ram import RAM, mean_memory_percent
+from .sampler import Sampler
+from .statistics import DataMonitor, sample_rows
+from .steps import StepMarkers
 
 custom_logger = log.get_logger(__name__)
 custom_logger = log.set_level(__name__, "info")
 
+NANOSECONDS = 1000000000
+
 
-class Stats(Thread):
+class Stats:
     def __init__(
         self,
         sleep_time,
@@ -25,9 +38,19 @@ class Stats(Thread):
         net=None,
         run_id=0,
         file_dir="./results",
+        streaming=False,
+        keep_last=0,
+        sampler_process=False,
+        data_monitor=None,
+        cache_inventory=False,
+        attribute_process=False,
+        cgroup=False,
+        adaptive=False,
+        sampling_floor=1.0,
+        sampling_budget=0.01,
+        columnar=False,
+        store=None,
     ):
-        Thread.__init__(self)
-        self._stop_event = Event()
         self.run_id = check_values.set_id(run_id)
         self.sleep_time = check_values.set_time(sleep_time)
         self.device = str(device)  # device returned from PyTorch is an object
@@ -35,13 +58,67 @@ class Stats(Thread):
         self.net = net
         self.file_dir = file_dir
         self.file_path = None
-
-        self.platform = platform_info.get_cpu_model()
-        self.data_monitor = DataMonitor()
-
+        self.store = store
+
+        self.sampler_process = sampler_process
+        self._phases = []
+        self._markers = []
+
+        # Probed once per process, and once per boot when persisted next to the results
+        self.inventory = get_inventory(file_dir if cache_inventory else None)
+        self.platform = self.inventory.cpu_model()
+        self.cgroup = cgroup_stats() if cgroup else None
+        if self.sampler_process:
+            # The samples are stored and aggregated by the sampler process, and its
+            # DataMonitor is queried at the phase boundaries
+            self.sampler = ProcessSampler(
+                self.sleep_time,
+                self.device,
+                generic_cpu,
+                inventory_dir=file_dir if cache_inventory else None,
+                cgroup=self.cgroup is not None,
+                adaptive=adaptive,
+                sampling_floor=sampling_floor,
+                sampling_budget=sampling_budget,
+                streaming=streaming,
+                keep_last=keep_last,
+            )
+            data_monitor = self.sampler.data_monitor
+        elif data_monitor is None:
+            data_monitor = DataMonitor(streaming=streaming, keep_last=keep_last)
+        self.data_monitor = data_monitor
+
+        self.columnar = None
+        if columnar and self.data_monitor.streaming:
+            custom_logger.warning("Raw samples are not kept with streaming statistics.")
+        elif columnar:
+            self.columnar = columnar_writer(file_dir, self.__experiment_prefix())
+
+        # The trainer is this process, also when sampling from a separate one
+        self.attributions = []
+        if attribute_process:
+            self.attributions.append(ProcessTreeAttribution())
+        if self.cgroup is not None:
+            self.attributions.append(CgroupAttribution(self.cgroup))
+
+        self.policy = None
+        if self.sampler_process:
+            # The monitors are built and polled by the sampler process. The RAM model
+            # is only applied when no dram domain was measured there
+            self.ram = RAM()
+            return
+
+        if adaptive:
+            self.policy = AdaptivePolicy(
+                self.sleep_time, sampling_floor, sampling_budget
+            )
+        self.sampler = Sampler(self.sleep_time, self.data_monitor, self.policy)
         self.__gpu_monitor()
         self.__cpu_monitor()
-        self.__ram_monitor()
+        self.__ram_model()
+
+        for source in self.__return_monitors():
+            self.sampler.register(source)
 
     def __cpu_monitor(self) -> None:
         if self.platform["system_os"] not in ["Darwin", "Linux", "Windows"]:
@@ -53,48 +130,69 @@ class Stats(Thread):
                 f"'cpu_type must be 'Intel', 'AMD', 'M1', or 'generic', now it is '{ self.platform['chipset'] }"
             )
 
-        if self.platform["chipset"] == "Intel":
-            self.intel_cpu = IntelCPU(self.sleep_time, self.data_monitor)
-            if self.intel_cpu.rapl_devices_exist() and self.generic_cpu is False:
-                self.intel_cpu.start()
+        # The energy counters are probed in sysfs, and the chipset is the one of the
+        # backend exposing them: a brand that was not recognised may still have some
+        brand = self.platform["chipset"]
+        self.platform["chipset"] = "generic"
+        if self.generic_cpu is False and brand in ["Intel", "generic"]:
+            self.intel_cpu = IntelCPU(
+                self.sleep_time, self.data_monitor, cgroup=self.cgroup
+            )
+            if self.intel_cpu.rapl_devices_exist():
                 custom_logger.info("Intel CPU with RAPL support is detected.")
-            else:
-                if self.generic_cpu is False:
-                    custom_logger.warning("Intel CPU without RAPL support is detected.")
-                custom_logger.info("Defaulting to generic CPU.")
-                self.platform["chipset"] = "generic"
-                self.generic_cpu = GenericCPU(self.sleep_time, self.data_monitor)
-                self.generic_cpu.start()
-        else:
-            self.generic_cpu = GenericCPU(self.sleep_time, self.data_monitor)
-            self.generic_cpu.start()
+                self.platform["chipset"] = "Intel"
+                return
 
-    def __get_cpu_stats(self) -> None:
+            if brand == "Intel":
+                custom_logger.warning("Intel CPU without RAPL support is detected.")
+            self.intel_cpu.close()
+
+        if self.generic_cpu is False and brand in ["AMD", "generic"]:
+            self.amd_cpu = AmdCPU(
+                self.sleep_time, self.data_monitor, cgroup=self.cgroup
+            )
+            if self.amd_cpu.rapl_devices_exist():
+                custom_logger.info(
+                    "AMD CPU with '%s' energy counters is detected.",
+                    self.amd_cpu.backend,
+                )
+                self.platform["chipset"] = "AMD"
+                return
+
+            if brand == "AMD":
+                custom_logger.warning("AMD CPU without energy counters is detected.")
+            self.amd_cpu.close()
+
+        custom_logger.info("Defaulting to generic CPU.")
+        self.generic_cpu = GenericCPU(self.sleep_time, self.data_monitor, self.cgroup)
+
+    def __cpu_source(self) -> object:
         if self.platform["chipset"] == "Intel":
-            self.intel_cpu.get_current_stats()
+            return self.intel_cpu
+        if self.platform["chipset"] == "AMD":
+            return self.amd_cpu
+
+        return self.generic_cpu
+
+    def __ram_model(self) -> None:
+        if (
+            self.platform["chipset"] in ["Intel", "AMD"]
+            and self.__cpu_source().dram_domain_exists()
+        ):
+            custom_logger.info("RAPL DRAM domain is detected. RAM power is measured.")
+            self.ram = None
         else:
-            self.generic_cpu.get_current_stats()
-
-    def __ram_monitor(self) -> None:
-        self.ram = RAM(self.sleep_time, self.data_monitor)
-        self.ram.start()
-
-    def __get_ram_stats(self) -> None:
-        self.ram.get_current_stats()
+            self.ram = RAM()
 
     def __gpu_monitor(self) -> None:
         if self.device == "cuda":
             self.nvidia_gpu = NvidiaGPU(self.sleep_time, self.data_monitor)
-            self.nvidia_gpu.start()
-
-    def __get_gpu_stats(self) -> None:
-        self.nvidia_gpu.get_current_stats()
 
     def __experiment_prefix(self):
         return "exp" + "_" + str(self.run_id)
 
     def __find_file(self, mode):
-        file_name = mode + ".json"
+        file_name = mode + results_log.RESULTS_EXTENSION
         if "train" in mode or "test" in mode:
             return file_name
         else:
@@ -102,81 +200,261 @@ class Stats(Thread):
                 "A wrong mode type was given. Give either 'train' or 'test'."
             )
 
-    def __construct_results_dict(self, results_dict, epoch) -> dict:
+    def __construct_record(self, mode, epoch, tmp_results) -> dict:
         if self.net is None:
             custom_logger.critical("Network should not be None! Exiting program")
             os.kill(os.getpid(), signal.SIGINT)
 
-        experiment = self.__experiment_prefix()
-        if experiment not in results_dict:
-            results_dict[experiment] = dict()
-        if self.net not in results_dict[experiment]:
-            results_dict[experiment][self.net] = dict()
-
-        tmp_results = self.data_monitor.construct_results()
-        results_dict[experiment][self.net][epoch] = tmp_results
-
-        return results_dict
-
-    def __write_to_json(self, mode, epoch) -> None:
+        return {
+            "experiment": self.__experiment_prefix(),
+            "run_id": self.run_id,
+            "net": self.net,
+            "epoch": epoch,
+            "mode": mode,
+            "results": tmp_results,
+        }
+
+    def __add_models(self, tmp_results) -> dict:
+        if self.ram is not None:
+            self.ram.add_energy(tmp_results)
+        for attribution in self.attributions:
+            attribution.add_energy(tmp_results)
+
+        return tmp_results
+
+    def __write_results(self, mode, epoch, tmp_results, views=None) -> None:
+        # One record is appended per phase: the results saved before are never read
+        # back, see utils.results_log.read_results() for the nested view of them
         results_file = self.__find_file(mode)
         self.file_path = self.file_dir + "/" + results_file
 
-        if os.path.exists(self.file_path):
-            with open(self.file_path, "r", encoding="utf-8") as json_file:
-                results_dict = json.load(json_file)
-        else:
-            results_dict = dict()
-
-        csv_data = self.__construct_results_dict(results_dict, epoch)
-        with open(self.file_path, "w+", encoding="utf-8") as file:
-            json.dump(csv_data, file)
+        record = self.__construct_record(mode, epoch, tmp_results)
+        results_log.append_record(self.file_path, record)
 
-    def __return_monitors(self) -> list[str]:
-        monitor_interfaces = []
+        if self.store is not None:
+            samples = sample_rows(views) if views is not None else ()
+            self.store.add_phase(self.net, mode, epoch, tmp_results, samples)
 
-        if self.platform["chipset"] == "Intel":
-            monitor_interfaces.append(self.intel_cpu)
-        else:
-            monitor_interfaces.append(self.generic_cpu)
+    def __return_monitors(self) -> list[object]:
+        monitor_interfaces = [self.__cpu_source()]
 
         if self.device == "cuda":
             monitor_interfaces.append(self.nvidia_gpu)
 
-        monitor_interfaces.append(self.ram)
-
         return monitor_interfaces
 
-    def __stop_monitoring(self) -> None:
-        list_to_stop = self.__return_monitors()
-
-        for device in list_to_stop:
-            device.stop()
+    def __boost(self) -> None:
+        # Phase boundaries are sampled at the base period again. A sampler process
+        # adapts its rates on its own
+        if self.policy is not None:
+            self.policy.boost()
 
     def save_results(self, mode, epoch) -> None:
         self.data_monitor.set_stop_time()
-        self.__write_to_json(mode, epoch)
-        self.data_monitor.reset_values()
+        tmp_results = self.__add_models(self.data_monitor.take_results())
+        self.__write_results(mode, epoch, tmp_results)
+        self.__boost()
+
+    @contextmanager
+    def phase(self, mode, epoch=None, net=None, **tags):
+        """
+        Measures the block it wraps as a phase, e.g. an epoch of training.
+
+        The monotonic timestamps of the start and the end of the phase are recorded,
+        and its results are constructed from the samples taken in between, so
+        nothing the sampler hands over concurrently is cleared. A phase opened
+        within another one, e.g. a window of batches within an epoch, is added to
+        the 'phases' of its parent with its own energy. The outermost phase is saved
+        as with save_results(mode, epoch).
+
+        In streaming mode only the aggregates are kept, so the statistics restart
+        at the beginning of a phase and phases cannot be nested.
+
+        :param mode: The name of the phase, which must contain 'train' or 'test' for
+            an outermost phase.
+        :param epoch: The epoch of the phase.
+        :param net: The network measured, if it changed.
+        :param tags: Any other value stored with the phase.
+        :return: The record of the phase, filled when it ends.
+        """
+        if net is not None:
+            self.set_network(net)
+
+        parent = self._phases[-1] if self._phases else None
+        if parent is not None and self.data_monitor.streaming:
+            raise ValueError("Phases cannot be nested with streaming statistics")
+
+        record = {"name": mode, **tags}
+        if epoch is not None:
+            record["epoch"] = epoch
+        if parent is None:
+            self.__begin_phase()
+        record["start_time"] = round(time.time_ns() / 1000000)
+        record["start_ns"] = time.monotonic_ns()
+        record["phases"] = []
+
+        self._phases.append(record)
+        self._markers.append(None)
+        try:
+            yield record
+        finally:
+            self._phases.pop()
+            markers = self._markers.pop()
+        record["stop_ns"] = time.monotonic_ns()
+        record["stop_time"] = round(time.time_ns() / 1000000)
+
+        if parent is None:
+            self.__end_phase(record, mode, epoch, markers)
+        else:
+            tmp_results = self.data_monitor.phase_results(
+                record["start_ns"], record["stop_ns"]
+            )
+            tmp_results["start_time"] = record["start_time"]
+            tmp_results["stop_time"] = record["stop_time"]
+            if self.ram is not None:
+                self.ram.add_energy(tmp_results)
+
+            record["energy_j"] = tmp_results["energy_j"]
+            if markers is not None:
+                record["steps"] = self.__step_table(markers, tmp_results)
+            if not record["phases"]:
+                del record["phases"]
+            parent["phases"].append(record)
+
+    def step_markers(self, steps: int) -> StepMarkers:
+        """
+        Starts marking the steps of the innermost open phase, e.g. its batches. The
+        energy of every step is added to the results of the phase under 'steps',
+        except in streaming mode where no samples are kept.
+
+        :param steps: The number of steps expected, e.g. len(train_loader). More can
+            be marked, at the cost of growing the markers.
+        :return: The markers, to mark() before the first step and after every step.
+        """
+        if not self._phases:
+            raise ValueError("Steps can only be marked within a phase")
+
+        self._markers[-1] = StepMarkers(steps)
+        return self._markers[-1]
+
+    def __step_table(self, markers, tmp_results) -> dict:
+        markers_ns = markers.view()
+        if self.data_monitor.streaming or len(markers_ns) < 2:
+            return None
+
+        # One period around the steps to interpolate the energy at their edges
+        margin_ns = round(self.sleep_time * NANOSECONDS)
+        views = self.data_monitor.phase_views(
+            markers_ns[0] - margin_ns, markers_ns[-1] + margin_ns
+        )
+        durations_s = np.diff(markers_ns) / NANOSECONDS
+        energy = step_energy(views, markers_ns)
+        if self.ram is not None and "dram" not in energy:
+            # The same model as the energy of the phase
+            energy["ram"] = self.ram.energy_j(
+                durations_s, mean_memory_percent(tmp_results)
+            )
+
+        return {
+            "start_ns": markers_ns[:-1].tolist(),
+            "duration_s": durations_s.tolist(),
+            "energy_j": {source: values.tolist() for source, values in energy.items()},
+        }
+
+    def __begin_phase(self) -> None:
+        if self.data_monitor.streaming:
+            self.data_monitor.reset_values()
+        else:
+            # Samples taken between two phases belong to none, but the last one is
+            # kept to interpolate the energy at the start of the first step
+            self.data_monitor.discard_before(
+                time.monotonic_ns() - round(self.sleep_time * NANOSECONDS)
+            )
+            self.data_monitor.set_start_time()
+        for attribution in self.attributions:
+            attribution.mark()
+        self.__boost()
+
+    def __end_phase(self, record, mode, epoch, markers) -> None:
+        self.data_monitor.set_stop_time()
+        views = None
+        if self.data_monitor.streaming:
+            tmp_results = self.data_monitor.take_results()
+        else:
+            tmp_results = self.data_monitor.phase_results(
+                record["start_ns"], record["stop_ns"]
+            )
+            tmp_results["start_time"] = self.data_monitor.start_time
+            tmp_results["stop_time"] = self.data_monitor.stop_time
+            if markers is not None:
+                tmp_results["steps"] = self.__step_table(markers, tmp_results)
+            # Views stay valid once the samples are discarded
+            views = self.data_monitor.phase_views(record["start_ns"], record["stop_ns"])
+            if self.columnar is not None:
+                self.columnar.write(views, self.net, mode, epoch)
+            # Everything sampled up to here belonged to this phase or to none
+            self.data_monitor.discard_before(record["stop_ns"])
+
+        tmp_results["start_ns"] = record["start_ns"]
+        tmp_results["stop_ns"] = record["stop_ns"]
+        if record["phases"]:
+            tmp_results["phases"] = record["phases"]
+        self.__write_results(mode, epoch, self.__add_models(tmp_results), views)
+        self.__boost()
 
     def set_network(self, net) -> None:
         self.net = net
 
     def reset(self) -> None:
-        list_to_stop = self.__return_monitors()
-
-        for device in list_to_stop:
-            device.reset()
+        # Only the DataMonitor is cleared: the sources keep handing their samples
+        # over from the sampler thread, and anything sampled before this point is
+        # dropped under the DataMonitor lock instead of racing with the sampler
+        self.data_monitor.reset_values()
+        for attribution in self.attributions:
+            attribution.mark()
+        self.__boost()
+
+    def start(self) -> None:
+        # The first phase is timed from here when it is not reset before. The
+        # DataMonitor of a sampler process only answers once it runs
+        self.sampler.start()
         self.data_monitor.set_start_time()
 
-    def stop(self) -> None:
-        self._stop_event.set()
+        if self.sampler_process:
+            # The sampler process is a child of the trainer, but not part of its work
+            for attribution in self.attributions:
+                if isinstance(attribution, ProcessTreeAttribution):
+                    attribution.exclude(*self.sampler.pids())
 
-    def run(self):
-        while not self._stop_event.is_set():
-            self.__get_cpu_stats()
-            self.__get_ram_stats()
-            if self.device in ["cuda"]:
-                self.__get_gpu_stats()
-            time.sleep(1)
+    def jitter_stats(self) -> dict:
+        return self.sampler.jitter_stats()
 
-        self.__stop_monitoring()
+    def stop(self) -> None:
+        self.sampler.stop()
+        self.sampler.join()
+
+        if not self.sampler_process:
+            self.__cpu_source().close()
+        if self.cgroup is not None:
+            self.cgroup.close()
+        if self.columnar is not None:
+            self.columnar.close()
+
+        if self.policy is not None:
+            for source, rate in self.policy.summary().items():
+                custom_logger.info(
+                    "%s sampled %s time(s), last period: %s s, cost: %.1f us/sample",
+                    source,
+                    rate["samples"],
+                    rate["period_s"],
+                    rate["cost_us"],
+                )
+
+        jitter = self.jitter_stats()
+        custom_logger.info(
+            "Sampler lateness p50: %.3f ms, p99: %.3f ms, missed ticks: %s/%s",
+            jitter["lateness_p50_ms"],
+            jitter["lateness_p99_ms"],
+            jitter["missed_ticks"],
+            jitter["ticks"],
+        )
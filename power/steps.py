@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+
+
+class StepMarkers:
+    """
+    Monotonic timestamps of the boundaries between the steps of a phase, e.g. the
+    batches of an epoch, on the clock of the sampler.
+
+    `mark()` only writes a timestamp into a preallocated array, without locks or
+    I/O, so it can be called on every batch: the training loop is the only writer,
+    and the markers are read once the phase is over. Marking before the first step
+    and after every step gives one boundary more than steps.
+    """
+
+    def __init__(self, steps: int):
+        self.timestamps_ns = np.zeros(steps + 1, dtype=np.int64)
+        self.count = 0
+
+    def mark(self) -> None:
+        if self.count == len(self.timestamps_ns):
+            self.timestamps_ns = np.concatenate(
+                (self.timestamps_ns, np.zeros(len(self.timestamps_ns), np.int64))
+            )
+
+        self.timestamps_ns[self.count] = time.monotonic_ns()
+        self.count += 1
+
+    def view(self) -> np.ndarray:
+        return self.timestamps_ns[: self.count]
+
+    def __len__(self) -> int:
+        return max(self.count - 1, 0)
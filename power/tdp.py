@@ -0,0 +1,208 @@
+import csv
+import difflib
+import os
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from utils import log
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+TDP_DATA = "./data/tdp.csv"
+DEFAULT_TDP = 100
+
+INDEX_VERSION = 1
+CANDIDATES = 50
+MATCH_CUTOFF = 0.6
+
+_indexes = {}
+
+
+def index_path(filepath: str) -> str:
+    return os.path.splitext(filepath)[0] + ".index.npz"
+
+
+def trigrams(name: str) -> set[str]:
+    """
+    :param name: A CPU model name.
+    :return: The trigrams of the lower-cased name, padded so short names still have
+        some.
+    """
+    padded = f"  {name.lower()} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TdpIndex:
+    """
+    Trigram inverted index over the CPU names of the TDP table.
+
+    A lookup only scores, with difflib as before, the few names sharing the most
+    trigrams with the CPU name instead of the whole table. The index and every match
+    found are persisted in a compressed cache next to the CSV, rebuilt when the CSV
+    changes. A CPU name matched before costs a dictionary lookup, without loading
+    the index at all.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.cache_path = index_path(filepath)
+        self.matches: dict[str, Optional[tuple[str, float]]] = {}
+
+        self._source = np.array(self.__source_signature(), np.int64)
+        self._names = None
+        self._tdp = None
+        self._postings = None
+
+        if not self.__load_matches():
+            self.__build()
+            self.save()
+
+    def __source_signature(self) -> list[int]:
+        stat = os.stat(self.filepath)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def __open_cache(self):
+        try:
+            cache = np.load(self.cache_path)
+        except (OSError, ValueError):
+            return None
+
+        if int(cache["version"]) != INDEX_VERSION or not np.array_equal(
+            cache["source"], self._source
+        ):
+            cache.close()
+            return None
+
+        return cache
+
+    def __load_matches(self) -> bool:
+        cache = self.__open_cache()
+        if cache is None:
+            return False
+
+        with cache:
+            for cpu_name, name, tdp in zip(
+                cache["match_cpus"].tolist(),
+                cache["match_names"].tolist(),
+                cache["match_tdp"].tolist(),
+            ):
+                self.matches[cpu_name] = (name, tdp) if name else None
+
+        return True
+
+    def __load_index(self) -> None:
+        if self._postings is not None:
+            return
+
+        cache = self.__open_cache()
+        if cache is None:
+            self.__build()
+            return
+
+        with cache:
+            self._names = cache["names"].tolist()
+            self._tdp = cache["tdp"].tolist()
+            offsets = cache["offsets"]
+            postings = cache["postings"]
+            self._postings = {
+                trigram: postings[offsets[i] : offsets[i + 1]]
+                for i, trigram in enumerate(cache["trigrams"].tolist())
+            }
+
+    def __build(self) -> None:
+        self._names = []
+        self._tdp = []
+        with open(self.filepath, "r", encoding="utf-8", newline="") as file:
+            for row in csv.DictReader(file):
+                self._names.append(row["Name"])
+                self._tdp.append(float(row["TDP"]))
+
+        postings = {}
+        for index, name in enumerate(self._names):
+            for trigram in trigrams(name):
+                postings.setdefault(trigram, []).append(index)
+        self._postings = {
+            trigram: np.array(rows, np.int32) for trigram, rows in postings.items()
+        }
+
+    def save(self) -> None:
+        self.__load_index()
+
+        trigram_keys = sorted(self._postings)
+        lengths = [len(self._postings[trigram]) for trigram in trigram_keys]
+        matches = sorted(self.matches.items())
+        tmp_path = self.cache_path + ".tmp.npz"
+        try:
+            np.savez_compressed(
+                tmp_path,
+                version=INDEX_VERSION,
+                source=self._source,
+                names=np.array(self._names),
+                tdp=np.array(self._tdp),
+                trigrams=np.array(trigram_keys),
+                offsets=np.concatenate(([0], np.cumsum(lengths))).astype(np.int32),
+                postings=np.concatenate([self._postings[t] for t in trigram_keys]),
+                match_cpus=np.array([cpu_name for cpu_name, _ in matches], str),
+                match_names=np.array([m[0] if m else "" for _, m in matches], str),
+                match_tdp=np.array([m[1] if m else 0.0 for _, m in matches]),
+            )
+            os.replace(tmp_path, self.cache_path)
+        except OSError as error:
+            custom_logger.debug("TDP index not cached: %s", error)
+
+    def __candidates(self, cpu_name: str) -> list[str]:
+        shared = Counter()
+        for trigram in trigrams(cpu_name):
+            if trigram in self._postings:
+                shared.update(self._postings[trigram].tolist())
+
+        return [self._names[index] for index, _ in shared.most_common(CANDIDATES)]
+
+    def match(self, cpu_name: str) -> Optional[tuple[str, float]]:
+        """
+        :param cpu_name: The CPU model name of the platform.
+        :return: The closest CPU name in the table and its TDP (in watts), or None
+            without a close match.
+        """
+        if cpu_name in self.matches:
+            return self.matches[cpu_name]
+
+        self.__load_index()
+        closest_match = difflib.get_close_matches(
+            cpu_name, self.__candidates(cpu_name), n=1, cutoff=MATCH_CUTOFF
+        )
+        match = None
+        if closest_match:
+            match = closest_match[0], self._tdp[self._names.index(closest_match[0])]
+
+        self.matches[cpu_name] = match
+        self.save()
+        return match
+
+
+def find_tdp(cpu_name: str, filepath: str = TDP_DATA) -> float:
+    """
+    Looks the TDP of a CPU up in the TDP table, by the closest CPU name.
+
+    :param cpu_name: The CPU model name of the platform.
+    :param filepath: Path of the TDP table (CSV with 'Name' and 'TDP' columns).
+    :return: The TDP of the CPU (in watts), or DEFAULT_TDP when it is not found.
+    """
+    if filepath not in _indexes:
+        try:
+            _indexes[filepath] = TdpIndex(filepath)
+        except FileNotFoundError:
+            custom_logger.error("Wrong path was given. Return default value.")
+            return DEFAULT_TDP
+
+    match = _indexes[filepath].match(cpu_name)
+    if match is None:
+        custom_logger.warning("TDP not found. Default value used: %s (W)", DEFAULT_TDP)
+        return DEFAULT_TDP
+
+    tdp = match[1]
+    custom_logger.info("Current TDP is: %s (W)", tdp)
+    return tdp
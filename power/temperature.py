@@ -0,0 +1,85 @@
+import os
+import re
+
+from utils import log
+
+from .inventory import HWMON_DIR, get_inventory, list_hwmon
+
+custom_logger = log.get_logger(__name__)
+custom_logger = log.set_level(__name__, "info")
+
+# hwmon drivers of the CPU package temperature: Intel, AMD, and the out-of-tree
+# zenpower driver for AMD Zen
+CPU_TEMPERATURE_DRIVERS = ("coretemp", "k10temp", "zenpower")
+READ_SIZE = 16
+MILLIDEGREES = 1000
+
+
+class HwmonTemperature:
+    """
+    CPU temperature read straight from the hwmon sensors of the CPU drivers.
+
+    The `tempN_input` files are resolved once and kept open, and every read is a
+    pread of each file into a reused buffer. The temperature reported is the
+    highest of the sensors, as with the coretemp entries of psutil before, but it
+    also covers AMD CPUs.
+    """
+
+    def __init__(self, hwmon_dir=HWMON_DIR, listing=None):
+        if listing is None:
+            listing = list_hwmon(hwmon_dir)
+
+        self.paths = []
+        for hwmon, driver in listing:
+            if driver in CPU_TEMPERATURE_DRIVERS:
+                self.paths.extend(self.__find_inputs(os.path.join(hwmon_dir, hwmon)))
+
+        self._buffer = bytearray(READ_SIZE)
+        self._fds = []
+        for path in self.paths:
+            try:
+                self._fds.append(os.open(path, os.O_RDONLY))
+            except OSError:
+                custom_logger.debug("Temperature sensor '%s' not readable.", path)
+
+    def __find_inputs(self, path) -> list[str]:
+        pattern = re.compile(r"temp\d+_input")
+        return [
+            os.path.join(path, file_name)
+            for file_name in sorted(os.listdir(path))
+            if re.fullmatch(pattern, file_name)
+        ]
+
+    def available(self) -> bool:
+        return bool(self._fds)
+
+    def read(self) -> float:
+        """
+        :return: The highest temperature of the CPU sensors (in degrees Celsius), or 0
+            without sensors.
+        """
+        temperature = 0
+        for fd in self._fds:
+            try:
+                size = os.preadv(fd, [self._buffer], 0)
+                temperature = max(temperature, int(self._buffer[:size]))
+            except (OSError, ValueError):
+                continue
+
+        custom_logger.debug("CPU temperature: %s", temperature / MILLIDEGREES)
+        return temperature / MILLIDEGREES
+
+    def close(self) -> None:
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+
+def cpu_temperature_sensors(hwmon_dir=HWMON_DIR) -> HwmonTemperature:
+    """
+    :param hwmon_dir: The hwmon class directory.
+    :return: The CPU temperature sensors, found from the hardware inventory for the
+        system hwmon directory.
+    """
+    listing = get_inventory().hwmon if hwmon_dir == HWMON_DIR else None
+    return HwmonTemperature(hwmon_dir, listing)
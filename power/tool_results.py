@@ -3,13 +3,21 @@ import os
 import pandas as pd
 
 from utils import log
+from utils.format_time import plot_time
 
 custom_logger = log.get_logger(__name__)
 custom_logger = log.set_level(__name__, "info")
 
 
 class ToolResults:
-    def __init__(self, net, file_dir="./results", file_name="mlresults.csv", run_id=0):
+    def __init__(
+        self,
+        net,
+        file_dir="./results",
+        file_name="mlresults.csv",
+        run_id=0,
+        store=None,
+    ):
         self.project_name = net
         self.net = net
         self.file_dir = file_dir
@@ -17,6 +25,7 @@ class ToolResults:
         self.file_name = file_name
         self.file_path = None
         self.run_id = run_id
+        self.store = store
 
     def __check_directory(self):
         if not os.path.isdir(self.file_dir):
@@ -61,5 +70,19 @@ class ToolResults:
                 self.file_path, mode="a", header=False, index=False
             )
 
+    def __write_to_store(self, mode, epoch, duration, step, loss, accuracy):
+        # The durations are formatted by format_time()
+        self.store.add_ml_metrics(
+            self.net,
+            mode,
+            epoch,
+            duration_ms=plot_time(duration),
+            step_ms=plot_time(step),
+            loss=float(loss),
+            accuracy=float(accuracy),
+        )
+
     def save_results(self, mode, epoch, duration, step, loss, accuracy):
         self.__write_to_csv(mode, epoch, duration, step, loss, accuracy)
+        if self.store is not None:
+            self.__write_to_store(mode, epoch, duration, step, loss, accuracy)
@@ -34,27 +34,27 @@ if [ $ARGUMENT = "tooltest" ]; then
 
     for model in "${models[@]}"; do
         # Run experiments using our FROST tool
-        python3 main.py --get-stats --epoch ${EPOCH} --network ${model}
+        python3 main.py --results-db --get-stats --cache-inventory --epoch ${EPOCH} --network ${model}
 
         sleep 2
 
         # Run experiments without any monitoring tool
-        python3 main.py --epoch ${EPOCH} --network ${model}
+        python3 main.py --results-db --epoch ${EPOCH} --network ${model}
 
         sleep 2
 
         # Run experiments using the eco2ai tool
-        python3 main.py --tool eco2ai --epoch ${EPOCH} --network ${model}
+        python3 main.py --results-db --tool eco2ai --epoch ${EPOCH} --network ${model}
 
         sleep 2
 
         # Run experiments using the codecarbon tool
-        python3 main.py --tool codecarbon --epoch ${EPOCH} --network ${model}
+        python3 main.py --results-db --tool codecarbon --epoch ${EPOCH} --network ${model}
 
         sleep 2
 
         # Run experiments using the carbontracker tool
-        python3 main.py --tool carbontracker --epoch ${EPOCH} --network ${model}
+        python3 main.py --results-db --tool carbontracker --epoch ${EPOCH} --network ${model}
     done
 elif [ $ARGUMENT = "batchtest" ]; then
     echo "Running batch test"
@@ -66,10 +66,10 @@ elif [ $ARGUMENT = "batchtest" ]; then
     sudo dmidecode -t memory > ./results/meminfo.txt
 
     for batch in "${batch_sizes[@]}"; do
-        ls ./results/ | grep -xv "meminfo.txt" | xargs -I {} rm -r ./results/{}
+        ls ./results/ | grep -xv -e "meminfo.txt" -e "results.db" | xargs -I {} rm -r ./results/{}
         for model in "${models[@]}"; do    
             if [ "$model" != "GoogLeNet" ]; then
-                python3 main.py --get-stats --epoch ${EPOCH} --network ${model} --batch-size ${batch} --test-size ${batch}
+                python3 main.py --results-db --get-stats --cache-inventory --epoch ${EPOCH} --network ${model} --batch-size ${batch} --test-size ${batch}
             fi
         done
         cp -rT ./results ./results_bk/results_${batch}
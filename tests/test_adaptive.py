@@ -0,0 +1,82 @@
+import unittest
+
+from power.adaptive import CALM_SAMPLES, AdaptivePolicy, SignalTracker
+from power.sampler import Sampler
+from power.statistics import DataMonitor
+
+
+class FakeSource:
+    def __init__(self):
+        self.power_w = 10.0
+        self.samples = []
+
+    def sample(self, timestamp_ns):
+        self.samples.append(timestamp_ns)
+
+    def activity(self):
+        return (self.power_w,)
+
+    def get_current_stats(self):
+        pass
+
+
+class TestAdaptivePolicy(unittest.TestCase):
+    def test_signal_tracker(self):
+        tracker = SignalTracker()
+        self.assertFalse(any(tracker.update(v) for v in [10.0, 10.1, 9.9, 10.0]))
+        self.assertTrue(tracker.update(30.0))
+
+        tracker = SignalTracker()
+        self.assertFalse(any(tracker.update(v) for v in [0.0, 0.0, None]))
+        self.assertTrue(tracker.update(50.0))
+
+    def test_decays_to_the_floor_and_jumps_back(self):
+        policy = AdaptivePolicy(0.1, floor_s=0.4, budget=1.0)
+        source = FakeSource()
+        sampler = Sampler(0.1, DataMonitor(), policy)
+        sampler.register(source)
+
+        for tick in range(60):
+            sampler.tick(tick)
+        # Sampled on every tick, then every 2 and every 4 ticks at most
+        self.assertLess(len(source.samples), 60 - 2 * CALM_SAMPLES)
+        self.assertEqual(policy.summary()["FakeSource"]["period_s"], 0.4)
+        self.assertEqual(source.samples[-1] - source.samples[-2], 4)
+
+        source.power_w = 50.0
+        before = len(source.samples)
+        tick = 60
+        while len(source.samples) == before:
+            sampler.tick(tick)
+            tick += 1
+        self.assertEqual(policy.summary()["FakeSource"]["period_s"], 0.1)
+
+        # Sampled again on the next tick
+        sampler.tick(tick)
+        self.assertEqual(len(source.samples), before + 2)
+
+    def test_budget_caps_the_cost(self):
+        policy = AdaptivePolicy(0.1, floor_s=0.1, budget=0.01)
+        source = FakeSource()
+        for tick in range(0, 100):
+            if policy.due(source, tick):
+                # 3 ms of CPU per sample is 3% of a 100 ms period
+                policy.observe(source, 3000000, tick)
+
+        self.assertEqual(policy.summary()["FakeSource"]["samples"], 34)
+
+    def test_boost(self):
+        policy = AdaptivePolicy(0.1, floor_s=1.0, budget=1.0)
+        source = FakeSource()
+        for tick in range(51):
+            if policy.due(source, tick):
+                policy.observe(source, 0, tick)
+        self.assertFalse(policy.due(source, 51))
+
+        policy.boost()
+        self.assertTrue(policy.due(source, 51))
+        self.assertEqual(policy.summary()["FakeSource"]["period_s"], 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
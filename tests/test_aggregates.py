@@ -0,0 +1,57 @@
+import statistics
+import unittest
+
+from power.aggregates import RunningStats
+from power.statistics import DataMonitor
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_welford(self):
+        values = [4.0, 7.0, 13.0, 16.0, 2.5]
+        running = RunningStats()
+        for value in values:
+            running.update(value)
+
+        self.assertEqual(running.count, 5)
+        self.assertAlmostEqual(running.mean, statistics.fmean(values))
+        self.assertAlmostEqual(running.std, statistics.pstdev(values))
+        self.assertEqual((running.min, running.max), (2.5, 16.0))
+
+    def test_trapezoidal_integral(self):
+        running = RunningStats()
+        for timestamp_ns, power_w in ((0, 10.0), (500000000, 20.0), (1500000000, 20.0)):
+            running.update(power_w, timestamp_ns)
+
+        self.assertAlmostEqual(running.integral, 7.5 + 20.0)
+
+
+class TestStreamingDataMonitor(unittest.TestCase):
+    def test_summaries(self):
+        data_monitor = DataMonitor(streaming=True, keep_last=2)
+        data_monitor.set_start_time()
+        for tick in range(4):
+            timestamp_ns = tick * 1000000000
+            data_monitor.update_values_time(timestamp_ns, 1000000000)
+            data_monitor.update_values_ram([2.0], [timestamp_ns])
+            data_monitor.update_values_cpu(
+                ([tick * 1000000.0], [1.0], [50.0], [10.0], [40.0], [timestamp_ns])
+            )
+        data_monitor.set_stop_time()
+
+        results = data_monitor.construct_results()
+        self.assertEqual(results["ram_power_w"]["count"], 4)
+        self.assertAlmostEqual(results["ram_power_w"]["energy_j"], 6.0)
+        self.assertAlmostEqual(results["cpu_energy_uj"]["energy_j"], 3.0)
+        self.assertEqual(set(results["energy_j"]), {"cpu", "ram"})
+        self.assertAlmostEqual(results["energy_j"]["cpu"], 3.0)
+        self.assertAlmostEqual(results["energy_j"]["ram"], 6.0)
+        self.assertEqual(results["cpu_percent"]["last_samples"], [50.0, 50.0])
+        self.assertNotIn("gpu_power_w", results)
+        self.assertNotIn("streaming", results)
+
+        data_monitor.reset_values()
+        self.assertEqual(data_monitor.summaries(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
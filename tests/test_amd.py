@@ -0,0 +1,121 @@
+import functools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from power import stats
+from power.amd import AmdCPU, find_amd_energy_zones
+from power.intel import IntelCPU
+from power.inventory import Inventory
+from power.statistics import DataMonitor
+
+
+def write_files(path, files):
+    os.makedirs(path, exist_ok=True)
+    for file_name, value in files.items():
+        with open(os.path.join(path, file_name), "w", encoding="utf-8") as file:
+            file.write(f"{value}\n")
+
+
+class TestAmdCPU(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rapl_dir = os.path.join(self.tmp_dir.name, "powercap")
+        self.hwmon_dir = os.path.join(self.tmp_dir.name, "hwmon")
+        os.makedirs(self.rapl_dir)
+
+        # An unrelated sensor next to the amd_energy driver
+        write_files(os.path.join(self.hwmon_dir, "hwmon0"), {"name": "k10temp"})
+        self.amd_energy = os.path.join(self.hwmon_dir, "hwmon1")
+        write_files(
+            self.amd_energy,
+            {
+                "name": "amd_energy",
+                "energy1_label": "Ecore000",
+                "energy1_input": 1000,
+                "energy2_label": "Ecore001",
+                "energy2_input": 2000,
+                "energy3_label": "Esocket0",
+                "energy3_input": 10000,
+            },
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_amd_energy_hwmon(self):
+        zones = find_amd_energy_zones(self.hwmon_dir)
+        self.assertEqual(zones.devices, ["cpu:0"])
+        self.assertEqual(len(zones.subdomains["core"]), 2)
+        zones.close()
+
+        data_monitor = DataMonitor()
+        cpu = AmdCPU(0.1, data_monitor, self.rapl_dir, self.hwmon_dir)
+        self.assertEqual(cpu.backend, "amd_energy")
+        self.assertTrue(cpu.rapl_devices_exist())
+        self.assertFalse(cpu.dram_domain_exists())
+
+        cpu.sample(0)
+        write_files(
+            self.amd_energy,
+            {"energy1_input": 301000, "energy2_input": 2000, "energy3_input": 510000},
+        )
+        cpu.sample(100000000)
+        cpu.get_current_stats()
+        cpu.close()
+
+        self.assertEqual(data_monitor.cpu_energy_uj.tolist(), [0, 500000])
+        self.assertAlmostEqual(data_monitor.cpu_delta_power_w[-1], 5.0)
+        self.assertEqual(data_monitor.cpu_core_energy_uj.tolist(), [0, 300000])
+
+    def test_powercap_is_preferred(self):
+        write_files(
+            os.path.join(self.rapl_dir, "intel-rapl:0"),
+            {"name": "package-0", "energy_uj": 0, "max_energy_range_uj": 1000},
+        )
+
+        cpu = AmdCPU(0.1, DataMonitor(), self.rapl_dir, self.hwmon_dir)
+        self.assertEqual(cpu.backend, "powercap")
+        self.assertEqual(cpu.package_energy_j(), {"cpu:0": 0})
+        cpu.close()
+
+    def test_no_counters(self):
+        cpu = AmdCPU(0.1, DataMonitor(), self.rapl_dir, self.rapl_dir)
+        self.assertIsNone(cpu.backend)
+        self.assertFalse(cpu.rapl_devices_exist())
+
+    def __chipset(self, brand):
+        cpu = {"system_os": "Linux", "cpu_name": "", "arch": "", "chipset": brand}
+        with mock.patch.object(
+            Inventory, "cpu_model", side_effect=lambda: dict(cpu)
+        ), mock.patch.object(
+            stats, "IntelCPU", functools.partial(IntelCPU, rapl_dir=self.rapl_dir)
+        ), mock.patch.object(
+            stats,
+            "AmdCPU",
+            functools.partial(AmdCPU, rapl_dir=self.rapl_dir, hwmon_dir=self.hwmon_dir),
+        ):
+            tmp_stats = stats.Stats(0.1, "cpu", file_dir=self.tmp_dir.name)
+            tmp_stats.start()
+            tmp_stats.stop()
+
+        return tmp_stats.platform["chipset"]
+
+    def test_chipset_from_backend(self):
+        # Only the amd_energy driver exposes counters
+        self.assertEqual(self.__chipset("AMD"), "AMD")
+        self.assertEqual(self.__chipset("generic"), "AMD")
+        self.assertEqual(self.__chipset("Intel"), "generic")
+        self.assertEqual(self.__chipset("M1"), "generic")
+
+        write_files(
+            os.path.join(self.rapl_dir, "intel-rapl:0"),
+            {"name": "package-0", "energy_uj": 0, "max_energy_range_uj": 1000},
+        )
+        self.assertEqual(self.__chipset("generic"), "Intel")
+        self.assertEqual(self.__chipset("AMD"), "AMD")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+import psutil
+
+from power import attribution
+
+CpuTimes = namedtuple("CpuTimes", "user system children_user children_system")
+
+
+class FakeProcess:
+    def __init__(self, times, children=(), pid=0):
+        self.times = times
+        self._children = children
+        self.pid = pid
+
+    def cpu_times(self):
+        if self.times is None:
+            raise psutil.NoSuchProcess(0)
+        return self.times
+
+    def children(self, recursive=False):
+        return list(self._children)
+
+
+class TestProcessTreeAttribution(unittest.TestCase):
+    def test_tree_cpu_time(self):
+        process = FakeProcess(
+            CpuTimes(2.0, 1.0, 4.0, 0.5),
+            [FakeProcess(CpuTimes(1.5, 0.5, 0.0, 0.0)), FakeProcess(None)],
+        )
+        self.assertAlmostEqual(attribution.tree_cpu_time_s(process), 9.5)
+
+    def test_excluded_subtree(self):
+        helper = FakeProcess(CpuTimes(0.5, 0.5, 0.0, 0.0), pid=3)
+        sampler = FakeProcess(CpuTimes(2.0, 1.0, 0.0, 0.0), [helper], pid=2)
+        worker = FakeProcess(CpuTimes(1.5, 0.5, 0.0, 0.0), pid=4)
+        process = FakeProcess(
+            CpuTimes(2.0, 1.0, 0.0, 0.0), [sampler, helper, worker], pid=1
+        )
+
+        self.assertAlmostEqual(attribution.tree_cpu_time_s(process), 9.0)
+        self.assertAlmostEqual(
+            attribution.tree_cpu_time_s(process, [sampler, FakeProcess(None)]), 5.0
+        )
+
+    def test_energy_apportioned_by_busy_time(self):
+        with mock.patch.object(
+            attribution, "tree_cpu_time_s", side_effect=[10.0, 13.0, 13.0]
+        ), mock.patch.object(
+            attribution, "system_busy_time_s", side_effect=[100.0, 112.0, 112.0]
+        ):
+            tree = attribution.ProcessTreeAttribution()
+            results = tree.add_energy({"energy_j": {"cpu": 40.0, "gpu": 80.0}})
+
+        self.assertEqual(results["cpu_tree_share"], 0.25)
+        self.assertEqual(
+            results["energy_j"],
+            {"cpu": 40.0, "cpu_attributed": 10.0, "gpu": 80.0},
+        )
+
+    def test_streaming_results(self):
+        with mock.patch.object(
+            attribution, "tree_cpu_time_s", side_effect=[0.0, 6.0, 6.0]
+        ), mock.patch.object(
+            attribution, "system_busy_time_s", side_effect=[0.0, 4.0, 4.0]
+        ):
+            tree = attribution.ProcessTreeAttribution()
+            results = tree.add_energy({"cpu_energy_uj": {"count": 2, "energy_j": 5.0}})
+
+        # Busy time read before the tree time may be behind it: capped to the whole
+        self.assertEqual(results["cpu_tree_share"], 1.0)
+        self.assertEqual(results["energy_j"], {"cpu": 5.0, "cpu_attributed": 5.0})
+
+    def test_exclude(self):
+        tree = attribution.ProcessTreeAttribution()
+        with mock.patch.object(
+            attribution, "tree_cpu_time_s", return_value=7.0
+        ) as tree_cpu_time_s:
+            tree.exclude(tree.process.pid, 2**22 + 1)
+
+        self.assertEqual([process.pid for process in tree.excluded], [os.getpid()])
+        tree_cpu_time_s.assert_called_once_with(tree.process, tree.excluded)
+        self.assertEqual(tree._tasks_s, 7.0)
+
+    def test_current_process(self):
+        tree = attribution.ProcessTreeAttribution()
+        sum(i * i for i in range(200000))
+        self.assertGreaterEqual(tree.share(), 0.0)
+        self.assertLessEqual(tree.share(), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
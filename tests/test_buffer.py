@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from power.buffer import SampleBuffer
+from power.statistics import DataMonitor
+
+
+class TestSampleBuffer(unittest.TestCase):
+    def test_drain_swaps_rows(self):
+        buffer = SampleBuffer()
+        buffer.push((1.0, 10))
+        buffer.push((2.0, 20))
+
+        self.assertEqual(buffer.drain(), [(1.0, 10), (2.0, 20)])
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.drain_columns(), ())
+
+        buffer.push((3.0, 30))
+        buffer.push((4.0, 40))
+        self.assertEqual(buffer.drain_columns(), ((3.0, 4.0), (30, 40)))
+
+    def test_concurrent_handoff_is_lossless(self):
+        buffer = SampleBuffer()
+        count = 20000
+        drained = []
+
+        def produce():
+            for i in range(count):
+                buffer.push((i,))
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while producer.is_alive():
+            drained.extend(buffer.drain())
+        producer.join()
+        drained.extend(buffer.drain())
+
+        self.assertEqual([row[0] for row in drained], list(range(count)))
+
+    def test_take_results_resets_atomically(self):
+        data_monitor = DataMonitor()
+        data_monitor.set_start_time()
+        data_monitor.update_values_ram((1.0, 1.0), (0, 1000000000))
+        data_monitor.set_stop_time()
+
+        results = data_monitor.take_results()
+        self.assertEqual(results["ram_power_w"], [1.0, 1.0])
+        self.assertAlmostEqual(results["energy_j"]["ram"], 1.0)
+        self.assertEqual(len(data_monitor.ram_power_w), 0)
+
+        data_monitor.update_values_ram((2.0,), (2000000000,))
+        self.assertEqual(data_monitor.ram_power_w.tolist(), [2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from power.attribution import CgroupAttribution
+from power.cgroup import CgroupStats, find_cgroup, read_cgroup_path
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def write_file(path, content):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+class TestCgroup(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.cgroup_dir = os.path.join(self.root, "system.slice", "run.scope")
+        os.makedirs(self.cgroup_dir)
+
+        self.proc_file = os.path.join(self.root, "cgroup")
+        write_file(self.proc_file, "0::/system.slice/run.scope\n")
+        self.set_usage(0)
+        write_file(os.path.join(self.cgroup_dir, "cpu.max"), "200000 100000\n")
+        write_file(os.path.join(self.cgroup_dir, "memory.max"), "4000\n")
+        write_file(os.path.join(self.cgroup_dir, "memory.current"), "1000\n")
+        write_file(os.path.join(self.cgroup_dir, "memory.peak"), "3000\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def set_usage(self, usage_usec):
+        write_file(
+            os.path.join(self.cgroup_dir, "cpu.stat"),
+            f"usage_usec {usage_usec}\nuser_usec {usage_usec}\nsystem_usec 0\n",
+        )
+
+    def test_find_cgroup(self):
+        self.assertEqual(read_cgroup_path(self.proc_file), "/system.slice/run.scope")
+        self.assertEqual(find_cgroup(self.root, self.proc_file), self.cgroup_dir)
+
+        # cgroup v1 only
+        write_file(self.proc_file, "4:memory:/run\n1:cpu,cpuacct:/run\n")
+        self.assertIsNone(find_cgroup(self.root, self.proc_file))
+        self.assertIsNone(find_cgroup(self.root, self.root + "/none"))
+
+    def test_utilisation(self):
+        clock = FakeClock()
+        cgroup = CgroupStats(self.cgroup_dir, clock=clock)
+        self.assertEqual(cgroup.cpus, 2)
+        self.assertEqual(cgroup.memory_limit_b, 4000)
+
+        # 1 s of CPU time over 1 s on a quota of 2 CPUs
+        clock.now = 1000000000
+        self.set_usage(1000000)
+        self.assertEqual(cgroup.utilisation(), (50.0, 25.0))
+
+        self.assertEqual(cgroup.cpu_time_s(), 1.0)
+        self.assertEqual(cgroup.memory_peak_b(), 3000)
+        cgroup.close()
+
+    def test_unlimited(self):
+        write_file(os.path.join(self.cgroup_dir, "cpu.max"), "max 100000\n")
+        write_file(os.path.join(self.cgroup_dir, "memory.max"), "max\n")
+        os.remove(os.path.join(self.cgroup_dir, "memory.peak"))
+
+        cgroup = CgroupStats(self.cgroup_dir)
+        self.assertEqual(cgroup.cpus, len(os.sched_getaffinity(0)))
+        self.assertGreater(cgroup.memory_limit_b, 4000)
+        self.assertIsNone(cgroup.memory_peak_b())
+        cgroup.close()
+
+    def test_attribution(self):
+        cgroup = CgroupStats(self.cgroup_dir)
+        attribution = CgroupAttribution(cgroup)
+        self.set_usage(500)
+
+        results = attribution.add_energy({"energy_j": {"cpu": 10.0}})
+        self.assertEqual(results["cgroup_memory_peak_b"], 3000)
+        self.assertGreaterEqual(results["cpu_cgroup_share"], 0.0)
+        self.assertAlmostEqual(
+            results["energy_j"]["cpu_cgroup"], 10.0 * results["cpu_cgroup_share"]
+        )
+        cgroup.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+import unittest
+
+from power import columnar
+from power.statistics import DataMonitor
+from power.stats import Stats
+
+
+def data_monitor():
+    data_monitor = DataMonitor()
+    data_monitor.update_values_cpu(
+        (
+            [0.0, 1e6, 3e6],
+            [1.0] * 3,
+            [10.0] * 3,
+            [20.0] * 3,
+            [40.0] * 3,
+            [0, 10, 20],
+        )
+    )
+    data_monitor.update_values_gpu(
+        ([50.0, 60.0], [30.0] * 2, [0] * 2, [0] * 2, [5.0] * 2, [10, 30]), 1
+    )
+    return data_monitor
+
+
+@unittest.skipUnless(columnar.available(), "pyarrow is not installed")
+class TestColumnar(unittest.TestCase):
+    def test_sample_table(self):
+        table = columnar.sample_table(
+            data_monitor().phase_views(0, 100), "LeNet", "stats_train", 1
+        )
+
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.schema.field("cpu_percent").type, "float")
+        self.assertEqual(table.schema.field("cpu_energy_uj").type, "double")
+        self.assertEqual(table.schema.field("timestamp_ns").type, "int64")
+
+        rows = table.to_pylist()
+        self.assertEqual(
+            [(row["source"], row["device"]) for row in rows],
+            [("cpu", None)] * 3 + [("gpu", 1)] * 2,
+        )
+        self.assertEqual([row["timestamp_ns"] for row in rows], [0, 10, 20, 10, 30])
+        self.assertEqual(rows[0]["cpu_percent"], 10.0)
+        self.assertIsNone(rows[0]["gpu_power_w"])
+        self.assertEqual(rows[4]["gpu_power_w"], 60.0)
+        self.assertTrue(all(row["net"] == "LeNet" for row in rows))
+
+    def test_row_group_per_phase(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = columnar.ColumnarWriter(tmp_dir, "exp_0")
+            for epoch in (1, 2):
+                writer.write(
+                    data_monitor().phase_views(0, 100), "LeNet", "stats_train", epoch
+                )
+            writer.write(DataMonitor().phase_views(0, 100), "LeNet", "stats_test", 1)
+            writer.close()
+
+            file_path = os.path.join(tmp_dir, "samples_exp_0_LeNet.parquet")
+            self.assertEqual(writer.file_path, file_path)
+            self.assertEqual(columnar.pq.ParquetFile(file_path).num_row_groups, 2)
+
+            samples = columnar.read_samples(
+                file_path,
+                ["epoch", "gpu_power_w"],
+                [("source", "=", "gpu"), ("epoch", "=", 2)],
+            )
+
+        self.assertEqual(samples.column_names, ["epoch", "gpu_power_w"])
+        self.assertEqual(samples.column("gpu_power_w").to_pylist(), [50.0, 60.0])
+
+    def test_stats_phases(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats = Stats(0.02, "cpu", net="LeNet", file_dir=tmp_dir, columnar=True)
+            stats.start()
+            try:
+                for epoch in (1, 2):
+                    with stats.phase("stats_train", epoch=epoch):
+                        time.sleep(0.1)
+            finally:
+                stats.stop()
+
+            samples = columnar.read_samples(
+                os.path.join(tmp_dir, "samples_exp_0_LeNet.parquet"),
+                ["epoch", "source"],
+            )
+
+        self.assertEqual(set(samples.column("epoch").to_pylist()), {1, 2})
+        self.assertIn("cpu", samples.column("source").to_pylist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from power.columns import Column
+from power.statistics import DataMonitor
+
+
+class TestColumn(unittest.TestCase):
+    def test_append_and_grow(self):
+        column = Column(capacity=2)
+        for value in range(5):
+            column.append(value)
+        column.extend([5.5, 6.5])
+
+        self.assertEqual(len(column), 7)
+        self.assertEqual(column.tolist(), [0, 1, 2, 3, 4, 5.5, 6.5])
+        self.assertEqual(column[-1], 6.5)
+
+    def test_view_is_a_zero_copy_snapshot(self):
+        column = Column(np.int64, capacity=4)
+        column.extend([1, 2])
+        view = column.view()
+        self.assertIs(view.base, column.view().base)
+
+        column.extend([3, 4, 5])  # forces a new buffer
+        column.clear()
+        column.append(9)
+        self.assertEqual(view.tolist(), [1, 2])
+        self.assertEqual(column.tolist(), [9])
+
+    def test_discard_keeps_views(self):
+        column = Column(capacity=2)
+        column.extend([1.0, 2.0, 3.0])
+        view = column.view()
+
+        column.discard(2)
+        self.assertEqual(column.tolist(), [3.0])
+        self.assertEqual(view.tolist(), [1.0, 2.0, 3.0])
+        column.discard(5)
+        self.assertEqual(len(column), 0)
+
+
+class TestDataMonitorColumns(unittest.TestCase):
+    def test_construct_results_and_views(self):
+        data_monitor = DataMonitor()
+        data_monitor.set_start_time()
+        data_monitor.update_values_time(10, 0)
+        data_monitor.update_values_ram([3.2], [10])
+        data_monitor.set_stop_time()
+
+        results = data_monitor.construct_results()
+        self.assertEqual(results["sample_time_ns"], [10])
+        self.assertEqual(results["ram_power_w"], [3.2])
+        self.assertNotIn("gpu_power_w", results)
+        self.assertNotIn("lock", results)
+
+        views = data_monitor.views()
+        self.assertEqual(views["sample_time_ns"].dtype, np.int64)
+        self.assertFalse(views["ram_power_w"].flags.writeable)
+
+        data_monitor.reset_values()
+        self.assertEqual(len(data_monitor.ram_power_w), 0)
+        self.assertEqual(views["ram_power_w"].tolist(), [3.2])
+
+
+if __name__ == "__main__":
+    unittest.main()
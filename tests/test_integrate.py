@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from power.integrate import (
+    counter_energy_j,
+    phase_energy,
+    summary_energy,
+    trapezoid_energy_j,
+)
+from power.statistics import DataMonitor
+
+
+class TestIntegrate(unittest.TestCase):
+    def test_trapezoid_with_jitter(self):
+        # Uneven intervals are weighted by their measured duration
+        timestamps_ns = np.array([0, 100000000, 350000000, 400000000])
+        power_w = np.array([10.0, 20.0, 20.0, 0.0])
+        self.assertAlmostEqual(
+            trapezoid_energy_j(timestamps_ns, power_w), 1.5 + 5.0 + 0.5
+        )
+        self.assertEqual(trapezoid_energy_j([0], [10.0]), 0.0)
+
+    def test_counter(self):
+        self.assertAlmostEqual(counter_energy_j([1000000, 2500000, 4000000]), 3.0)
+        self.assertEqual(counter_energy_j([]), 0.0)
+
+    def test_phase_energy(self):
+        series = {
+            "cpu_energy_uj": np.array([0.0, 2000000.0]),
+            "dram_energy_uj": np.array([0.0, 500000.0]),
+            "ram_time_ns": np.array([0, 1000000000]),
+            "ram_power_w": np.array([3.0, 3.0]),
+            "gpu_time_ns": np.array([0, 1000000000]),
+            "gpu_power_w": np.array([100.0, 200.0]),
+        }
+        self.assertEqual(phase_energy(series), {"cpu": 2.0, "dram": 0.5, "gpu": 150.0})
+
+    def test_summary_energy(self):
+        summaries = {
+            "cpu_energy_uj": {"count": 3, "energy_j": 2.0},
+            "cpu_percent": {"count": 3},
+            "ram_power_w": {"count": 3, "energy_j": 6.0},
+            "gpu_power_w": {
+                "0": {"count": 3, "energy_j": 100.0},
+                "1": {"count": 3, "energy_j": 50.0},
+            },
+            "gpu_energy_uj": {"1": {"count": 3, "energy_j": 60.0}, "2": {"count": 1}},
+        }
+        self.assertEqual(
+            summary_energy(summaries),
+            {"cpu": 2.0, "gpu:0": 100.0, "gpu:1": 60.0, "gpu": 160.0, "ram": 6.0},
+        )
+
+    def test_stored_with_results(self):
+        data_monitor = DataMonitor()
+        data_monitor.set_start_time()
+        data_monitor.update_values_ram([3.0, 3.0, 3.0], [0, 500000000, 2000000000])
+        data_monitor.set_stop_time()
+
+        results = data_monitor.construct_results()
+        self.assertEqual(results["ram_time_ns"], [0, 500000000, 2000000000])
+        self.assertAlmostEqual(results["energy_j"]["ram"], 6.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from power import inventory
+
+
+def write_name(path, name):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "name"), "w", encoding="utf-8") as file:
+        file.write(f"{name}\n")
+
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rapl_dir = os.path.join(self.tmp_dir.name, "powercap")
+        self.hwmon_dir = os.path.join(self.tmp_dir.name, "hwmon")
+
+        write_name(os.path.join(self.rapl_dir, "intel-rapl:0"), "package-0")
+        write_name(os.path.join(self.rapl_dir, "intel-rapl:0:0"), "core")
+        os.makedirs(os.path.join(self.rapl_dir, "intel-rapl"))
+        write_name(os.path.join(self.hwmon_dir, "hwmon0"), "k10temp")
+        os.makedirs(os.path.join(self.hwmon_dir, "hwmon1"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        inventory._inventory = None
+
+    def test_listings(self):
+        self.assertEqual(
+            inventory.list_rapl_zones(self.rapl_dir),
+            [["intel-rapl:0", "package-0"], ["intel-rapl:0:0", "core"]],
+        )
+        self.assertEqual(inventory.list_hwmon(self.hwmon_dir), [["hwmon0", "k10temp"]])
+        self.assertEqual(inventory.list_rapl_zones(self.tmp_dir.name + "/none"), [])
+
+    def test_items_are_probed_once(self):
+        tmp_inventory = inventory.Inventory(self.rapl_dir, self.hwmon_dir)
+        with mock.patch.object(
+            inventory, "list_rapl_zones", return_value=[]
+        ) as list_rapl_zones:
+            tmp_inventory.rapl_zones
+            tmp_inventory.rapl_zones
+        self.assertEqual(list_rapl_zones.call_count, 1)
+
+        cpu = tmp_inventory.cpu_model()
+        cpu["chipset"] = "generic"
+        self.assertNotEqual(tmp_inventory.cpu_model(), cpu)
+
+    def test_persisted_per_boot(self):
+        cache_dir = os.path.join(self.tmp_dir.name, "results")
+        inventory._inventory = inventory.Inventory(self.rapl_dir, self.hwmon_dir)
+        first = inventory.get_inventory(cache_dir)
+        self.assertIs(inventory.get_inventory(), first)
+
+        file_path = os.path.join(cache_dir, inventory.INVENTORY_FILE)
+        loaded = inventory.Inventory.load(file_path)
+        self.assertEqual(loaded.rapl_zones, first.rapl_zones)
+        self.assertEqual(loaded.hwmon, [["hwmon0", "k10temp"]])
+
+        # A new process of the same boot loads it instead of probing
+        inventory._inventory = None
+        self.assertEqual(
+            inventory.get_inventory(cache_dir).rapl_zones, first.rapl_zones
+        )
+
+        with open(file_path, "r", encoding="utf-8") as file:
+            persisted = json.load(file)
+        persisted["host"]["boot_id"] = "another-boot"
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(persisted, file)
+        self.assertIsNone(inventory.Inventory.load(file_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from collections import namedtuple
+from unittest import mock
+
+from power.nvidia import NvidiaGPU
+from power.statistics import DataMonitor
+
+Memory = namedtuple("Memory", "total free used")
+Utilization = namedtuple("Utilization", "gpu memory")
+
+
+class NVMLError(Exception):
+    pass
+
+
+def fake_pynvml(device_count=2, energy_mj=None) -> mock.Mock:
+    """
+    A fake pynvml module. `energy_mj` maps the handles exposing an energy counter to
+    their current reading, the other handles raise NVMLError as on pre-Volta cards.
+    """
+    energy_mj = {} if energy_mj is None else energy_mj
+
+    def total_energy(handle):
+        if handle not in energy_mj:
+            raise NVMLError("Not Supported")
+        return energy_mj[handle]
+
+    nvml = mock.Mock()
+    nvml.NVMLError = NVMLError
+    nvml.nvmlDeviceGetTotalEnergyConsumption.side_effect = total_energy
+    nvml.nvmlDeviceGetCount.return_value = device_count
+    nvml.nvmlDeviceGetHandleByIndex.side_effect = lambda index: f"handle{index}"
+    nvml.nvmlDeviceGetPowerUsage.side_effect = lambda handle: {
+        "handle0": 250000,
+        "handle1": 100000,
+    }[handle]
+    nvml.nvmlDeviceGetTemperature.return_value = 70
+    nvml.nvmlDeviceGetMemoryInfo.return_value = Memory(16, 6, 10)
+    nvml.nvmlDeviceGetUtilizationRates.return_value = Utilization(90, 40)
+    return nvml
+
+
+class TestNvidiaGPU(unittest.TestCase):
+    def test_single_query_per_tick(self):
+        nvml = fake_pynvml()
+        data_monitor = DataMonitor()
+        with mock.patch("power.nvidia.pynvml", nvml):
+            gpu = NvidiaGPU(0.1, data_monitor)
+            for timestamp_ns in range(3):
+                gpu.sample(timestamp_ns)
+            gpu.get_current_stats()
+
+        self.assertEqual(nvml.nvmlDeviceGetHandleByIndex.call_count, 2)
+        for query in (
+            nvml.nvmlDeviceGetPowerUsage,
+            nvml.nvmlDeviceGetTemperature,
+            nvml.nvmlDeviceGetMemoryInfo,
+            nvml.nvmlDeviceGetUtilizationRates,
+        ):
+            self.assertEqual(query.call_count, 6)
+
+        self.assertEqual(
+            data_monitor.gpu_power_w.tolist(), {"0": [250.0] * 3, "1": [100.0] * 3}
+        )
+        self.assertEqual(data_monitor.gpu_time_ns.tolist()["1"], [0, 1, 2])
+
+    def test_energy_per_device(self):
+        nvml = fake_pynvml()
+        data_monitor = DataMonitor()
+        with mock.patch("power.nvidia.pynvml", nvml):
+            gpu = NvidiaGPU(0.1, data_monitor)
+            gpu.sample(0)
+            gpu.sample(2000000000)
+            gpu.get_current_stats()
+
+        data_monitor.set_start_time()
+        data_monitor.set_stop_time()
+        energy = data_monitor.construct_results()["energy_j"]
+        self.assertAlmostEqual(energy["gpu:0"], 500.0)
+        self.assertAlmostEqual(energy["gpu:1"], 200.0)
+        self.assertAlmostEqual(energy["gpu"], 700.0)
+
+    def test_streaming_summary_per_device(self):
+        nvml = fake_pynvml()
+        data_monitor = DataMonitor(streaming=True)
+        with mock.patch("power.nvidia.pynvml", nvml):
+            gpu = NvidiaGPU(0.1, data_monitor)
+            gpu.sample(0)
+            gpu.get_current_stats()
+
+        summary = data_monitor.summaries()["gpu_power_w"]
+        self.assertEqual(summary["0"]["mean"], 250.0)
+        self.assertEqual(summary["1"]["mean"], 100.0)
+
+    def test_energy_counter_preferred(self):
+        energy_mj = {"handle0": 1000, "handle1": 5000}
+        nvml = fake_pynvml(energy_mj=energy_mj)
+        data_monitor = DataMonitor()
+        with mock.patch("power.nvidia.pynvml", nvml):
+            gpu = NvidiaGPU(0.1, data_monitor)
+            self.assertEqual(gpu.energy_counters, [True, True])
+            self.assertEqual(gpu.metrics_every, 10)
+
+            for tick in range(20):
+                gpu.sample(tick * 100000000)
+                energy_mj["handle0"] += 30000
+                energy_mj["handle1"] += 10000
+            gpu.get_current_stats()
+
+        # The counters are read every tick, the other metrics once per second
+        self.assertEqual(nvml.nvmlDeviceGetTotalEnergyConsumption.call_count, 42)
+        self.assertEqual(nvml.nvmlDeviceGetPowerUsage.call_count, 4)
+        self.assertEqual(len(data_monitor.gpu_energy_uj[0]), 20)
+        self.assertEqual(data_monitor.gpu_time_ns.tolist()["0"], [0, 1000000000])
+
+        data_monitor.set_start_time()
+        data_monitor.set_stop_time()
+        energy = data_monitor.construct_results()["energy_j"]
+        self.assertAlmostEqual(energy["gpu:0"], 19 * 30.0)
+        self.assertAlmostEqual(energy["gpu:1"], 19 * 10.0)
+        self.assertAlmostEqual(energy["gpu"], 19 * 40.0)
+
+    def test_power_fallback_without_counter(self):
+        nvml = fake_pynvml(energy_mj={"handle0": 0})
+        data_monitor = DataMonitor()
+        with mock.patch("power.nvidia.pynvml", nvml):
+            gpu = NvidiaGPU(0.1, data_monitor)
+            self.assertEqual(gpu.energy_counters, [True, False])
+            self.assertEqual(gpu.metrics_every, 1)
+
+            gpu.sample(0)
+            gpu.sample(2000000000)
+            gpu.get_current_stats()
+
+        data_monitor.set_start_time()
+        data_monitor.set_stop_time()
+        energy = data_monitor.construct_results()["energy_j"]
+        # The counter of gpu 0 did not move, gpu 1 is integrated from its power
+        self.assertEqual(energy["gpu:0"], 0.0)
+        self.assertAlmostEqual(energy["gpu:1"], 200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import tempfile
+import time
+import unittest
+
+from power.stats import Stats
+from power.statistics import DataMonitor
+from utils.results_log import load_results
+
+
+class TestPhases(unittest.TestCase):
+    def test_results_sliced_by_time(self):
+        data_monitor = DataMonitor()
+        data_monitor.update_values_cpu(
+            (
+                [0.0, 1e6, 3e6, 6e6],
+                [1.0] * 4,
+                [10.0] * 4,
+                [20.0] * 4,
+                [40.0] * 4,
+                [0, 10, 20, 30],
+            )
+        )
+        data_monitor.update_values_gpu(
+            ([50.0, 60.0], [30.0] * 2, [0] * 2, [0] * 2, [5.0] * 2, [10, 30]), 1
+        )
+
+        results = data_monitor.phase_results(5, 20)
+        self.assertEqual(results["cpu_time_ns"], [10, 20])
+        self.assertEqual(results["gpu_power_w"], {"1": [50.0]})
+        # Interpolated at both edges from the samples around them
+        self.assertAlmostEqual(results["energy_j"]["cpu"], 2.5)
+        self.assertEqual(set(results["energy_j"]), {"cpu", "gpu", "gpu:1"})
+
+        # Nothing was cleared
+        self.assertEqual(len(data_monitor.cpu_time_ns), 4)
+
+        data_monitor.discard_before(20)
+        self.assertEqual(data_monitor.cpu_energy_uj.tolist(), [3e6, 6e6])
+        self.assertEqual(data_monitor.gpu_time_ns[1].tolist(), [30])
+
+        with self.assertRaises(ValueError):
+            DataMonitor(streaming=True).phase_results(0, 1)
+
+    def test_energy_at_phase_edges(self):
+        # A counter of 10 W sampled every 50 ms, and a phase of 0.196 s stopped
+        # before the next sample
+        timestamps_ns = [tick * 50000000 for tick in range(6)]
+        data_monitor = DataMonitor()
+        data_monitor.update_values_cpu(
+            (
+                [tick * 0.5e6 for tick in range(6)],
+                [1.0] * 6,
+                [10.0] * 6,
+                [20.0] * 6,
+                [40.0] * 6,
+                timestamps_ns,
+            )
+        )
+
+        results = data_monitor.phase_results(60000000, 256000000)
+        self.assertEqual(results["cpu_time_ns"], timestamps_ns[2:])
+        self.assertAlmostEqual(results["energy_j"]["cpu"], 1.96)
+
+    def test_nested_phases(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats = Stats(0.02, "cpu", net="LeNet", file_dir=tmp_dir)
+            stats.start()
+            try:
+                with stats.phase("stats_train", epoch=1) as record:
+                    markers = stats.step_markers(4)
+                    markers.mark()
+                    for window in range(2):
+                        with stats.phase("batches", window=window):
+                            time.sleep(0.1)
+                        markers.mark()
+            finally:
+                stats.stop()
+
+            results = load_results(tmp_dir, "stats_train")["exp_0"]["LeNet"]["1"]
+
+        self.assertEqual(results["start_ns"], record["start_ns"])
+        self.assertEqual([phase["window"] for phase in results["phases"]], [0, 1])
+        self.assertTrue(
+            all(
+                record["start_ns"] <= t <= record["stop_ns"]
+                for t in results["cpu_time_ns"]
+            )
+        )
+        self.assertEqual(len(results["steps"]["duration_s"]), 2)
+        self.assertTrue(all(e >= 0 for e in results["steps"]["energy_j"]["cpu"]))
+        for phase in results["phases"]:
+            self.assertEqual(phase["name"], "batches")
+            self.assertIn("cpu", phase["energy_j"])
+            self.assertLessEqual(phase["energy_j"]["cpu"], results["energy_j"]["cpu"])
+
+
+if __name__ == "__main__":
+    unittest.main()
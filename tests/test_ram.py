@@ -0,0 +1,95 @@
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from power import inventory
+from power.ram import RAM
+from power.statistics import DataMonitor
+from power.stats import Stats
+
+
+class TestRAM(unittest.TestCase):
+    def setUp(self):
+        tmp_inventory = inventory.Inventory()
+        tmp_inventory.__dict__["dimms"] = {
+            "count": 2,
+            "size": ["8", "8"],
+            "voltage": ["1.2", "1.2"],
+        }
+        inventory._inventory = tmp_inventory
+
+    def tearDown(self):
+        inventory._inventory = None
+
+    def test_energy_of_the_phase_duration(self):
+        ram = RAM()
+        self.assertAlmostEqual(ram.power_w, round(16 / 3.12, 2))
+        self.assertAlmostEqual(ram.energy_j(10), ram.power_w * 10)
+        self.assertAlmostEqual(ram.energy_j(10, memory_percent=50), ram.power_w * 7.5)
+        self.assertEqual(ram.energy_j(-1), 0)
+        self.assertEqual(
+            ram.energy_j(np.array([2.0, -1.0]), 50).tolist(), [ram.power_w * 1.5, 0]
+        )
+
+    def test_added_to_the_results(self):
+        ram = RAM()
+        data_monitor = DataMonitor()
+        data_monitor.update_values_cpu(([1.0], [0.0], [10.0], [40.0], [50.0], [0]))
+        data_monitor.start_time = 1000
+        data_monitor.stop_time = 3000
+
+        results = ram.add_energy(data_monitor.take_results())
+        self.assertEqual(results["ram_model_w"], ram.power_w)
+        self.assertAlmostEqual(results["energy_j"]["ram"], ram.energy_j(2, 40.0))
+        self.assertNotIn("ram_power_w", results)
+
+        data_monitor.update_values_rapl(((), (), [0.0, 1000000.0], ()))
+        data_monitor.start_time = 1000
+        data_monitor.stop_time = 2000
+        results = ram.add_energy(data_monitor.take_results())
+        self.assertEqual(results["energy_j"], {"dram": 1.0})
+        self.assertNotIn("ram_model_w", results)
+
+    def test_streaming_results(self):
+        ram = RAM()
+        data_monitor = DataMonitor(streaming=True)
+        data_monitor.update_values_cpu(
+            ([1.0] * 2, [0.0] * 2, [10.0] * 2, [20.0, 60.0], [50.0] * 2, [0, 1])
+        )
+        data_monitor.start_time = 0
+        data_monitor.stop_time = 4000
+
+        results = ram.add_energy(data_monitor.take_results())
+        self.assertAlmostEqual(results["energy_j"]["ram"], ram.energy_j(4, 40.0))
+
+    def test_steps_of_the_same_model(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats = Stats(0.02, "cpu", net="LeNet", file_dir=tmp_dir)
+            stats.start()
+            try:
+                with stats.phase("stats_train", epoch=1) as record:
+                    with stats.phase("batches"):
+                        markers = stats.step_markers(2)
+                        markers.mark()
+                        for _ in range(2):
+                            time.sleep(0.1)
+                            markers.mark()
+            finally:
+                stats.stop()
+
+        if stats.ram is None:
+            self.skipTest("The RAM is measured by RAPL")
+
+        # The mean power of the steps is the one of the phase they belong to
+        phase = record["phases"][0]
+        duration_s = (phase["stop_time"] - phase["start_time"]) / 1000
+        self.assertAlmostEqual(
+            sum(phase["steps"]["energy_j"]["ram"]) / sum(phase["steps"]["duration_s"]),
+            phase["energy_j"]["ram"] / duration_s,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
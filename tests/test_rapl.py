@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+from power.intel import IntelCPU
+from power.rapl import RaplDomain
+from power.statistics import DataMonitor
+
+MAX_ENERGY_RANGE_UJ = 262143328850
+
+
+def write_zone(root, zone, name, energy_uj, max_energy_range_uj=MAX_ENERGY_RANGE_UJ):
+    path = os.path.join(root, zone)
+    os.makedirs(path, exist_ok=True)
+    for file_name, value in (
+        ("name", name),
+        ("energy_uj", energy_uj),
+        ("max_energy_range_uj", max_energy_range_uj),
+    ):
+        with open(os.path.join(path, file_name), "w", encoding="utf-8") as file:
+            file.write(f"{value}\n")
+
+    return path
+
+
+def set_energy(path, energy_uj):
+    with open(os.path.join(path, "energy_uj"), "w", encoding="utf-8") as file:
+        file.write(f"{energy_uj}\n")
+
+
+class TestRaplDomain(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_delta_and_total(self):
+        path = write_zone(self.root, "intel-rapl:0", "package-0", 1000)
+        domain = RaplDomain(path, "package-0")
+
+        set_energy(path, 4000)
+        self.assertEqual(domain.update(), 3000)
+        set_energy(path, 4500)
+        self.assertEqual(domain.update(), 500)
+        self.assertEqual(domain.total_uj, 3500)
+        domain.close()
+
+    def test_wraparound(self):
+        path = write_zone(self.root, "intel-rapl:0", "package-0", 100, 1000)
+        domain = RaplDomain(path, "package-0")
+
+        set_energy(path, 900)
+        domain.update()
+        set_energy(path, 50)  # counter wrapped at 1000
+        self.assertEqual(domain.update(), 150)
+        self.assertEqual(domain.total_uj, 950)
+        self.assertAlmostEqual(domain.energy_j, 0.00095)
+        domain.close()
+
+    def test_unknown_range_never_goes_negative(self):
+        path = write_zone(self.root, "intel-rapl:0", "package-0", 100)
+        os.remove(os.path.join(path, "max_energy_range_uj"))
+        domain = RaplDomain(path, "package-0")
+
+        set_energy(path, 50)
+        self.assertEqual(domain.update(), 0)
+        self.assertEqual(domain.total_uj, 0)
+        domain.close()
+
+
+class TestIntelCPU(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.package_0 = write_zone(self.root, "intel-rapl:0", "package-0", 0, 1000000)
+        self.package_1 = write_zone(self.root, "intel-rapl:1", "package-1", 500000)
+        write_zone(self.root, "intel-rapl:2", "psys", 0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_per_package_accounting(self):
+        data_monitor = DataMonitor()
+        cpu = IntelCPU(0.1, data_monitor, rapl_dir=self.root)
+        self.assertTrue(cpu.rapl_devices_exist())
+        self.assertEqual(cpu._devices, ["cpu:0", "cpu:1"])
+
+        cpu.sample(0)
+        set_energy(self.package_0, 900000)
+        set_energy(self.package_1, 600000)
+        cpu.sample(100000000)
+        set_energy(self.package_0, 100000)  # package-0 wraps at 1J
+        set_energy(self.package_1, 700000)
+        cpu.sample(200000000)
+        cpu.get_current_stats()
+        cpu.close()
+
+        self.assertEqual(data_monitor.cpu_energy_uj.tolist(), [0, 1000000, 1300000])
+        for power, expected in zip(data_monitor.cpu_delta_power_w, [0, 10.0, 3.0]):
+            self.assertAlmostEqual(power, expected)
+
+        package_energy = cpu.package_energy_j()
+        self.assertAlmostEqual(package_energy["cpu:0"], 1.1)
+        self.assertAlmostEqual(package_energy["cpu:1"], 0.2)
+
+    def test_subdomains(self):
+        core = write_zone(self.root, "intel-rapl:0:0", "core", 0)
+        uncore = write_zone(self.root, "intel-rapl:0:1", "uncore", 0)
+        dram = write_zone(self.root, "intel-rapl:0:2", "dram", 0)
+        data_monitor = DataMonitor()
+        cpu = IntelCPU(0.1, data_monitor, rapl_dir=self.root)
+        self.assertTrue(cpu.dram_domain_exists())
+
+        cpu.sample(0)
+        set_energy(core, 300000)
+        set_energy(uncore, 100000)
+        set_energy(dram, 200000)
+        set_energy(self.root + "/intel-rapl:2", 700000)
+        cpu.sample(100000000)
+        cpu.get_current_stats()
+        cpu.close()
+
+        self.assertEqual(data_monitor.cpu_core_energy_uj.tolist(), [0, 300000])
+        self.assertEqual(data_monitor.cpu_uncore_energy_uj.tolist(), [0, 100000])
+        self.assertEqual(data_monitor.dram_energy_uj.tolist(), [0, 200000])
+        self.assertEqual(data_monitor.psys_energy_uj.tolist(), [0, 700000])
+        self.assertAlmostEqual(data_monitor.ram_power_w[-1], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+
+from utils.results_log import append_record, load_results, read_records, read_results
+
+
+def record(net, epoch, results, experiment="exp_0"):
+    return {
+        "experiment": experiment,
+        "run_id": 0,
+        "net": net,
+        "epoch": epoch,
+        "mode": "stats_train",
+        "results": results,
+    }
+
+
+class TestResultsLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "stats_train.jsonl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_nested_view(self):
+        append_record(self.file_path, record("LeNet", 1, {"cpu_percent": [1.0]}))
+        append_record(self.file_path, record("LeNet", 2, {"cpu_percent": [2.0]}))
+        append_record(self.file_path, record("VGG", 1, {"cpu_percent": [3.0]}))
+        append_record(
+            self.file_path, record("LeNet", 1, {"cpu_percent": [4.0]}, "exp_1")
+        )
+
+        self.assertEqual(
+            read_results(self.file_path),
+            {
+                "exp_0": {
+                    "LeNet": {"1": {"cpu_percent": [1.0]}, "2": {"cpu_percent": [2.0]}},
+                    "VGG": {"1": {"cpu_percent": [3.0]}},
+                },
+                "exp_1": {"LeNet": {"1": {"cpu_percent": [4.0]}}},
+            },
+        )
+
+    def test_last_record_wins(self):
+        append_record(self.file_path, record("LeNet", 1, {"cpu_percent": [1.0]}))
+        append_record(self.file_path, record("LeNet", 1, {"cpu_percent": [2.0]}))
+
+        results = read_results(self.file_path)
+        self.assertEqual(results["exp_0"]["LeNet"]["1"], {"cpu_percent": [2.0]})
+
+    def test_truncated_record(self):
+        append_record(self.file_path, record("LeNet", 1, {"cpu_percent": [1.0]}))
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write('{"experiment": "exp_0", "net": "Le')
+
+        self.assertEqual(len(read_records(self.file_path)), 1)
+
+        # A record appended after the truncated one makes it a corrupted line
+        append_record(self.file_path, record("LeNet", 2, {}))
+        with self.assertRaises(ValueError):
+            read_records(self.file_path)
+
+    def test_legacy_json(self):
+        results = {"exp_0": {"LeNet": {"1": {"cpu_percent": [1.0]}}}}
+        with open(
+            os.path.join(self.tmp_dir.name, "stats_test.json"), "w", encoding="utf-8"
+        ) as file:
+            json.dump(results, file)
+
+        self.assertEqual(load_results(self.tmp_dir.name, "stats_test"), results)
+
+        append_record(self.file_path, record("LeNet", 1, {"cpu_percent": [1.0]}))
+        self.assertEqual(load_results(self.tmp_dir.name, "stats_train"), results)
+
+
+if __name__ == "__main__":
+    unittest.main()
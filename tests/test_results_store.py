@@ -0,0 +1,122 @@
+import os
+import tempfile
+import time
+import unittest
+
+from power.statistics import DataMonitor
+from power.stats import Stats
+from power.tool_results import ToolResults
+from utils.results_store import ResultsStore
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ResultsStore(os.path.join(self.tmp_dir.name, "results.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_energy_across_batch_sizes(self):
+        for batch_size, energy_j in ((64, 10.0), (128, 6.0)):
+            self.store.start_run(experiment=0, batch_size=batch_size)
+            for epoch in (1, 2):
+                self.store.add_phase(
+                    "LeNet",
+                    "stats_train",
+                    epoch,
+                    {
+                        "start_time": 1000,
+                        "stop_time": 3500,
+                        "energy_j": {"cpu": energy_j, "gpu": 2.0, "gpu:0": 2.0},
+                    },
+                    [("cpu_percent", None, 10, 50.0), ("gpu_power_w", 0, 10, 80.0)],
+                )
+                self.store.add_ml_metrics(
+                    "LeNet", "stats_train", epoch, duration_ms=2500, accuracy=50.0
+                )
+
+        rows = self.store.query(
+            "SELECT batch_size, epoch, duration_s, total_j, duration_ms, accuracy "
+            "FROM epoch_results WHERE net = ? AND mode = ? ORDER BY batch_size, epoch",
+            ("LeNet", "stats_train"),
+        )
+        self.assertEqual(
+            [tuple(row) for row in rows],
+            [
+                (64, 1, 2.5, 12.0, 2500.0, 50.0),
+                (64, 2, 2.5, 12.0, 2500.0, 50.0),
+                (128, 1, 2.5, 8.0, 2500.0, 50.0),
+                (128, 2, 2.5, 8.0, 2500.0, 50.0),
+            ],
+        )
+
+        plan = self.store.query(
+            "EXPLAIN QUERY PLAN SELECT * FROM ml_metrics "
+            "WHERE run_id = 1 AND net = 'LeNet' AND mode = 'stats_train' AND epoch = 1"
+        )
+        self.assertIn("ml_metrics_key", " ".join(row["detail"] for row in plan))
+
+        samples = self.store.query(
+            "SELECT series, device, value FROM samples JOIN phases USING (phase_id) "
+            "WHERE run_id = 2 AND epoch = 2 ORDER BY series"
+        )
+        self.assertEqual(
+            [tuple(row) for row in samples],
+            [("cpu_percent", None, 50.0), ("gpu_power_w", 0, 80.0)],
+        )
+
+    def test_streaming_phase(self):
+        self.store.start_run()
+        data_monitor = DataMonitor(streaming=True)
+        data_monitor.set_start_time()
+        for tick in range(3):
+            data_monitor.update_values_time(tick * 1000000000, 1000000000)
+            data_monitor.update_values_cpu(
+                ([tick * 1e6], [1.0], [50.0], [10.0], [40.0], [tick * 1000000000])
+            )
+        data_monitor.set_stop_time()
+        self.store.add_phase("LeNet", "stats_train", 1, data_monitor.take_results())
+
+        rows = self.store.query("SELECT total_j FROM phases")
+        self.assertAlmostEqual(rows[0]["total_j"], 2.0)
+
+    def test_model_complexity(self):
+        self.store.start_run()
+        self.store.add_model_complexity("LeNet", {"size_mb": 0.2, "macs": 100})
+        self.store.add_model_complexity("LeNet", {"size_mb": 0.2, "macs": 200})
+
+        rows = self.store.query("SELECT net, macs FROM model_complexity")
+        self.assertEqual([tuple(row) for row in rows], [("LeNet", 200)])
+
+    def test_writers(self):
+        self.store.start_run(experiment=3)
+
+        results = ToolResults("LeNet", file_dir=self.tmp_dir.name, store=self.store)
+        results.save_results("stats_train", 1, "1s200ms", "10ms", "0.500", 42.0)
+
+        stats = Stats(
+            0.02, "cpu", net="LeNet", file_dir=self.tmp_dir.name, store=self.store
+        )
+        stats.start()
+        try:
+            with stats.phase("stats_train", epoch=1):
+                time.sleep(0.1)
+        finally:
+            stats.stop()
+
+        row = self.store.query(
+            "SELECT experiment, duration_ms, step_ms, loss, total_j, duration_s "
+            "FROM epoch_results"
+        )[0]
+        self.assertEqual(tuple(row)[:4], (3, 1200.0, 10.0, 0.5))
+        self.assertGreaterEqual(row["total_j"], 0)
+        self.assertGreater(row["duration_s"], 0)
+
+        series = self.store.query("SELECT DISTINCT series FROM samples")
+        self.assertIn("cpu_percent", [row["series"] for row in series])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from power.scheduler import DeadlineScheduler, percentile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def test_no_drift(self):
+        # Sampling cost is absorbed by the wait, not added to the period
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(0.1, clock=clock)
+        scheduler.start()
+
+        timestamps = []
+        for _ in range(5):
+            timestamp, _ = scheduler.tick()
+            timestamps.append(timestamp)
+            clock.now += 30000000  # 30ms of sampling work
+            clock.now += round(scheduler.time_to_next() * 1e9)
+
+        self.assertEqual(timestamps, [0, 100000000, 200000000, 300000000, 400000000])
+        self.assertEqual(scheduler.missed_ticks, 0)
+
+    def test_measured_interval(self):
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(0.1, clock=clock)
+        scheduler.start()
+
+        self.assertEqual(scheduler.tick(), (0, 0))
+        clock.now = 120000000
+        self.assertEqual(scheduler.tick(), (120000000, 120000000))
+
+    def test_missed_ticks_are_coalesced(self):
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(0.1, clock=clock)
+        scheduler.start()
+
+        scheduler.tick()
+        clock.now = 350000000  # a stall covering three deadlines
+        self.assertEqual(scheduler.time_to_next(), 0)
+        self.assertEqual(scheduler.missed_ticks, 2)
+
+        # The coalesced tick is measured against the latest missed deadline
+        scheduler.tick()
+        self.assertAlmostEqual(scheduler.time_to_next(), 0.05)
+        self.assertEqual(scheduler.jitter_stats()["lateness_max_ms"], 50)
+
+    def test_jitter_stats(self):
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(0.2, clock=clock)
+        scheduler.start()
+
+        for lateness_ms in range(100):
+            clock.now += lateness_ms * 1000000
+            scheduler.tick()
+            clock.now += round(scheduler.time_to_next() * 1e9)
+
+        stats = scheduler.jitter_stats()
+        self.assertEqual(stats["ticks"], 100)
+        self.assertEqual(stats["lateness_p50_ms"], 49)
+        self.assertEqual(stats["lateness_p99_ms"], 98)
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 50), 0)
+        self.assertEqual(percentile([3, 1, 2], 50), 2)
+        self.assertEqual(percentile([3, 1, 2], 100), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import json
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from power import daemon
+from power.daemon import ProcessSampler, RingWriter, replay
+from power.shared_ring import RECORD, SampleRing
+from power.statistics import DataMonitor
+from power.stats import Stats
+from utils.results_log import load_results
+
+
+def records(timestamps):
+    tmp = np.zeros(len(timestamps), RECORD)
+    tmp["timestamp_ns"] = timestamps
+    return tmp
+
+
+class TestSampleRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = SampleRing(capacity=8)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_read_wraps_around(self):
+        self.ring.write(records(range(6)))
+        self.assertEqual(self.ring.read()["timestamp_ns"].tolist(), list(range(6)))
+
+        self.ring.write(records(range(6, 12)))
+        self.assertEqual(self.ring.read()["timestamp_ns"].tolist(), list(range(6, 12)))
+        self.assertEqual(len(self.ring.read()), 0)
+        self.assertEqual(self.ring.lost, 0)
+
+    def test_overrun_is_counted(self):
+        self.ring.write(records(range(20)))
+        self.assertEqual(self.ring.read()["timestamp_ns"].tolist(), list(range(12, 20)))
+        self.assertEqual(self.ring.lost, 12)
+
+    def test_attach_by_name(self):
+        reader = SampleRing(self.ring.name, capacity=8)
+        self.ring.write(records([1, 2]))
+        self.assertEqual(reader.read()["timestamp_ns"].tolist(), [1, 2])
+        reader.close()
+
+
+class TestReplay(unittest.TestCase):
+    def test_round_trip(self):
+        ring = SampleRing(capacity=64)
+        writer = RingWriter(ring)
+        writer.update_values_time(100, 0)
+        writer.update_values_cpu(
+            ((1.0, 2.0), (3.0, 4.0), (5, 6), (7, 8), (9, 9), (100, 200))
+        )
+        writer.update_values_rapl(((10.0, 20.0), (), (), ()))
+        writer.update_values_gpu(((250.0,), (70,), (6,), (10,), (90,), (100,)), 1)
+        writer.update_values_gpu_energy(((5000.0,), (100,)), 1)
+        writer.update_values_ram((3.0,), (100,))
+
+        data_monitor = DataMonitor()
+        replay(ring.read(), data_monitor)
+        ring.close()
+
+        self.assertEqual(data_monitor.sample_time_ns.tolist(), [100])
+        self.assertEqual(data_monitor.cpu_energy_uj.tolist(), [1.0, 2.0])
+        self.assertEqual(data_monitor.cpu_time_ns.tolist(), [100, 200])
+        self.assertEqual(data_monitor.cpu_core_energy_uj.tolist(), [10.0, 20.0])
+        self.assertEqual(len(data_monitor.dram_energy_uj), 0)
+        self.assertEqual(data_monitor.gpu_power_w.tolist(), {"1": [250.0]})
+        self.assertEqual(data_monitor.gpu_energy_uj.tolist(), {"1": [5000.0]})
+        self.assertEqual(data_monitor.ram_power_w.tolist(), [3.0])
+
+    def test_rapl_aligned_on_cpu_samples(self):
+        ring = SampleRing(capacity=5)
+        writer = RingWriter(ring)
+
+        def tick(timestamp_ns):
+            writer.update_values_cpu(
+                ([timestamp_ns * 1.0], [1.0], [50.0], [10.0], [40.0], [timestamp_ns])
+            )
+            writer.update_values_rapl(([timestamp_ns * 2.0], [], [], []))
+
+        # The CPU sample of the first tick is overwritten, but not its core energy
+        for timestamp_ns in (10, 20, 30):
+            tick(timestamp_ns)
+        data_monitor = DataMonitor()
+        cpu_time_ns = replay(ring.read(), data_monitor)
+        self.assertEqual(ring.lost, 1)
+        self.assertEqual(cpu_time_ns, 30)
+
+        # The sub-domains of a CPU sample collected before still follow it
+        writer.update_values_cpu(([40.0], [1.0], [50.0], [10.0], [40.0], [40]))
+        cpu_time_ns = replay(ring.read(), data_monitor, cpu_time_ns)
+        writer.update_values_rapl(([80.0], [], [], []))
+        replay(ring.read(), data_monitor, cpu_time_ns)
+        ring.close()
+
+        self.assertEqual(data_monitor.cpu_time_ns.tolist(), [20, 30, 40])
+        self.assertEqual(data_monitor.cpu_core_energy_uj.tolist(), [40.0, 60.0, 80.0])
+
+    def test_interleaved_records(self):
+        ring = SampleRing(capacity=64)
+        writer = RingWriter(ring)
+        for tick in range(3):
+            writer.update_values_time(tick * 1000000000, 1000000000)
+            writer.update_values_cpu(
+                ([tick * 1e6], [1.0], [50.0], [10.0], [40.0], [tick * 1000000000])
+            )
+            writer.update_values_ram((2.0,), (tick * 1000000000,))
+        records = ring.read()
+        ring.close()
+
+        data_monitor = DataMonitor()
+        replay(records, data_monitor)
+        self.assertEqual(data_monitor.cpu_energy_uj.tolist(), [0.0, 1e6, 2e6])
+        self.assertEqual(data_monitor.ram_time_ns.tolist(), [0, 1e9, 2e9])
+        self.assertEqual(data_monitor.sample_time_ns.tolist(), [0, 1e9, 2e9])
+
+        # Powers are integrated over the tick clock, which follows the written order
+        data_monitor = DataMonitor(streaming=True)
+        replay(records, data_monitor)
+        self.assertAlmostEqual(data_monitor.ram_power_w.summary()["energy_j"], 4.0)
+
+
+class TestProcessSampler(unittest.TestCase):
+    def test_ring_drained_during_phase(self):
+        with mock.patch.object(daemon, "DRAIN_PERIOD_S", 0.05):
+            sampler = ProcessSampler(0.02, "cpu", capacity=32)
+        sampler.start()
+        try:
+            time.sleep(1.0)
+            views = sampler.data_monitor.phase_views(0, time.monotonic_ns())
+        finally:
+            sampler.stop()
+            sampler.join()
+
+        # Drained by the sampler process without any phase boundary
+        self.assertEqual(sampler.lost, 0)
+        self.assertGreater(len(views["sample_time_ns"]), 32)
+        self.assertGreater(sampler.jitter_stats()["ticks"], 0)
+
+    def test_streaming_phase(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats = Stats(
+                0.02,
+                "cpu",
+                net="LeNet",
+                file_dir=tmp_dir,
+                sampler_process=True,
+                streaming=True,
+            )
+            stats.start()
+            try:
+                with stats.phase("stats_train", epoch=1) as record:
+                    time.sleep(0.2)
+            finally:
+                stats.stop()
+
+            results = load_results(tmp_dir, "stats_train")["exp_0"]["LeNet"]["1"]
+
+        json.dumps(record)
+        self.assertGreater(results["cpu_time_ns"]["count"], 0)
+        self.assertIsInstance(results["cpu_time_ns"]["max"], int)
+        self.assertIn("cpu", results["energy_j"])
+
+
+if __name__ == "__main__":
+    unittest.main()
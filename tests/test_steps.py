@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from power.integrate import cumulative_energy_j, energy_between, step_energy
+from power.steps import StepMarkers
+
+
+class TestStepMarkers(unittest.TestCase):
+    def test_markers_grow(self):
+        markers = StepMarkers(1)
+        for _ in range(5):
+            markers.mark()
+
+        self.assertEqual(len(markers), 4)
+        self.assertTrue(np.all(np.diff(markers.view()) >= 0))
+
+    def test_cumulative_energy(self):
+        energy = cumulative_energy_j([0, 1000000000, 2000000000], [2.0, 4.0, 4.0])
+        self.assertEqual(energy.tolist(), [0.0, 3.0, 7.0])
+
+        # Half-way between samples, the power of the last interval for one more
+        # interval, and nothing further
+        steps = energy_between(
+            np.array([0, 500000000, 2000000000, 3000000000, 4000000000]) + 10**18,
+            np.array([0, 1000000000, 2000000000]) + 10**18,
+            energy,
+        )
+        self.assertEqual(steps.tolist(), [1.5, 5.5, 4.0, 0.0])
+
+    def test_step_energy(self):
+        second = 1000000000
+        series = {
+            "cpu_time_ns": np.array([0, second, 2 * second]),
+            "cpu_energy_uj": np.array([0.0, 10e6, 30e6]),
+            "gpu_time_ns": {0: np.array([0, 2 * second]), 1: np.array([0, 2 * second])},
+            "gpu_power_w": {0: np.array([100.0, 100.0]), 1: np.array([50.0, 50.0])},
+            "gpu_energy_time_ns": {1: np.array([0, second, 2 * second])},
+            "gpu_energy_uj": {1: np.array([0.0, 20e6, 80e6])},
+            "ram_time_ns": np.array([0, 2 * second]),
+            "ram_power_w": np.array([3.0, 3.0]),
+        }
+        energy = step_energy(series, np.array([0, second, 2 * second]))
+
+        self.assertEqual(energy["cpu"].tolist(), [10.0, 20.0])
+        self.assertEqual(energy["gpu:0"].tolist(), [100.0, 100.0])
+        self.assertEqual(energy["gpu:1"].tolist(), [20.0, 60.0])
+        self.assertEqual(energy["gpu"].tolist(), [120.0, 160.0])
+        self.assertEqual(energy["ram"].tolist(), [3.0, 3.0])
+        self.assertEqual(step_energy(series, np.array([0])), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from power import tdp
+
+
+class TestTdpIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "tdp.csv")
+        self.write_table(
+            [
+                ("AMD Ryzen 9 5950X", 16, 105),
+                ("Intel Core i7-8700K", 6, 95),
+                ("Intel Xeon Gold 6248", 20, 150),
+            ]
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        tdp._indexes.clear()
+
+    def write_table(self, rows):
+        with open(self.csv_path, "w", encoding="utf-8") as file:
+            file.write("Name,Cores,TDP\n")
+            for row in rows:
+                file.write(",".join(map(str, row)) + "\n")
+
+    def test_closest_match(self):
+        index = tdp.TdpIndex(self.csv_path)
+        self.assertEqual(
+            index.match("Intel(R) Core(TM) i7-8700K"), ("Intel Core i7-8700K", 95.0)
+        )
+        self.assertIsNone(index.match("Apple M1"))
+
+    def test_matches_are_persisted(self):
+        tdp.TdpIndex(self.csv_path).match("Intel(R) Xeon(R) Gold 6248")
+        self.assertTrue(os.path.exists(tdp.index_path(self.csv_path)))
+
+        index = tdp.TdpIndex(self.csv_path)
+        self.assertEqual(index.matches["Intel(R) Xeon(R) Gold 6248"][1], 150.0)
+        self.assertEqual(index.match("Intel(R) Xeon(R) Gold 6248")[1], 150.0)
+        self.assertEqual(index.match("AMD Ryzen 9 5950X 16-Core")[1], 105.0)
+
+    def test_cache_rebuilt_when_table_changes(self):
+        tdp.TdpIndex(self.csv_path).match("Intel Core i7-8700K")
+        self.write_table([("Intel Core i7-8700K", 6, 65), ("Some other CPU", 4, 35)])
+
+        index = tdp.TdpIndex(self.csv_path)
+        self.assertEqual(index.matches, {})
+        self.assertEqual(index.match("Intel Core i7-8700K")[1], 65.0)
+
+    def test_find_tdp_defaults(self):
+        self.assertEqual(tdp.find_tdp("Apple M1", self.csv_path), tdp.DEFAULT_TDP)
+        missing = os.path.join(self.tmp_dir.name, "missing.csv")
+        self.assertEqual(tdp.find_tdp("Apple M1", missing), tdp.DEFAULT_TDP)
+
+
+if __name__ == "__main__":
+    unittest.main()
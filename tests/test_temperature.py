@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from power.temperature import HwmonTemperature
+
+
+def write_sensor(path, name, temperatures):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "name"), "w", encoding="utf-8") as file:
+        file.write(f"{name}\n")
+    for i, temperature in enumerate(temperatures, start=1):
+        with open(os.path.join(path, f"temp{i}_input"), "w", encoding="utf-8") as file:
+            file.write(f"{temperature}\n")
+        with open(os.path.join(path, f"temp{i}_crit"), "w", encoding="utf-8") as file:
+            file.write("100000\n")
+
+
+class TestHwmonTemperature(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.hwmon_dir = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_highest_cpu_sensor(self):
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon0"), "coretemp", [45000, 52000])
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon1"), "nvme", [70000])
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon2"), "coretemp", [48500])
+
+        sensors = HwmonTemperature(self.hwmon_dir)
+        self.assertTrue(sensors.available())
+        self.assertEqual(len(sensors.paths), 3)
+        self.assertEqual(sensors.read(), 52.0)
+
+        # Files are kept open and read again on every sample
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon2"), "coretemp", [61250])
+        self.assertEqual(sensors.read(), 61.25)
+        sensors.close()
+
+    def test_amd_drivers(self):
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon0"), "k10temp", [38000])
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon1"), "zenpower", [41000])
+
+        sensors = HwmonTemperature(self.hwmon_dir)
+        self.assertEqual(sensors.read(), 41.0)
+        sensors.close()
+
+    def test_without_cpu_sensors(self):
+        write_sensor(os.path.join(self.hwmon_dir, "hwmon0"), "acpitz", [30000])
+
+        sensors = HwmonTemperature(self.hwmon_dir)
+        self.assertFalse(sensors.available())
+        self.assertEqual(sensors.read(), 0)
+        self.assertFalse(HwmonTemperature(self.hwmon_dir + "/none").available())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,3 +5,5 @@ from .format_time import format_time, plot_time
 from .log import get_logger, set_level, setup_custom_logger
 from .model_parameters import model_parameters
 from .progress_bar import progress_bar
+from .results_log import append_record, load_results, read_results
+from .results_store import ResultsStore
@@ -98,6 +98,75 @@ def arguments():
         default=False,
         help="get statistics for the GPU and CPU utilisation",
     )
+    parser.add_argument(
+        "--stats-summary",
+        action="store_true",
+        default=False,
+        help="store running summaries of the statistics instead of every sample",
+    )
+    parser.add_argument(
+        "--keep-samples",
+        type=check_values.non_negative_int,
+        default=0,
+        metavar="N",
+        help="raw samples kept per statistic in summary mode (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sampler-process",
+        action="store_true",
+        default=False,
+        help="run the statistics sampler in a separate process",
+    )
+    parser.add_argument(
+        "--cache-inventory",
+        action="store_true",
+        default=False,
+        help="persist the hardware inventory in the results directory and reuse it",
+    )
+    parser.add_argument(
+        "--attribute-process",
+        action="store_true",
+        default=False,
+        help="attribute the CPU energy to the training process and its workers",
+    )
+    parser.add_argument(
+        "--cgroup",
+        action="store_true",
+        default=False,
+        help="account the CPU and memory of the cgroup v2 of the run, e.g. a container",
+    )
+    parser.add_argument(
+        "--adaptive-sampling",
+        action="store_true",
+        default=False,
+        help="sample faster while power or utilisation moves and slower when flat",
+    )
+    parser.add_argument(
+        "--sampling-floor",
+        type=float,
+        default=1.0,
+        metavar="S",
+        help="longest sampling period with adaptive sampling (default: %(default)s s)",
+    )
+    parser.add_argument(
+        "--sampling-budget",
+        type=float,
+        default=0.01,
+        metavar="F",
+        help="CPU share each source may use for sampling (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        default=False,
+        help="also write the raw samples of every epoch to a Parquet file",
+    )
+    parser.add_argument(
+        "--results-db",
+        action="store_true",
+        default=False,
+        help="also store the results in an SQLite database in the results directory",
+    )
     parser.add_argument(
         "--network",
         action="store",
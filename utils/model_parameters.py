@@ -11,12 +11,14 @@ custom_logger = log.set_level(__name__, "info")
 RESULTS_DIR = "./results/"
 
 
-def model_parameters(net, input_size) -> None:
+def model_parameters(net, input_size, store=None) -> None:
     """
     Calculates and logs model size and complexity metrics.
 
     Args:
         net: The model object for which metrics need to be computed.
+        input_size: The size of the input of the model, without the batch.
+        store: The ResultsStore the metrics are also saved to, if any.
 
     Returns:
         None
@@ -59,18 +61,18 @@ def model_parameters(net, input_size) -> None:
     else:
         model_size_dict = {}
 
-    model_size_dict.update(
-        {
-            net.__class__.__name__: {
-                "size_mb": round(size_all_mb, 3),
-                "parameters": param_number,
-                "param_size": param_size,
-                "buffer": buffer_size,
-                "macs": macs,
-                "trainable_params": trainable_params,
-            }
-        }
-    )
+    complexity = {
+        "size_mb": round(size_all_mb, 3),
+        "parameters": param_number,
+        "param_size": param_size,
+        "buffer": buffer_size,
+        "macs": macs,
+        "trainable_params": trainable_params,
+    }
+    model_size_dict.update({net.__class__.__name__: complexity})
 
     with open(results, "w", encoding="utf-8") as fp:
         json.dump(model_size_dict, fp, indent=4)
+
+    if store is not None:
+        store.add_model_complexity(net.__class__.__name__, complexity)
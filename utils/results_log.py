@@ -0,0 +1,82 @@
+import json
+import os
+
+RESULTS_EXTENSION = ".jsonl"
+LEGACY_EXTENSION = ".json"
+
+
+def append_record(file_path: str, record: dict) -> None:
+    """
+    Appends a record to a results log, as one JSON line written at once. Nothing
+    written before is read or rewritten, so saving an epoch costs the size of its
+    own results only.
+
+    :param file_path: The results log, created if it does not exist.
+    :param record: The record, which must be serialisable to JSON.
+    """
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    with open(file_path, "a", encoding="utf-8") as file:
+        file.write(line)
+
+
+def read_records(file_path: str) -> list[dict]:
+    """
+    :param file_path: A results log written by append_record().
+    :return: The records of the log, in the order they were appended. A last line
+        left incomplete, e.g. by a run killed while saving, is skipped.
+    """
+    records = []
+    with open(file_path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as error:
+            if number == len(lines) and not line.endswith("\n"):
+                break
+            raise ValueError(
+                f"Corrupted record at line {number} of '{file_path}'"
+            ) from error
+
+    return records
+
+
+def read_results(file_path: str) -> dict:
+    """
+    Reconstructs the nested view of the results of every experiment, as it was
+    stored in the JSON files of Stats: {experiment: {net: {epoch: results}}}, with
+    the epochs as strings. A record saved again for the same experiment, network
+    and epoch replaces the previous one.
+
+    :param file_path: A results log, or a results file in the former JSON format.
+    :return: The results of every experiment.
+    """
+    if file_path.endswith(LEGACY_EXTENSION):
+        with open(file_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    results_dict = {}
+    for record in read_records(file_path):
+        experiment = results_dict.setdefault(record["experiment"], {})
+        # The epochs are keyed as they were by the JSON encoder
+        epoch = json.dumps(record["epoch"]).strip('"')
+        experiment.setdefault(record["net"], {})[epoch] = record["results"]
+
+    return results_dict
+
+
+def load_results(file_dir: str, mode: str) -> dict:
+    """
+    :param file_dir: The directory of the results.
+    :param mode: The name of the results, e.g. 'stats_train'.
+    :return: The results of every experiment, read from the results log, or from
+        the JSON file of the former format when there is no log.
+    """
+    file_path = os.path.join(file_dir, mode + RESULTS_EXTENSION)
+    if not os.path.exists(file_path):
+        file_path = os.path.join(file_dir, mode + LEGACY_EXTENSION)
+
+    return read_results(file_path)
@@ -0,0 +1,225 @@
+import platform
+import sqlite3
+import time
+
+STORE_FILE = "results.db"
+
+# Sources adding up to the energy of a phase: the dram counter and the RAM model
+# are never both present
+TOTAL_SOURCES = ("cpu", "gpu", "dram", "ram")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment INTEGER NOT NULL,
+    tool TEXT,
+    get_stats INTEGER,
+    batch_size INTEGER,
+    test_size INTEGER,
+    epochs INTEGER,
+    learning_rate REAL,
+    sampling_rate REAL,
+    host TEXT,
+    started_at INTEGER
+);
+CREATE TABLE IF NOT EXISTS phases (
+    phase_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    net TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    epoch INTEGER,
+    start_time INTEGER,
+    stop_time INTEGER,
+    duration_s REAL,
+    total_j REAL
+);
+CREATE INDEX IF NOT EXISTS phases_key ON phases (run_id, net, mode, epoch);
+CREATE TABLE IF NOT EXISTS energy (
+    phase_id INTEGER NOT NULL REFERENCES phases,
+    source TEXT NOT NULL,
+    energy_j REAL,
+    PRIMARY KEY (phase_id, source)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ml_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs,
+    net TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    epoch INTEGER,
+    duration_ms REAL,
+    step_ms REAL,
+    loss REAL,
+    accuracy REAL
+);
+CREATE INDEX IF NOT EXISTS ml_metrics_key ON ml_metrics (run_id, net, mode, epoch);
+CREATE TABLE IF NOT EXISTS samples (
+    phase_id INTEGER NOT NULL REFERENCES phases,
+    series TEXT NOT NULL,
+    device INTEGER,
+    timestamp_ns INTEGER,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS samples_key ON samples (phase_id, series);
+CREATE TABLE IF NOT EXISTS model_complexity (
+    run_id INTEGER NOT NULL REFERENCES runs,
+    net TEXT NOT NULL,
+    size_mb REAL,
+    parameters INTEGER,
+    param_size INTEGER,
+    buffer INTEGER,
+    macs INTEGER,
+    trainable_params INTEGER,
+    PRIMARY KEY (run_id, net)
+);
+CREATE VIEW IF NOT EXISTS epoch_results AS
+SELECT
+    phases.run_id, runs.experiment, runs.tool, runs.batch_size, phases.net,
+    phases.mode, phases.epoch, phases.duration_s, phases.total_j,
+    ml_metrics.duration_ms, ml_metrics.step_ms, ml_metrics.loss,
+    ml_metrics.accuracy
+FROM phases
+JOIN runs USING (run_id)
+LEFT JOIN ml_metrics USING (run_id, net, mode, epoch);
+"""
+
+
+class ResultsStore:
+    """
+    SQLite store of the results of every run: the parameters of the runs, the
+    phases measured and their energy per source, the raw samples of the phases,
+    the ML metrics of every epoch and the complexity of the models.
+
+    The phases and the ML metrics are indexed on (run_id, net, mode, epoch), where
+    run_id identifies one execution of the experiments, and the 'epoch_results'
+    view joins them with the parameters of the runs. The energy per epoch of every
+    model across batch sizes is then a single query, e.g.:
+
+        SELECT batch_size, net, epoch, total_j FROM epoch_results
+        WHERE mode = 'stats_train'
+
+    Everything saved at once, e.g. a phase with its samples, is written in one
+    transaction.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+        self.run_id = None
+
+    def start_run(self, experiment: int = 0, **parameters) -> int:
+        """
+        Adds the run that the results saved next belong to.
+
+        :param experiment: The identifier of the experiment, as given by --run-id.
+        :param parameters: The other columns of the runs table, e.g. batch_size.
+        :return: The identifier of the run in the store.
+        """
+        row = {
+            "experiment": experiment,
+            "host": platform.node(),
+            "started_at": round(time.time_ns() / 1000000),
+            **parameters,
+        }
+        with self.connection:
+            cursor = self.connection.execute(
+                f"INSERT INTO runs ({', '.join(row)}) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
+            )
+        self.run_id = cursor.lastrowid
+
+        return self.run_id
+
+    def add_phase(self, net: str, mode: str, epoch, results: dict, samples=()) -> int:
+        """
+        :param net: The network measured.
+        :param mode: The name of the phase, e.g. 'stats_train'.
+        :param epoch: The epoch of the phase.
+        :param results: The results of the phase, with its start and stop times (in
+            milliseconds) and its energy per source under 'energy_j'.
+        :param samples: The raw samples of the phase, as (series, device,
+            timestamp_ns, value) rows.
+        :return: The identifier of the phase.
+        """
+        start_time = results.get("start_time")
+        stop_time = results.get("stop_time")
+        duration_s = None
+        if start_time is not None and stop_time is not None:
+            duration_s = (stop_time - start_time) / 1000
+
+        energy_j = results.get("energy_j", {})
+        total_j = None
+        if any(source in energy_j for source in TOTAL_SOURCES):
+            total_j = sum(energy_j.get(source, 0.0) for source in TOTAL_SOURCES)
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO phases (run_id, net, mode, epoch, start_time, "
+                "stop_time, duration_s, total_j) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id,
+                    net,
+                    mode,
+                    epoch,
+                    start_time,
+                    stop_time,
+                    duration_s,
+                    total_j,
+                ),
+            )
+            phase_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO energy VALUES (?, ?, ?)",
+                [(phase_id, source, value) for source, value in energy_j.items()],
+            )
+            self.connection.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?)",
+                ((phase_id, *row) for row in samples),
+            )
+
+        return phase_id
+
+    def add_ml_metrics(self, net: str, mode: str, epoch, **metrics) -> None:
+        """
+        :param net: The network trained or tested.
+        :param mode: The name of the results, e.g. 'stats_train'.
+        :param epoch: The epoch.
+        :param metrics: duration_ms, step_ms, loss and accuracy.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO ml_metrics (run_id, net, mode, epoch, duration_ms, "
+                "step_ms, loss, accuracy) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id,
+                    net,
+                    mode,
+                    epoch,
+                    metrics.get("duration_ms"),
+                    metrics.get("step_ms"),
+                    metrics.get("loss"),
+                    metrics.get("accuracy"),
+                ),
+            )
+
+    def add_model_complexity(self, net: str, complexity: dict) -> None:
+        """
+        :param net: The network.
+        :param complexity: size_mb, parameters, param_size, buffer, macs and
+            trainable_params, as saved in model_size.json.
+        """
+        row = {"run_id": self.run_id, "net": net, **complexity}
+        with self.connection:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO model_complexity ({', '.join(row)}) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
+            )
+
+    def query(self, sql: str, parameters=()) -> list[sqlite3.Row]:
+        return self.connection.execute(sql, parameters).fetchall()
+
+    def close(self) -> None:
+        self.connection.close()